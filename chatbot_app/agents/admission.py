@@ -0,0 +1,233 @@
+"""LLM 호출 수락 제어 + 동일 질문 합치기(singleflight)
+
+- ConcurrencyLimiter: 동시에 진행하는 LLM 호출 수 제한. 대기열이 가득 찼거나
+  max_wait 안에 자리가 나지 않으면 ServerBusy 를 던져 곧바로 "혼잡" 응답을 돌려준다.
+- SingleFlight: 같은 키의 작업이 진행 중이면 새로 실행하지 않고 그 결과를 함께 받는다.
+"""
+from collections import deque
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from typing import Deque, Dict, Optional, Tuple
+import asyncio
+import re
+import threading
+import time
+
+from .metrics import observe, LLM_ACTIVE, LLM_QUEUED, ADMISSION_REJECTED, COALESCED_REQUESTS
+
+
+class ServerBusy(Exception):
+    """LLM 동시 처리 한도 초과 (HTTP 503 으로 응답)"""
+
+    def __init__(self, reason: str, retry_after: int = 5):
+        super().__init__("요청이 많아 잠시 후 다시 시도해 주세요.")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    """자리를 기다리는 호출 하나. 자리를 넘겨받으면 granted 가 True 가 되고 깨운다"""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.granted = False
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(True)
+
+    def wake(self) -> bool:
+        """깨우지 못하면(이벤트 루프가 이미 닫힘) False"""
+        if self.event is not None:
+            self.event.set()
+            return True
+        try:
+            self.loop.call_soon_threadsafe(self._resolve)
+            return True
+        except RuntimeError:
+            return False
+
+
+class ConcurrencyLimiter:
+    """동시 실행 한도 + 대기열 길이/대기 시간 제한
+
+    동기/비동기 경로가 자리 수 하나를 나눠 쓴다 (둘을 합쳐 max_concurrent).
+    기다리는 호출은 들어온 순서대로 줄을 서고, 자리가 나면 풀어 주는 쪽이 다음 대기자에게 바로 넘긴다.
+    비동기 대기자는 자기 이벤트 루프의 future 로 기다리므로 특정 루프에 묶이지 않고 스레드도 쓰지 않는다
+    (runserver 처럼 요청마다 루프가 다르거나 asyncio.run 을 여러 번 불러도 동작).
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, max_wait: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._active = 0
+        self._queue: Deque[_Waiter] = deque()
+
+    def _enqueue(self):
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                ADMISSION_REJECTED.labels("queue_full").inc()
+                raise ServerBusy("queue_full")
+            self._waiting += 1
+        LLM_QUEUED.inc()
+
+    def _dequeue(self):
+        with self._lock:
+            self._waiting -= 1
+        LLM_QUEUED.dec()
+
+    def check(self):
+        """대기열이 가득 찼으면 바로 ServerBusy (스트리밍 응답을 열기 전에 거절하는 용도)"""
+        with self._lock:
+            full = self._waiting >= self.max_queue
+        if full:
+            ADMISSION_REJECTED.labels("queue_full").inc()
+            raise ServerBusy("queue_full")
+
+    # ---------------------------
+    # 자리 관리
+    # ---------------------------
+    def _try_acquire(self, waiter: _Waiter) -> bool:
+        """빈 자리가 있고 앞선 대기자가 없으면 바로 차지, 아니면 waiter 를 줄에 세운다"""
+        with self._lock:
+            if self._active < self.max_concurrent and not self._queue:
+                self._active += 1
+                return True
+            self._queue.append(waiter)
+            return False
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """기다리기를 그만둔다. 그 사이 자리를 넘겨받았으면 True (자리는 호출한 쪽 것)"""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._queue.remove(waiter)
+            return False
+
+    def _release(self):
+        """자리를 다음 대기자에게 넘기고, 대기자가 없으면 비운다"""
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._active -= 1
+                    return
+                waiter = self._queue.popleft()
+                waiter.granted = True
+            if waiter.wake():
+                return
+            # 루프가 닫혀 깨울 수 없는 대기자 몫은 다음 대기자에게
+
+    @contextmanager
+    def _held(self):
+        LLM_ACTIVE.inc()
+        try:
+            yield
+        finally:
+            LLM_ACTIVE.dec()
+            self._release()
+
+    @staticmethod
+    def _rejected():
+        ADMISSION_REJECTED.labels("timeout").inc()
+        return ServerBusy("timeout")
+
+    def _wait_limit(self, timeout: Optional[float]) -> float:
+        return self.max_wait if timeout is None else min(self.max_wait, timeout)
+
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None):
+        """timeout 을 주면 max_wait 보다 짧을 때 그만큼만 기다린다 (요청 마감에 맞출 때)"""
+        self._enqueue()
+        start = time.perf_counter()
+        try:
+            waiter = _Waiter()
+            acquired = self._try_acquire(waiter)
+            if not acquired:
+                waiter.event.wait(self._wait_limit(timeout))
+                acquired = self._abandon(waiter)
+        finally:
+            self._dequeue()
+            observe("llm_queue", time.perf_counter() - start)
+        if not acquired:
+            raise self._rejected()
+        with self._held():
+            yield
+
+    async def _acquire(self, timeout: Optional[float]) -> bool:
+        waiter = _Waiter(asyncio.get_running_loop())
+        if self._try_acquire(waiter):
+            return True
+        try:
+            await asyncio.wait_for(waiter.future, self._wait_limit(timeout))
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            # 취소되기 직전에 넘겨받은 자리는 바로 다음 대기자에게
+            if self._abandon(waiter):
+                self._release()
+            raise
+        return self._abandon(waiter)
+
+    @asynccontextmanager
+    async def aslot(self, timeout: Optional[float] = None):
+        self._enqueue()
+        start = time.perf_counter()
+        try:
+            acquired = await self._acquire(timeout)
+        finally:
+            self._dequeue()
+            observe("llm_queue", time.perf_counter() - start)
+        if not acquired:
+            raise self._rejected()
+        with self._held():
+            yield
+
+
+_PUNCT_RE = re.compile(r"[\s?!.,~]+")
+
+
+def question_key(question: str) -> str:
+    """공백/문장부호 차이만 있는 질문은 같은 키"""
+    return _PUNCT_RE.sub(" ", question.lower()).strip()
+
+
+class SingleFlight:
+    """진행 중인 같은 키의 작업을 하나로 합친다 (스레드/이벤트 루프 모두에서 사용 가능)
+
+    leader, future = flight.join(key)
+    leader 이면 작업 후 반드시 flight.done(key, result) 또는 flight.fail(key, exc) 를 호출하고,
+    follower 는 future.result() / await asyncio.wrap_future(future) 로 결과를 받는다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def join(self, key: str) -> Tuple[bool, Future]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                COALESCED_REQUESTS.inc()
+                return False, future
+            future = Future()
+            self._calls[key] = future
+            return True, future
+
+    def _finish(self, key: str) -> Optional[Future]:
+        with self._lock:
+            return self._calls.pop(key, None)
+
+    def done(self, key: str, result):
+        future = self._finish(key)
+        if future is not None:
+            future.set_result(result)
+
+    def fail(self, key: str, exc: BaseException):
+        future = self._finish(key)
+        if future is not None:
+            future.set_exception(exc)
@@ -0,0 +1,243 @@
+"""FAISS 인덱스 종류 선택 / 생성 / 검색 파라미터 / recall-지연 스윕
+
+- flat : 정확 검색 (IndexFlatL2). 청크 수에 비례해 검색 비용이 늘어난다.
+- hnsw : 그래프 기반 근사 검색. efSearch 로 recall/지연 조절.
+- ivf  : 클러스터(nlist) 중 nprobe 개만 탐색.
+- ivfpq: ivf + 곱 양자화로 벡터를 M 바이트로 압축 (메모리 절감).
+
+인덱스 ID 는 LangChain FAISS 와 같이 0..n-1 위치를 쓴다.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import math
+import time
+
+import faiss
+import numpy as np
+
+from .config import (
+    FAISS_INDEX_TYPE,
+    FAISS_AUTO_HNSW_MIN,
+    FAISS_AUTO_IVFPQ_MIN,
+    FAISS_HNSW_M,
+    FAISS_HNSW_EF_CONSTRUCTION,
+    FAISS_HNSW_EF_SEARCH,
+    FAISS_IVF_NLIST,
+    FAISS_IVF_NPROBE,
+    FAISS_PQ_M,
+)
+
+INDEX_TYPES = ("flat", "hnsw", "ivf", "ivfpq")
+# 클러스터링 학습에 필요한 최소 벡터 수 (이보다 적으면 ivf/ivfpq 대신 flat)
+MIN_TRAIN_VECTORS = 1000
+
+# 스윕할 검색 파라미터 값
+SWEEP_VALUES = {
+    "hnsw": ("efSearch", (16, 32, 64, 128, 256)),
+    "ivf": ("nprobe", (1, 4, 8, 16, 32, 64)),
+    "ivfpq": ("nprobe", (1, 4, 8, 16, 32, 64)),
+}
+
+
+@dataclass
+class IndexSpec:
+    """manifest.json 의 faiss_index 항목"""
+    type: str
+    auto: bool
+    build: Dict[str, int] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return {"type": self.type, "auto": self.auto, "build": self.build}
+
+
+def build_config() -> dict:
+    """인덱스 재빌드가 필요한 설정값 (매니페스트 비교용)"""
+    return {
+        "type": FAISS_INDEX_TYPE,
+        "auto_hnsw_min": FAISS_AUTO_HNSW_MIN,
+        "auto_ivfpq_min": FAISS_AUTO_IVFPQ_MIN,
+        "hnsw_m": FAISS_HNSW_M,
+        "hnsw_ef_construction": FAISS_HNSW_EF_CONSTRUCTION,
+        "ivf_nlist": FAISS_IVF_NLIST,
+        "pq_m": FAISS_PQ_M,
+    }
+
+
+def choose_index_type(n: int, configured: Optional[str] = None) -> str:
+    """설정값(auto 면 청크 수 기준)으로 인덱스 종류 결정"""
+    configured = configured or FAISS_INDEX_TYPE
+    if configured != "auto":
+        if configured not in INDEX_TYPES:
+            raise ValueError(f"알 수 없는 FAISS 인덱스 종류: {configured} ({', '.join(INDEX_TYPES)}, auto)")
+        kind = configured
+    elif n >= FAISS_AUTO_IVFPQ_MIN:
+        kind = "ivfpq"
+    elif n >= FAISS_AUTO_HNSW_MIN:
+        kind = "hnsw"
+    else:
+        kind = "flat"
+    if kind in ("ivf", "ivfpq") and n < MIN_TRAIN_VECTORS:
+        return "flat"
+    return kind
+
+
+def _nlist(n: int) -> int:
+    nlist = FAISS_IVF_NLIST or int(4 * math.sqrt(n))
+    return max(1, min(nlist, n // 39))  # 클러스터당 39개 미만이면 학습이 불안정
+
+
+def _pq_m(dim: int) -> int:
+    m = FAISS_PQ_M or max(1, dim // 8)
+    while dim % m:  # 차원을 나누어떨어지게
+        m -= 1
+    return m
+
+
+def create_index(kind: str, vectors: np.ndarray) -> faiss.Index:
+    """벡터(n x d, float32)로 인덱스 학습 + 추가"""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, dim = vectors.shape
+    if kind == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif kind == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, FAISS_HNSW_M)
+        index.hnsw.efConstruction = FAISS_HNSW_EF_CONSTRUCTION
+    elif kind == "ivf":
+        index = faiss.IndexIVFFlat(faiss.IndexFlatL2(dim), dim, _nlist(n))
+    elif kind == "ivfpq":
+        nbits = 8 if n >= 256 * 39 else 4
+        index = faiss.IndexIVFPQ(faiss.IndexFlatL2(dim), dim, _nlist(n), _pq_m(dim), nbits)
+    else:
+        raise ValueError(f"알 수 없는 FAISS 인덱스 종류: {kind}")
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    set_search_params(index)
+    return index
+
+
+def index_spec(kind: str, index: faiss.Index) -> IndexSpec:
+    build = {"ntotal": int(index.ntotal), "dim": int(index.d)}
+    if kind == "hnsw":
+        build.update(m=FAISS_HNSW_M, ef_construction=FAISS_HNSW_EF_CONSTRUCTION)
+    elif kind in ("ivf", "ivfpq"):
+        ivf = faiss.extract_index_ivf(index)
+        build["nlist"] = int(ivf.nlist)
+        if kind == "ivfpq":
+            build.update(pq_m=int(index.pq.M), pq_nbits=int(index.pq.nbits))
+    return IndexSpec(type=kind, auto=FAISS_INDEX_TYPE == "auto", build=build)
+
+
+def index_kind(index: faiss.Index) -> str:
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivfpq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf"
+    return "flat"
+
+
+def set_search_params(index: faiss.Index, ef_search: Optional[int] = None, nprobe: Optional[int] = None):
+    """검색 시점 파라미터 적용 (로드할 때마다 설정값으로)"""
+    kind = index_kind(index)
+    if kind == "hnsw":
+        faiss.downcast_index(index).hnsw.efSearch = ef_search or FAISS_HNSW_EF_SEARCH
+    elif kind in ("ivf", "ivfpq"):
+        faiss.extract_index_ivf(index).nprobe = nprobe or FAISS_IVF_NPROBE
+
+
+def _selector_params(index: faiss.Index, sel: faiss.IDSelector) -> faiss.SearchParameters:
+    """인덱스 종류에 맞는 검색 파라미터 (현재 efSearch / nprobe 유지)"""
+    kind = index_kind(index)
+    if kind == "hnsw":
+        return faiss.SearchParametersHNSW(sel=sel, efSearch=faiss.downcast_index(index).hnsw.efSearch)
+    if kind in ("ivf", "ivfpq"):
+        return faiss.SearchParametersIVF(sel=sel, nprobe=faiss.extract_index_ivf(index).nprobe)
+    return faiss.SearchParameters(sel=sel)
+
+
+def search_ranges(index: faiss.Index, query: np.ndarray, k: int, ranges: List[Tuple[int, int]]):
+    """위치 구간(파티션)으로 제한한 검색 → (distances, positions) 한 행
+
+    flat 은 구간마다 해당 구간만 훑고 거리순으로 합친다. 근사 인덱스는 한 번 검색하며 선택자로 거른다.
+    """
+    if not ranges:
+        return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+    selectors = [faiss.IDSelectorRange(start, end) for start, end in ranges]
+    if index_kind(index) == "flat":
+        parts = [index.search(query, k, params=faiss.SearchParameters(sel=sel)) for sel in selectors]
+        distances = np.concatenate([d[0] for d, _ in parts])
+        positions = np.concatenate([i[0] for _, i in parts])
+    else:
+        sel = selectors[0]
+        for other in selectors[1:]:
+            sel = faiss.IDSelectorOr(sel, other)
+            selectors.append(sel)  # 하위 선택자가 검색 중에 해제되지 않도록 참조 유지
+        distances, positions = index.search(query, k, params=_selector_params(index, sel))
+        distances, positions = distances[0], positions[0]
+    keep = positions != -1
+    distances, positions = distances[keep], positions[keep]
+    order = np.argsort(distances, kind="stable")[:k]
+    return distances[order], positions[order]
+
+
+def supports_incremental(kind: str) -> bool:
+    """저장된 벡터를 그대로 복원(reconstruct_n)할 수 있는 인덱스만 증분 갱신"""
+    return kind == "flat"
+
+
+def index_bytes(index: faiss.Index) -> int:
+    return int(faiss.serialize_index(index).nbytes)
+
+
+# -------------------------------
+# recall / 지연 스윕 (flat 정확 검색 기준)
+# -------------------------------
+def _timed_search(index: faiss.Index, queries: np.ndarray, k: int):
+    """서비스와 같이 질의 하나씩 검색한 평균 지연(ms)"""
+    rows = []
+    start = time.perf_counter()
+    for q in queries:
+        _, ids = index.search(q[None, :], k)
+        rows.append(ids[0])
+    return np.asarray(rows), (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+
+
+def _recall(truth: np.ndarray, found: np.ndarray) -> float:
+    return float(np.mean([len(set(t) & set(f)) / len(t) for t, f in zip(truth.tolist(), found.tolist())]))
+
+
+def sweep(vectors: np.ndarray, queries: np.ndarray, k: int = 5, kinds: List[str] = INDEX_TYPES) -> List[dict]:
+    """인덱스 종류 x 검색 파라미터별 recall@k, 질의당 지연, 인덱스 크기"""
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    baseline = create_index("flat", vectors)
+    truth, flat_ms = _timed_search(baseline, queries, k)
+    rows = [{"type": "flat", "param": None, "value": None, "recall": 1.0, "ms": flat_ms,
+             "bytes": index_bytes(baseline), "build_seconds": 0.0}]
+    for kind in kinds:
+        if kind == "flat":
+            continue
+        if choose_index_type(len(vectors), kind) != kind:
+            rows.append({"type": kind, "skipped": f"벡터 {len(vectors)}개로는 학습 불가 (최소 {MIN_TRAIN_VECTORS})"})
+            continue
+        start = time.perf_counter()
+        index = create_index(kind, vectors)
+        build_seconds = time.perf_counter() - start
+        size = index_bytes(index)
+        param, values = SWEEP_VALUES[kind]
+        for value in values:
+            if param == "efSearch":
+                set_search_params(index, ef_search=value)
+            else:
+                set_search_params(index, nprobe=value)
+            found, ms = _timed_search(index, queries, k)
+            rows.append({"type": kind, "param": param, "value": value, "recall": _recall(truth, found),
+                         "ms": ms, "bytes": size, "build_seconds": build_seconds})
+    return rows
+
+
+def recommend(rows: List[dict], min_recall: float) -> Optional[dict]:
+    """recall 하한을 만족하는 조합 중 가장 빠른 것"""
+    ok = [r for r in rows if "skipped" not in r and r["recall"] >= min_recall]
+    return min(ok, key=lambda r: r["ms"]) if ok else None
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+import threading
+import time
+
+import numpy as np
+
+
+@dataclass
+class _Entry:
+    vector: np.ndarray
+    sources: frozenset
+    result: dict
+    expires_at: float
+
+
+class SemanticAnswerCache:
+    """질의 임베딩 유사도 기반 답변 캐시 (TTL + LRU)
+
+    - 코사인 유사도가 threshold 이상이고 검색된 출처 집합이 같을 때만 적중
+    - 인덱스 매니페스트 버전이 바뀌면 전체 무효화
+    """
+
+    def __init__(self, threshold: float = 0.95, ttl: float = 3600, max_size: int = 512):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_size = max_size
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm > 0 else v
+
+    def _check_version(self, version):
+        # 호출 측에서 락을 잡은 상태로 호출
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+
+    def lookup(self, vector, sources: frozenset, version=None):
+        """적중 시 저장된 결과 dict, 아니면 None"""
+        query = self._normalize(vector)
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(version)
+            best_id, best_sim = None, self.threshold
+            for entry_id, entry in list(self._entries.items()):
+                if entry.expires_at <= now:
+                    del self._entries[entry_id]
+                    continue
+                if entry.sources != sources:
+                    continue
+                sim = float(np.dot(query, entry.vector))
+                if sim >= best_sim:
+                    best_id, best_sim = entry_id, sim
+
+            if best_id is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return dict(self._entries[best_id].result)
+
+    def store(self, vector, sources: frozenset, result: dict, version=None):
+        entry = _Entry(
+            vector=self._normalize(vector),
+            sources=sources,
+            result=dict(result),
+            expires_at=time.monotonic() + self.ttl,
+        )
+        with self._lock:
+            self._check_version(version)
+            self._entries[self._next_id] = entry
+            self._next_id += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
@@ -1,57 +1,106 @@
 from .base_agent import BaseAgent
 from .vector_store_agent import VectorStoreAgent
+from .answer_cache import SemanticAnswerCache
+from .context_packer import pack_prompt
+from .metrics import (
+    span, observe, ANSWER_CACHE_LOOKUPS, ANSWER_CACHE_ENTRIES, DEADLINE_FALLBACKS, FAQ_LOOKUPS, FOLLOWUP_EMBEDDINGS,
+)
+from .admission import ConcurrencyLimiter, ServerBusy, SingleFlight, question_key
+from .deadline import Deadline, DeadlineExceeded, fallback_answer
+from .faq_table import FaqTable
+from .config import (
+    RETRIEVAL_WORKERS,
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_THRESHOLD,
+    ANSWER_CACHE_TTL,
+    ANSWER_CACHE_MAX_SIZE,
+    CONTEXT_TOKEN_BUDGET,
+    HISTORY_TOKEN_BUDGET,
+    HISTORY_MAX_TURNS,
+    LLM_MODEL,
+    LLM_BACKEND,
+    FAKE_LLM_FIRST_TOKEN_LATENCY,
+    FAKE_LLM_TOKENS_PER_SEC,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_QUEUE,
+    LLM_QUEUE_TIMEOUT,
+    SINGLEFLIGHT,
+    BATCH_CONCURRENCY,
+    FOLLOWUP_QUERY_WEIGHT,
+    FOLLOWUP_SEARCH,
+    FAQ_ENABLED,
+)
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.prompts import PromptTemplate
 from langchain.schema.output_parser import StrOutputParser
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from datetime import datetime
+import asyncio
+import contextvars
+import queue
+import threading
+import time
 
-class ChatAgent(BaseAgent):
-    """대화 관리 + LLM 응답 담당"""
+import numpy as np
 
-    def __init__(self):
-        self.vector_agent = VectorStoreAgent()
-        self.model = ChatGoogleGenerativeAI(model="gemini-2.5-flash")
+def _raise(exc: Exception):
+    raise exc
 
-    # ---------------------------
-    # 맥락 기반 질의어 재작성
-    # ---------------------------
-    def make_search_query(self, user_question: str, history: list) -> str:
-        last_user_q = ""
-        for h in reversed(history):
-            if h["role"] == "user" and h["content"] != user_question:
-                last_user_q = h["content"]
-                break
+def _batch_item(i: int, q):
+    """배치 항목 하나 정규화. 형식이 틀리면 (None, 오류 메시지)"""
+    if isinstance(q, str):
+        q = {"question": q}
+    if not isinstance(q, dict):
+        return None, "질문은 문자열 또는 {\"question\": ...} 객체여야 합니다."
+    question, history = q.get("question"), q.get("history") or []
+    if not isinstance(question, str) or not question.strip():
+        return None, "question 은 비어 있지 않은 문자열이어야 합니다."
+    if not isinstance(history, list) or not all(
+        isinstance(h, dict) and isinstance(h.get("role"), str) and isinstance(h.get("content"), str)
+        for h in history
+    ):
+        return None, "history 는 {\"role\", \"content\"} 객체 목록이어야 합니다."
+    item_id = q.get("id", i)
+    return {"id": item_id if isinstance(item_id, (str, int)) else i, "question": question, "history": history}, None
 
-        if last_user_q:
-            return f"{last_user_q} 관련해서 {user_question}"
-        else:
-            return user_question
+def batch_items(questions: list):
+    """배치 입력 정규화: 문자열 또는 {"id", "question", "history"} → dict (id 기본값은 순번)
 
+    반환값은 (처리할 항목, 형식 오류 결과). 형식이 틀린 항목은 배치 전체를 멈추지 않고
+    {"id", "error", "code": "bad_request"} 로 따로 보고한다.
+    """
+    items, rejected = [], []
+    for i, q in enumerate(questions):
+        item, error = _batch_item(i, q)
+        if item is None:
+            item_id = q.get("id", i) if isinstance(q, dict) else i
+            rejected.append({"id": item_id if isinstance(item_id, (str, int)) else i,
+                             "error": error, "code": "bad_request"})
+        else:
+            items.append(item)
+    return items, rejected
 
-    def run(self, user_question: str, history: list):
-        # ---------------------------
-        # 1. 맥락 기반 검색 질의어 생성
-        # ---------------------------
-        search_query = self.make_search_query(user_question, history)
+def _aborted() -> RuntimeError:
+    return RuntimeError("먼저 들어온 같은 질문의 처리가 중단되었습니다.")
 
-        # ---------------------------
-        # 2. RAG 검색 실행
-        # ---------------------------
-        docs = self.vector_agent.run(search_query)
+def make_chat_model(backend: str = LLM_BACKEND):
+    """설정값에 따라 LLM 생성 (fake 는 오프라인 벤치마크용)"""
+    if backend == "fake":
+        from .fake_chat_model import FakeChatModel
 
-        # ---------------------------
-        # 3. 최근 대화 이력 정리
-        # ---------------------------
-        history_text = "\n".join(
-            [f"{h['role']}: {h['content']}" for h in history[-8:]]
+        return FakeChatModel(
+            first_token_latency=FAKE_LLM_FIRST_TOKEN_LATENCY,
+            tokens_per_second=FAKE_LLM_TOKENS_PER_SEC,
         )
+    if backend == "gemini":
+        return ChatGoogleGenerativeAI(model=LLM_MODEL)
+    raise ValueError(f"알 수 없는 LLM 백엔드: {backend}")
 
-        today = datetime.now().strftime("%Y-%m-%d")
+class ChatAgent(BaseAgent):
+    """대화 관리 + LLM 응답 담당"""
 
-        # ---------------------------
-        # 4. 프롬프트 구성
-        # ---------------------------
-        template = """
+    TEMPLATE = """
         오늘은 {today} 입니다.
         다음의 컨텍스트를 활용해서 질문에 답변해줘
         - 질문에 곧바로 핵심 정보로 답변해줘
@@ -63,7 +112,7 @@ class ChatAgent(BaseAgent):
         - 대화 시작 시 한 번만 인사하고, 이후 답변에는 인사를 생략해줘
         - 해당 질문만으로 정보를 제공하기가 어려우면 이전 대화를 참고하여 질문을 재구성한 다음에 다시 문서를 찾아보고 답변해줘
         - 이전 대화 맥락을 참고했는데도 답변하기 어려우면 사용자에게 더 자세한 질문을 해달라고 요청해줘
-        
+
         이전 대화: {history}
 
         컨텍스트: {context}
@@ -72,22 +121,582 @@ class ChatAgent(BaseAgent):
 
         응답:
         """
-        prompt = PromptTemplate.from_template(template)
-        chain = prompt | self.model | StrOutputParser()
 
-        # ---------------------------
-        # 5. 최종 응답 생성
-        # ---------------------------
-        response = chain.invoke(
-            {
-                "today": today,
-                "question": user_question,
-                "context": docs,
-                "history": history_text,
-            }
+    def __init__(self, model=None):
+        self.vector_agent = VectorStoreAgent()
+        self.model = model if model is not None else make_chat_model()
+        prompt = PromptTemplate.from_template(self.TEMPLATE)
+        self.chain = prompt | self.model | StrOutputParser()
+        # 비동기 경로에서 임베딩/FAISS 검색을 돌릴 제한된 스레드 풀
+        self._executor = ThreadPoolExecutor(
+            max_workers=RETRIEVAL_WORKERS, thread_name_prefix="retrieval"
+        )
+        # 첫 질문(이전 대화 없음)에 대한 의미 기반 답변 캐시
+        self.answer_cache = SemanticAnswerCache(
+            threshold=ANSWER_CACHE_THRESHOLD,
+            ttl=ANSWER_CACHE_TTL,
+            max_size=ANSWER_CACHE_MAX_SIZE,
+        ) if ANSWER_CACHE_ENABLED else None
+        # LLM 동시 호출 제한 + 동시에 들어온 같은 첫 질문 합치기
+        self.limiter = ConcurrencyLimiter(
+            max_concurrent=LLM_MAX_CONCURRENCY,
+            max_queue=LLM_MAX_QUEUE,
+            max_wait=LLM_QUEUE_TIMEOUT,
+        )
+        self.flight = SingleFlight() if SINGLEFLIGHT else None
+        # manage.py build_faq 로 미리 만든 인기 첫 질문 답변표
+        self.faq = FaqTable() if FAQ_ENABLED else None
+        # 동기 경로의 LLM 호출도 비동기 경로(_agenerate)로 돌려 마감이 지나면 실제로 취소되게 하는 이벤트 루프
+        self._llm_loop = asyncio.new_event_loop()
+        threading.Thread(target=self._llm_loop.run_forever, name="llm", daemon=True).start()
+
+    # ---------------------------
+    # 맥락 기반 질의어 재작성
+    # ---------------------------
+    def _previous_question(self, user_question: str, history: list):
+        """직전 사용자 질문 메시지 (이력 저장소에서 읽었으면 그 턴의 질의 임베딩이 "embedding" 에 있다)"""
+        for h in reversed(history):
+            if h["role"] == "user" and h["content"] != user_question:
+                return h
+        return None
+
+    def make_search_query(self, user_question: str, history: list) -> str:
+        """BM25 / 파티션 추정용 질의 문자열 (벡터 검색은 _followup_query 참고)"""
+        previous = self._previous_question(user_question, history)
+        if previous is not None:
+            return f"{previous['content']} 관련해서 {user_question}"
+        else:
+            return user_question
+
+    def _turn_vectors(self, turns: list) -> list:
+        """[(질문, 직전 질문 메시지 또는 None)] → [(질문 벡터, 직전 질문 벡터 또는 None)]
+
+        직전 질문 벡터는 대화 이력에 저장된 것을 그대로 쓰고, 없을 때만 같은 forward 에 끼워 임베딩한다.
+        """
+        dim = self.vector_agent.db.index.d
+
+        def stored(previous):
+            embedding = previous.get("embedding")
+            return embedding if embedding and len(embedding) == dim else None
+
+        texts = []
+        for question, previous in turns:
+            texts.append(question)
+            if previous is not None and stored(previous) is None:
+                texts.append(previous["content"])
+        vectors = iter(self.vector_agent.embed_queries(texts).tolist())
+
+        result = []
+        for question, previous in turns:
+            own, prev = next(vectors), None
+            if previous is not None:
+                prev = stored(previous)
+                FOLLOWUP_EMBEDDINGS.labels("reused" if prev is not None else "embedded").inc()
+                if prev is None:
+                    prev = next(vectors)
+            result.append((own, prev))
+        return result
+
+    def _followup_query(self, vector: list, prev: list):
+        """이어지는 질문의 검색 벡터 → (retrieve 의 embeddings, weights)
+
+        blend: 이번/직전 질문 벡터를 방향 기준으로 가중 평균 (크기는 이번 질문 벡터에 맞춤)
+        multi: 두 벡터를 FAISS 다중 질의 한 번으로 검색하고 가중 RRF 로 합침
+        """
+        if prev is None:
+            return [vector], None
+        weight = FOLLOWUP_QUERY_WEIGHT
+        if FOLLOWUP_SEARCH == "multi":
+            return [vector, prev], [weight, 1.0 - weight]
+        own, prev = np.asarray(vector), np.asarray(prev)
+        norm = np.linalg.norm(own) or 1.0
+        mixed = weight * own / norm + (1.0 - weight) * prev / (np.linalg.norm(prev) or 1.0)
+        return [(mixed / (np.linalg.norm(mixed) or 1.0) * norm).tolist()], None
+
+    # ---------------------------
+    # 검색 + 프롬프트 입력 준비 (run/stream 공통)
+    # ---------------------------
+    def retrieve(self, user_question: str, history: list, k: int = 5):
+        """맥락 기반 검색 → (문서 목록, 이번 질문의 질의 임베딩)"""
+        # 1. 맥락 기반 검색 질의어 생성
+        with span("search_query"):
+            search_query = self.make_search_query(user_question, history)
+            previous = self._previous_question(user_question, history)
+
+        # 2. RAG 검색 실행 (질의 임베딩은 답변 캐시 키 / 다음 턴의 직전 질문 벡터로도 사용)
+        with span("retrieve"):
+            if previous is None:
+                return self.vector_agent.retrieve(search_query, k=k)
+            # 이어지는 질문: 이번 질문만 임베딩하고 직전 질문 벡터는 이력에서 재사용
+            [(vector, prev)] = self._turn_vectors([(user_question, previous)])
+            embeddings, weights = self._followup_query(vector, prev)
+            docs, _ = self.vector_agent.retrieve(search_query, k=k, embeddings=embeddings, weights=weights)
+            return docs, vector
+
+    def _prepare(self, user_question: str, history: list):
+        docs, vector = self.retrieve(user_question, history)
+        docs, inputs = self._inputs(user_question, history, docs)
+        return docs, inputs, vector
+
+    def _inputs(self, user_question: str, history: list, docs):
+        # 3. 토큰 예산 안에서 컨텍스트(관련도 순) + 최근 대화 이력 조립
+        with span("prompt_pack"):
+            packed = pack_prompt(
+                docs,
+                history,
+                context_budget=CONTEXT_TOKEN_BUDGET,
+                history_budget=HISTORY_TOKEN_BUDGET,
+                max_turns=HISTORY_MAX_TURNS,
+            )
+
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        # 4. 프롬프트 입력 구성
+        inputs = {
+            "today": today,
+            "question": user_question,
+            "context": packed.context,
+            "history": packed.history,
+        }
+        return packed.docs, inputs
+
+    async def _aprepare(self, user_question: str, history: list):
+        loop = asyncio.get_running_loop()
+        # 요청 단위 타이밍(contextvar)이 스레드 풀에서도 이어지도록 컨텍스트를 넘긴다
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._executor, ctx.run, self._prepare, user_question, history
         )
 
+    def _sources(self, docs) -> list:
+        return [d.metadata.get("source", "") for d in docs]
+
+    def _with_embedding(self, result: dict, vector) -> dict:
+        """결과에 이번 질문의 질의 임베딩을 붙인다 (뷰가 대화 이력과 함께 저장)"""
+        return {**result, "query_embedding": vector}
+
+    # ---------------------------
+    # 의미 기반 답변 캐시 (첫 질문만 대상)
+    # ---------------------------
+    def _source_set(self, docs) -> frozenset:
+        return frozenset(
+            (d.metadata.get("source") or d.metadata.get("url", ""), d.metadata.get("title", ""))
+            for d in docs
+        )
+
+    def _cache_lookup(self, history: list, vector, docs):
+        # 키워드 fast path(임베딩 생략)로 검색된 경우에도 캐시를 건너뛴다
+        if self.answer_cache is None or history or vector is None:
+            return None
+        with span("answer_cache"):
+            cached = self.answer_cache.lookup(
+                vector, self._source_set(docs), self.vector_agent.manifest_version
+            )
+        ANSWER_CACHE_LOOKUPS.labels("hit" if cached is not None else "miss").inc()
+        return cached
+
+    def _cache_store(self, history: list, vector, docs, result: dict):
+        if self.answer_cache is None or history or vector is None:
+            return
+        self.answer_cache.store(
+            vector, self._source_set(docs), result, self.vector_agent.manifest_version
+        )
+        ANSWER_CACHE_ENTRIES.set(self.answer_cache.stats()["size"])
+
+    def _faq_lookup(self, user_question: str, history: list):
+        """첫 질문이 FAQ 답변표와 정확히 같으면 그 답변 (임베딩 / 검색 / LLM 없음)"""
+        if self.faq is None or history:
+            return None
+        # 인덱스 버전 교체는 검색 경로(maybe_reload)에서 확인하고, 여기서는 서비스 중인 버전의 답변표만 본다
+        result = self.faq.lookup(user_question, self.vector_agent.manifest_version)
+        if len(self.faq):  # 답변표가 없을 때는 집계하지 않음
+            FAQ_LOOKUPS.labels("hit" if result is not None else "miss").inc()
+        return result
+
+    def cache_stats(self) -> dict:
+        return self.answer_cache.stats() if self.answer_cache else {}
+
+    # ---------------------------
+    # 동일 첫 질문 합치기 (singleflight)
+    # ---------------------------
+    def _flight_key(self, user_question: str, history: list):
+        if self.flight is None or history:
+            return None
+        return question_key(user_question)
+
+    def _replay(self, result: dict):
+        """합쳐진 요청: 먼저 온 요청의 결과를 스트림 이벤트로 재생"""
+        yield {"event": "sources", "sources": result["sources"]}
+        yield {"event": "token", "text": result["answer"]}
+        yield {"event": "done", **result}
+
+    # ---------------------------
+    # LLM 호출 (지연 시간 예산)
+    # ---------------------------
+    def _fallback(self, inputs: dict, docs, stage: str) -> dict:
+        """마감 초과: 검색된 청크만으로 만든 답변 (답변 캐시에는 넣지 않음)"""
+        DEADLINE_FALLBACKS.labels(stage).inc()
         return {
+            "answer": fallback_answer(inputs["question"], docs),
+            "sources": self._sources(docs),
+            "fallback": True,
+        }
+
+    def _generate(self, inputs: dict, deadline: Deadline):
+        """LLM 토큰 제너레이터 (동시 호출 수 제한). 마감을 넘기면 DeadlineExceeded
+
+        _agenerate()를 전용 이벤트 루프 스레드에서 돌리고 토큰을 큐로 받는다. 마감이 지나거나
+        호출한 쪽이 그만 읽으면 LLM 스트림을 취소하므로 자리와 스레드를 붙잡고 있지 않는다.
+        """
+        tokens = queue.Queue()
+
+        async def produce():
+            try:
+                async for token in self._agenerate(inputs, deadline):
+                    tokens.put(("token", token))
+                tokens.put(("end", None))
+            except Exception as e:
+                tokens.put(("error", e))
+
+        # run_coroutine_threadsafe 는 호출한 쪽의 컨텍스트를 복사하므로 요청 단위 타이밍이 이어진다
+        future = asyncio.run_coroutine_threadsafe(produce(), self._llm_loop)
+        try:
+            while True:
+                kind, token = tokens.get()
+                if kind == "end":
+                    return
+                if kind == "error":
+                    raise token
+                yield token
+        finally:
+            future.cancel()
+
+    async def _agenerate(self, inputs: dict, deadline: Deadline):
+        """_generate()의 비동기 버전. 마감이 지나면 LLM 스트림을 취소한다
+
+        자리 대기는 첫 토큰 마감까지만 한다. 그 안에 자리가 나지 않으면 대체 답변이 아니라
+        ServerBusy("timeout") 로 혼잡(503)을 알린다.
+        """
+        start_at, finish_at = deadline.llm()
+        async with self.limiter.aslot(timeout=Deadline.left(start_at)):
+            stream = self.chain.astream(inputs)
+            start = time.perf_counter()
+            first = True
+            try:
+                while True:
+                    try:
+                        token = await asyncio.wait_for(
+                            stream.__anext__(), Deadline.left(start_at if first else finish_at)
+                        )
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError:
+                        raise DeadlineExceeded("llm_start" if first else "llm_finish") from None
+                    if not token:
+                        continue
+                    if first:
+                        observe("llm_first_token", time.perf_counter() - start)
+                        first = False
+                    yield token
+                observe("llm", time.perf_counter() - start)
+            finally:
+                await stream.aclose()
+
+    def run(self, user_question: str, history: list):
+        faq = self._faq_lookup(user_question, history)
+        if faq is not None:
+            return faq
+        key = self._flight_key(user_question, history)
+        if key is None:
+            return self._run(user_question, history)
+        leader, future = self.flight.join(key)
+        if not leader:
+            return dict(future.result())
+        try:
+            result = self._run(user_question, history)
+            self.flight.done(key, result)
+            return result
+        except Exception as e:
+            self.flight.fail(key, e)
+            raise
+        finally:
+            self.flight.fail(key, _aborted())  # 이미 끝났으면 무시됨
+
+    def stream(self, user_question: str, history: list):
+        """응답을 생성되는 대로 흘려보내는 제너레이터
+
+        sources → token(여러 번) → done 순서로 이벤트 dict를 yield 한다.
+        """
+        faq = self._faq_lookup(user_question, history)
+        if faq is not None:
+            yield from self._replay(faq)
+            return
+        key = self._flight_key(user_question, history)
+        if key is None:
+            yield from self._stream(user_question, history)
+            return
+        leader, future = self.flight.join(key)
+        if not leader:
+            yield from self._replay(future.result())
+            return
+        try:
+            for event in self._stream(user_question, history):
+                if event["event"] == "done":
+                    self.flight.done(key, {k: v for k, v in event.items() if k != "event"})
+                yield event
+        except Exception as e:
+            self.flight.fail(key, e)
+            raise
+        finally:
+            self.flight.fail(key, _aborted())  # 클라이언트가 도중에 끊은 경우
+
+    def _run(self, user_question: str, history: list):
+        deadline = Deadline()
+        docs, inputs, vector = self._prepare(user_question, history)
+        return self._complete(history, docs, inputs, vector, deadline)
+
+    def _complete(self, history: list, docs, inputs: dict, vector, deadline: Deadline = None):
+        cached = self._cache_lookup(history, vector, docs)
+        if cached is not None:
+            return self._with_embedding(cached, vector)
+
+        # ---------------------------
+        # 5. 최종 응답 생성 (동시 호출 수 제한 + 마감)
+        # ---------------------------
+        try:
+            response = "".join(self._generate(inputs, deadline or Deadline()))
+        except DeadlineExceeded as e:
+            return self._with_embedding(self._fallback(inputs, docs, e.stage), vector)
+
+        result = {
+            "answer": response,
+            "sources": self._sources(docs),
+        }
+        self._cache_store(history, vector, docs, result)
+        return self._with_embedding(result, vector)
+
+    def _stream(self, user_question: str, history: list):
+        deadline = Deadline()
+        docs, inputs, vector = self._prepare(user_question, history)
+        sources = self._sources(docs)
+        yield {"event": "sources", "sources": sources}
+
+        cached = self._cache_lookup(history, vector, docs)
+        if cached is not None:
+            yield {"event": "token", "text": cached["answer"]}
+            yield {"event": "done", **self._with_embedding(cached, vector)}
+            return
+
+        parts = []
+        try:
+            for token in self._generate(inputs, deadline):
+                parts.append(token)
+                yield {"event": "token", "text": token}
+        except DeadlineExceeded as e:
+            # 이미 보낸 토큰은 done 의 대체 답변으로 교체된다
+            yield {"event": "done", **self._with_embedding(self._fallback(inputs, docs, e.stage), vector)}
+            return
+
+        result = {"answer": "".join(parts), "sources": sources}
+        self._cache_store(history, vector, docs, result)
+        yield {"event": "done", **self._with_embedding(result, vector)}
+
+    # ---------------------------
+    # 비동기 버전 (ASGI 뷰에서 사용)
+    # ---------------------------
+    async def arun(self, user_question: str, history: list):
+        faq = self._faq_lookup(user_question, history)
+        if faq is not None:
+            return faq
+        key = self._flight_key(user_question, history)
+        if key is None:
+            return await self._arun(user_question, history)
+        leader, future = self.flight.join(key)
+        if not leader:
+            return dict(await asyncio.wrap_future(future))
+        try:
+            result = await self._arun(user_question, history)
+            self.flight.done(key, result)
+            return result
+        except Exception as e:
+            self.flight.fail(key, e)
+            raise
+        finally:
+            self.flight.fail(key, _aborted())  # 취소된 경우 (이미 끝났으면 무시됨)
+
+    async def astream(self, user_question: str, history: list):
+        """stream()의 비동기 제너레이터 버전"""
+        faq = self._faq_lookup(user_question, history)
+        if faq is not None:
+            for event in self._replay(faq):
+                yield event
+            return
+        key = self._flight_key(user_question, history)
+        if key is None:
+            async for event in self._astream(user_question, history):
+                yield event
+            return
+        leader, future = self.flight.join(key)
+        if not leader:
+            for event in self._replay(await asyncio.wrap_future(future)):
+                yield event
+            return
+        try:
+            async for event in self._astream(user_question, history):
+                if event["event"] == "done":
+                    self.flight.done(key, {k: v for k, v in event.items() if k != "event"})
+                yield event
+        except Exception as e:
+            self.flight.fail(key, e)
+            raise
+        finally:
+            self.flight.fail(key, _aborted())  # 클라이언트가 도중에 끊은 경우
+
+    async def _arun(self, user_question: str, history: list):
+        deadline = Deadline()
+        docs, inputs, vector = await self._aprepare(user_question, history)
+        return await self._acomplete(history, docs, inputs, vector, deadline)
+
+    async def _acomplete(self, history: list, docs, inputs: dict, vector, deadline: Deadline = None):
+        cached = self._cache_lookup(history, vector, docs)
+        if cached is not None:
+            return self._with_embedding(cached, vector)
+
+        try:
+            response = "".join([token async for token in self._agenerate(inputs, deadline or Deadline())])
+        except DeadlineExceeded as e:
+            return self._with_embedding(self._fallback(inputs, docs, e.stage), vector)
+
+        result = {
             "answer": response,
-            "sources": [d.metadata.get("source", "") for d in docs],
-        }
\ No newline at end of file
+            "sources": self._sources(docs),
+        }
+        self._cache_store(history, vector, docs, result)
+        return self._with_embedding(result, vector)
+
+    async def _astream(self, user_question: str, history: list):
+        deadline = Deadline()
+        docs, inputs, vector = await self._aprepare(user_question, history)
+        sources = self._sources(docs)
+        yield {"event": "sources", "sources": sources}
+
+        cached = self._cache_lookup(history, vector, docs)
+        if cached is not None:
+            yield {"event": "token", "text": cached["answer"]}
+            yield {"event": "done", **self._with_embedding(cached, vector)}
+            return
+
+        parts = []
+        try:
+            async for token in self._agenerate(inputs, deadline):
+                parts.append(token)
+                yield {"event": "token", "text": token}
+        except DeadlineExceeded as e:
+            yield {"event": "done", **self._with_embedding(self._fallback(inputs, docs, e.stage), vector)}
+            return
+
+        result = {"answer": "".join(parts), "sources": sources}
+        self._cache_store(history, vector, docs, result)
+        yield {"event": "done", **self._with_embedding(result, vector)}
+
+    # ---------------------------
+    # 배치 질문 (평가 세트 / FAQ 미리 생성)
+    # ---------------------------
+    def _prepare_batch(self, items: list) -> list:
+        """검색은 한 번에: 질의 임베딩 한 번의 forward + FAISS 다중 질의 검색 한 번"""
+        queries = [self.make_search_query(item["question"], item["history"]) for item in items]
+        turns = [(item["question"], self._previous_question(item["question"], item["history"])) for item in items]
+        with span("retrieve"):
+            vectors = self._turn_vectors(turns)
+            plans = [self._followup_query(vector, prev) for vector, prev in vectors]
+            retrieved = self.vector_agent.retrieve_batch(
+                queries, embeddings=[e for e, _ in plans], weights=[w for _, w in plans]
+            )
+        prepared = []
+        for item, (docs, _), (vector, _) in zip(items, retrieved, vectors):
+            docs, inputs = self._inputs(item["question"], item["history"], docs)
+            prepared.append((item, docs, inputs, vector))
+        return prepared
+
+    def _batch_result(self, item: dict, answer) -> dict:
+        base = {"id": item["id"], "question": item["question"]}
+        try:
+            result = {**base, **answer()}
+            result.pop("query_embedding", None)
+            return result
+        except ServerBusy as e:
+            return {**base, "error": str(e), "code": "busy"}
+        except Exception as e:
+            return {**base, "error": str(e), "code": "error"}
+
+    async def _abatch_result(self, item: dict, answer) -> dict:
+        base = {"id": item["id"], "question": item["question"]}
+        try:
+            result = {**base, **(await answer)}
+            result.pop("query_embedding", None)
+            return result
+        except ServerBusy as e:
+            return {**base, "error": str(e), "code": "busy"}
+        except Exception as e:
+            return {**base, "error": str(e), "code": "error"}
+
+    def run_batch(self, questions: list, concurrency: int = BATCH_CONCURRENCY):
+        """여러 질문에 답하는 제너레이터. 끝나는 순서대로 결과 dict 를 yield 한다
+
+        questions 는 문자열 또는 {"id", "question", "history"} dict 목록.
+        실패한 질문은 {"id", "question", "error", "code"}, 형식이 틀린 항목은 {"id", "error", "code": "bad_request"} 로 따로 보고한다.
+        """
+        items, rejected = batch_items(questions)
+        yield from rejected
+        if not items:
+            return
+        try:
+            prepared = self._prepare_batch(items)
+        except Exception as e:
+            for item in items:
+                yield self._batch_result(item, lambda: _raise(e))
+            return
+
+        pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="batch")
+        try:
+            futures = [
+                pool.submit(
+                    contextvars.copy_context().run, self._batch_result, item,
+                    partial(self._complete, item["history"], docs, inputs, vector),
+                )
+                for item, docs, inputs, vector in prepared
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def arun_batch(self, questions: list, concurrency: int = BATCH_CONCURRENCY):
+        """run_batch()의 비동기 제너레이터 버전 (LLM 호출은 최대 concurrency 개 동시 진행)"""
+        items, rejected = batch_items(questions)
+        for result in rejected:
+            yield result
+        if not items:
+            return
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        try:
+            prepared = await loop.run_in_executor(self._executor, ctx.run, self._prepare_batch, items)
+        except Exception as e:
+            for item in items:
+                yield self._batch_result(item, lambda: _raise(e))
+            return
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def answer(item, docs, inputs, vector):
+            async with semaphore:
+                return await self._abatch_result(item, self._acomplete(item["history"], docs, inputs, vector))
+
+        tasks = [asyncio.ensure_future(answer(*p)) for p in prepared]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
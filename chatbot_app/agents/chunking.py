@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+from typing import List
+import hashlib
+import math
+import re
+
+# 평탄화/청크 규칙을 바꾸면 올려서 인덱스 전체 재생성을 유도한다
+CHUNKER_VERSION = 4
+
+# 한국어 위주 텍스트에서 LLM 토큰 1개당 대략적인 글자 수
+CHARS_PER_TOKEN = 2.0
+
+_WS_RE = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 호출 없이 쓰는 대략적인 토큰 수"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def _clean_key(key: str) -> str:
+    return str(key).strip().rstrip(":").strip()
+
+
+def flatten(value, path: str = "") -> List[str]:
+    """중첩 dict/list 를 읽기 쉬운 줄 목록으로 펼친다 (빈 값은 건너뜀)
+
+    {"자료이용": ["a", "b"], "신청": "c"} →
+        ["[자료이용]", "- a", "- b", "신청: c"]
+    """
+    lines = []
+    if isinstance(value, dict):
+        for key, sub in value.items():
+            sub_path = f"{path} > {_clean_key(key)}" if path else _clean_key(key)
+            if isinstance(sub, dict):
+                lines.extend(flatten(sub, sub_path))
+                continue
+            sub_lines = flatten(sub)
+            if not sub_lines:
+                continue
+            if isinstance(sub, list):
+                lines.append(f"[{sub_path}]")
+                lines.extend(sub_lines)
+            else:
+                lines.append(f"{sub_path}: {sub_lines[0]}")
+                lines.extend(sub_lines[1:])
+    elif isinstance(value, list):
+        seen = set()
+        for item in value:
+            for line in flatten(item, path):
+                line = line if line.startswith(("[", "- ")) or isinstance(item, dict) else f"- {line}"
+                if line in seen:  # 같은 목록 안에서 반복되는 항목은 한 번만
+                    continue
+                seen.add(line)
+                lines.append(line)
+    elif value is not None:
+        text = str(value).strip()
+        if text:
+            lines.append(text)
+    return lines
+
+
+def flatten_contact(contact) -> str:
+    """문의처 dict 를 '부서명: ... / 전화번호: ...' 형태로"""
+    if not contact:
+        return ""
+    if isinstance(contact, dict) and all(not isinstance(v, (dict, list)) for v in contact.values()):
+        return " / ".join(f"{_clean_key(k)}: {v}" for k, v in contact.items() if str(v).strip())
+    if isinstance(contact, dict):
+        parts = []
+        for name, sub in contact.items():
+            text = flatten_contact(sub)
+            if text:
+                parts.append(f"{_clean_key(name)} - {text}")
+        return "\n".join(parts)
+    return "\n".join(flatten(contact))
+
+
+def detail_to_text(item: dict) -> str:
+    """도서관 홈페이지 상세 항목 → 본문 텍스트 (설명이 비어 있으면 빈 문자열)"""
+    body = "\n".join(flatten(item.get("description")))
+    if not body:
+        return ""
+    category = " > ".join(
+        v for v in (item.get("category", ""), item.get("subcategory", "")) if v
+    )
+    title = item.get("title", "")
+    if item.get("tab") and item["tab"] != title:
+        title = f"{title} - {item['tab']}"
+    parts = [f"[제목] {title}"]
+    if category:
+        parts.append(f"[분류] {category}")
+    parts.append(body)
+    contact = flatten_contact(item.get("contact"))
+    if contact:
+        parts.append(f"[문의]\n{contact}")
+    return "\n".join(parts)
+
+
+def normalize_chunk(text: str) -> str:
+    return _WS_RE.sub(" ", text).strip()
+
+
+def chunk_id(text: str) -> str:
+    """내용 해시 기반 청크 ID (같은 내용의 청크는 같은 ID → 자동 중복 제거)"""
+    return "c" + hashlib.sha256(normalize_chunk(text).encode("utf-8")).hexdigest()[:24]
+
+
+@dataclass
+class CorpusStats:
+    documents: int = 0
+    skipped_documents: int = 0
+    chunks: int = 0
+    tokens: int = 0
+    empty_chunks: int = 0
+    duplicate_chunks: int = 0
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    def report(self) -> str:
+        return (
+            f"문서 {self.documents}개 (빈 문서 {self.skipped_documents}개 제외), "
+            f"청크 {self.chunks}개 / 약 {self.tokens} 토큰, "
+            f"빈 청크 {self.empty_chunks}개 · 중복 청크 {self.duplicate_chunks}개 제거"
+        )
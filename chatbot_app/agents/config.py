@@ -0,0 +1,208 @@
+"""에이전트 설정값 (환경변수로 덮어쓸 수 있음)"""
+from pathlib import Path
+import os
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_str(name: str, default: str) -> str:
+    value = os.getenv(name)
+    return value if value not in (None, "") else default
+
+
+def _env_path(name: str, default: str) -> Path:
+    """상대 경로는 프로젝트 루트(BASE_DIR) 기준"""
+    path = Path(_env_str(name, default))
+    return path if path.is_absolute() else BASE_DIR / path
+
+
+# -------------------------------
+# 비동기 요청 경로
+# -------------------------------
+# 임베딩 + FAISS 검색(CPU 작업)을 돌리는 전용 스레드 풀 크기
+RETRIEVAL_WORKERS = _env_int("LYOLLA_RETRIEVAL_WORKERS", 4)
+
+# -------------------------------
+# 의미 기반 답변 캐시
+# -------------------------------
+ANSWER_CACHE_ENABLED = _env_bool("LYOLLA_ANSWER_CACHE", True)
+# 캐시 적중으로 볼 질의 임베딩 코사인 유사도 하한
+ANSWER_CACHE_THRESHOLD = _env_float("LYOLLA_ANSWER_CACHE_THRESHOLD", 0.95)
+ANSWER_CACHE_TTL = _env_int("LYOLLA_ANSWER_CACHE_TTL", 6 * 60 * 60)  # 초
+ANSWER_CACHE_MAX_SIZE = _env_int("LYOLLA_ANSWER_CACHE_MAX_SIZE", 512)
+
+# -------------------------------
+# LLM
+# -------------------------------
+LLM_MODEL = _env_str("LYOLLA_LLM_MODEL", "gemini-2.5-flash")
+# "gemini" 또는 "fake" (네트워크 없이 지연 시간만 흉내 내는 벤치마크용 모델)
+LLM_BACKEND = _env_str("LYOLLA_LLM_BACKEND", "gemini")
+FAKE_LLM_FIRST_TOKEN_LATENCY = _env_float("LYOLLA_FAKE_LLM_FIRST_TOKEN_LATENCY", 0.8)  # 초
+FAKE_LLM_TOKENS_PER_SEC = _env_float("LYOLLA_FAKE_LLM_TOKENS_PER_SEC", 60.0)
+
+# -------------------------------
+# 수락 제어 (LLM 동시 호출 제한)
+# -------------------------------
+LLM_MAX_CONCURRENCY = _env_int("LYOLLA_LLM_MAX_CONCURRENCY", 8)  # 워커 프로세스당
+# 자리를 기다릴 수 있는 최대 요청 수 / 최대 대기 시간(초). 넘으면 바로 503 "혼잡" 응답
+LLM_MAX_QUEUE = _env_int("LYOLLA_LLM_MAX_QUEUE", 32)
+LLM_QUEUE_TIMEOUT = _env_float("LYOLLA_LLM_QUEUE_TIMEOUT", 10.0)
+# 동시에 들어온 같은 첫 질문은 검색/LLM 호출 한 번으로 합친다
+SINGLEFLIGHT = _env_bool("LYOLLA_SINGLEFLIGHT", True)
+# 배치 질문 API: 한 요청의 최대 질문 수 / 동시에 진행할 LLM 호출 수 (위 동시 호출 한도 안에서)
+BATCH_MAX_QUESTIONS = _env_int("LYOLLA_BATCH_MAX_QUESTIONS", 500)
+BATCH_CONCURRENCY = _env_int("LYOLLA_BATCH_CONCURRENCY", 4)
+
+# -------------------------------
+# 지연 시간 예산 (넘으면 LLM 호출을 취소하고 검색 결과만으로 대체 답변)
+# -------------------------------
+# 요청 전체 예산(초, 검색 시간 포함). 0이면 제한 없음
+REQUEST_DEADLINE = _env_float("LYOLLA_REQUEST_DEADLINE", 20.0)
+# LLM 단계 마감(초): 호출 자리 대기 + 첫 토큰까지 / 답변 완료까지 (0이면 제한 없음)
+# 자리 대기가 첫 토큰 마감에 걸리면 대체 답변이 아니라 ServerBusy(503)
+LLM_START_DEADLINE = _env_float("LYOLLA_LLM_START_DEADLINE", 8.0)
+LLM_FINISH_DEADLINE = _env_float("LYOLLA_LLM_FINISH_DEADLINE", 15.0)
+# 대체 답변에 넣을 출처 수 / 출처별 발췌 길이(글자)
+FALLBACK_MAX_SOURCES = _env_int("LYOLLA_FALLBACK_MAX_SOURCES", 3)
+FALLBACK_SNIPPET_CHARS = _env_int("LYOLLA_FALLBACK_SNIPPET_CHARS", 160)
+
+# -------------------------------
+# 하이브리드 검색 (BM25 + FAISS)
+# -------------------------------
+HYBRID_SEARCH = _env_bool("LYOLLA_HYBRID_SEARCH", True)
+# 각 검색기에서 가져올 후보 수 (RRF 융합 전)
+HYBRID_FETCH_K = _env_int("LYOLLA_HYBRID_FETCH_K", 20)
+# Reciprocal Rank Fusion 상수: 1 / (RRF_K + 순위)
+RRF_K = _env_int("LYOLLA_RRF_K", 60)
+# 이 단어 수 이하의 짧은 키워드 질의는 BM25 결과만으로 답할 수 있으면 임베딩을 건너뜀
+LEXICAL_FASTPATH_MAX_TERMS = _env_int("LYOLLA_LEXICAL_FASTPATH_MAX_TERMS", 2)
+
+# -------------------------------
+# 이어지는 질문 검색 (직전 질문 임베딩 재사용)
+# -------------------------------
+# 검색 벡터에서 이번 질문이 차지하는 비중 (나머지는 대화 이력에 저장된 직전 질문 벡터)
+FOLLOWUP_QUERY_WEIGHT = _env_float("LYOLLA_FOLLOWUP_QUERY_WEIGHT", 0.7)
+# "blend" (두 벡터의 가중 평균으로 한 번 검색) 또는 "multi" (두 벡터로 함께 검색해 가중 RRF 로 합침)
+FOLLOWUP_SEARCH = _env_str("LYOLLA_FOLLOWUP_SEARCH", "blend")
+
+# -------------------------------
+# 메타데이터 파티션 검색 (출처/분류별 구간 + 공지 최신순)
+# -------------------------------
+# 질의 임베딩과 가까운 파티션 몇 개만 벡터 검색 (0이면 전체). BM25 는 항상 전체 파티션을 본다
+PARTITION_PROBE = _env_int("LYOLLA_PARTITION_PROBE", 3)
+# 가장 최근 공지 날짜 기준으로 이보다 오래된 공지는 검색하지 않음 (0이면 제한 없음, 질문에 연도가 있으면 해제)
+NOTICE_MAX_AGE_DAYS = _env_int("LYOLLA_NOTICE_MAX_AGE_DAYS", 365)
+# 최신 공지 가산점: 점수 x (1 + RECENCY_BOOST * 0.5^(경과일/반감기))
+RECENCY_BOOST = _env_float("LYOLLA_RECENCY_BOOST", 0.5)
+RECENCY_HALF_LIFE_DAYS = _env_float("LYOLLA_RECENCY_HALF_LIFE_DAYS", 90.0)
+
+# -------------------------------
+# 임베딩 백엔드
+# -------------------------------
+EMBEDDING_MODEL = _env_str("LYOLLA_EMBEDDING_MODEL", "jhgan/ko-sbert-nli")
+# "torch" (HuggingFaceEmbeddings) 또는 "onnx" (ONNX Runtime + int8 동적 양자화)
+EMBEDDING_BACKEND = _env_str("LYOLLA_EMBEDDING_BACKEND", "torch")
+# export_onnx_embeddings 명령이 모델을 내보내는 위치
+ONNX_MODEL_DIR = _env_path("LYOLLA_ONNX_MODEL_DIR", "onnx_model")
+ONNX_THREADS = _env_int("LYOLLA_ONNX_THREADS", 0)  # 0이면 ONNX Runtime 기본값
+# 인덱스 빌드용 청크 임베딩 디스크 캐시 (모델별 하위 디렉터리)
+EMBEDDING_CACHE_DIR = _env_path("LYOLLA_EMBEDDING_CACHE_DIR", "embedding_cache")
+
+# -------------------------------
+# 공유 임베딩 서버 (manage.py embedding_server)
+# -------------------------------
+# 유닉스 소켓 경로. 지정하면 워커는 모델을 직접 로드하지 않고 서버에 질의 임베딩을 요청한다
+EMBEDDING_SOCKET = _env_str("LYOLLA_EMBEDDING_SOCKET", "")
+# 서버가 한 번에 묶어 임베딩할 최대 문장 수 / 첫 요청 이후 더 모으는 최대 대기 시간(ms)
+EMBEDDING_BATCH_MAX = _env_int("LYOLLA_EMBEDDING_BATCH_MAX", 32)
+EMBEDDING_BATCH_WAIT_MS = _env_float("LYOLLA_EMBEDDING_BATCH_WAIT_MS", 5.0)
+# 클라이언트 응답 대기 시간(초). 실패하면 이 간격(초) 동안 프로세스 내부 모델로 대신 임베딩
+EMBEDDING_SERVER_TIMEOUT = _env_float("LYOLLA_EMBEDDING_SERVER_TIMEOUT", 2.0)
+EMBEDDING_SERVER_RETRY = _env_float("LYOLLA_EMBEDDING_SERVER_RETRY", 30.0)
+
+# -------------------------------
+# FAISS 인덱스 종류 (manage.py tune_index 로 recall/지연 비교)
+# -------------------------------
+# auto / flat / hnsw / ivf / ivfpq. auto 는 청크 수로 고르고 결과를 manifest.json 에 기록
+FAISS_INDEX_TYPE = _env_str("LYOLLA_FAISS_INDEX_TYPE", "auto")
+# auto 기준 청크 수: 이보다 적으면 flat(정확 검색), 많으면 hnsw, IVFPQ_MIN 이상이면 ivfpq(압축)
+FAISS_AUTO_HNSW_MIN = _env_int("LYOLLA_FAISS_AUTO_HNSW_MIN", 20_000)
+FAISS_AUTO_IVFPQ_MIN = _env_int("LYOLLA_FAISS_AUTO_IVFPQ_MIN", 500_000)
+FAISS_HNSW_M = _env_int("LYOLLA_FAISS_HNSW_M", 32)
+FAISS_HNSW_EF_CONSTRUCTION = _env_int("LYOLLA_FAISS_HNSW_EF_CONSTRUCTION", 80)
+FAISS_IVF_NLIST = _env_int("LYOLLA_FAISS_IVF_NLIST", 0)  # 0이면 4 * sqrt(청크 수)
+FAISS_PQ_M = _env_int("LYOLLA_FAISS_PQ_M", 0)  # 0이면 차원/8 (서브벡터당 8차원, 벡터당 M 바이트)
+# 검색 시점 파라미터 (재빌드 없이 바꿀 수 있음, 클수록 recall↑ 지연↑)
+FAISS_HNSW_EF_SEARCH = _env_int("LYOLLA_FAISS_HNSW_EF_SEARCH", 64)
+FAISS_IVF_NPROBE = _env_int("LYOLLA_FAISS_IVF_NPROBE", 16)
+
+# -------------------------------
+# 청크 분할
+# -------------------------------
+CHUNK_SIZE = _env_int("LYOLLA_CHUNK_SIZE", 800)
+# 겹침이 크면 거의 같은 청크가 많아져 인덱스와 프롬프트가 중복으로 커진다
+CHUNK_OVERLAP = _env_int("LYOLLA_CHUNK_OVERLAP", 100)
+# 이보다 짧은 청크(제목/기호 조각)는 버린다
+MIN_CHUNK_CHARS = _env_int("LYOLLA_MIN_CHUNK_CHARS", 20)
+
+# -------------------------------
+# 프롬프트 컨텍스트 예산 (토큰 수는 글자 수 기반 추정치)
+# -------------------------------
+CONTEXT_TOKEN_BUDGET = _env_int("LYOLLA_CONTEXT_TOKEN_BUDGET", 2000)
+HISTORY_TOKEN_BUDGET = _env_int("LYOLLA_HISTORY_TOKEN_BUDGET", 800)
+HISTORY_MAX_TURNS = _env_int("LYOLLA_HISTORY_MAX_TURNS", 8)
+
+# -------------------------------
+# 인덱스 버전 게시 / 핫 리로드
+# -------------------------------
+# 실행 중인 워커가 새 인덱스 버전이 게시됐는지 확인하는 최소 간격(초)
+INDEX_RELOAD_INTERVAL = _env_float("LYOLLA_INDEX_RELOAD_INTERVAL", 5.0)
+# 보관할 인덱스 버전 수 (현재 버전 포함)
+INDEX_KEEP_VERSIONS = _env_int("LYOLLA_INDEX_KEEP_VERSIONS", 3)
+# 서버가 에이전트를 로드할 때 원본 변경을 발견하면 직접 빌드할지.
+# false 면 게시된 버전으로 서비스하고 빌드는 manage.py build_index 에 맡긴다
+INDEX_AUTO_BUILD = _env_bool("LYOLLA_INDEX_AUTO_BUILD", True)
+
+# -------------------------------
+# 기동
+# -------------------------------
+# ASGI 서버 시작 직후 백그라운드에서 에이전트(모델/인덱스)를 미리 로드.
+# false 면 첫 요청 또는 /chat/ready/ 확인 때 로드
+WARMUP_ON_START = _env_bool("LYOLLA_WARMUP", True)
+
+# -------------------------------
+# 질의 로그 / FAQ 답변표 (manage.py build_faq)
+# -------------------------------
+# 개인정보를 지운 질문 · 검색 출처 · 단계별 지연을 날짜별 JSONL 로 기록
+QUERY_LOG_ENABLED = _env_bool("LYOLLA_QUERY_LOG", True)
+QUERY_LOG_DIR = _env_path("LYOLLA_QUERY_LOG_DIR", "query_logs")
+QUERY_LOG_RETENTION_DAYS = _env_int("LYOLLA_QUERY_LOG_RETENTION_DAYS", 30)  # 0이면 지우지 않음
+# 정규화한 첫 질문이 답변표와 정확히 같으면 검색/LLM 없이 바로 답한다
+FAQ_ENABLED = _env_bool("LYOLLA_FAQ", True)
+FAQ_DIR = _env_path("LYOLLA_FAQ_DIR", "faq")
+
+# -------------------------------
+# 공지사항 크롤러
+# -------------------------------
+CRAWL_MAX_WORKERS = _env_int("LYOLLA_CRAWL_MAX_WORKERS", 8)  # 1이면 순차 크롤링
+CRAWL_RATE_LIMIT = _env_float("LYOLLA_CRAWL_RATE_LIMIT", 5.0)  # 호스트당 초당 요청 수 (0이면 제한 없음)
+CRAWL_MAX_RETRIES = _env_int("LYOLLA_CRAWL_MAX_RETRIES", 3)
+CRAWL_TIMEOUT = _env_float("LYOLLA_CRAWL_TIMEOUT", 10.0)
+CRAWL_REVALIDATE_DAYS = _env_int("LYOLLA_CRAWL_REVALIDATE_DAYS", 30)  # 증분 모드에서 바뀌었는지 다시 확인할 최근 공지 기간(일)
@@ -0,0 +1,131 @@
+"""프롬프트에 들어갈 컨텍스트/대화 이력 조립 (토큰 예산 안에서)"""
+from dataclasses import dataclass, field
+from typing import List, Tuple
+import re
+
+from langchain.schema import Document
+
+from .chunking import CHARS_PER_TOKEN, estimate_tokens
+
+_BLANK_LINES_RE = re.compile(r"\n\s*\n")
+
+
+@dataclass
+class _Segment:
+    """같은 출처의 인접/겹치는 청크를 이어 붙인 구간"""
+    rank: int
+    start: int
+    text: str
+    docs: List[Document] = field(default_factory=list)
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.text)
+
+
+@dataclass
+class PackedPrompt:
+    context: str
+    history: str
+    docs: List[Document]  # 실제로 컨텍스트에 들어간 청크 (관련도 순)
+    context_tokens: int
+    history_tokens: int
+
+
+def _source_key(doc: Document) -> Tuple[str, str]:
+    meta = doc.metadata
+    return (meta.get("source") or meta.get("url", ""), meta.get("title", ""))
+
+
+def merge_neighbors(docs: List[Document]) -> List[_Segment]:
+    """같은 출처에서 나온 청크 중 원문 위치(start_index)가 겹치거나 맞닿은 것을 합친다
+
+    반환 구간은 포함된 청크 중 가장 높은 순위 기준으로 정렬된다.
+    """
+    groups = {}
+    for rank, doc in enumerate(docs):
+        groups.setdefault(_source_key(doc), []).append((rank, doc))
+
+    segments = []
+    for items in groups.values():
+        # start_index 가 없는 청크(예전 인덱스)는 합치지 않고 그대로 둔다
+        positioned = sorted(
+            (item for item in items if "start_index" in item[1].metadata),
+            key=lambda item: item[1].metadata["start_index"],
+        )
+        for rank, doc in items:
+            if "start_index" not in doc.metadata:
+                segments.append(_Segment(rank, 0, doc.page_content, [doc]))
+
+        current = None
+        for rank, doc in positioned:
+            start, text = doc.metadata["start_index"], doc.page_content
+            if current is not None and start <= current.end + 1:
+                overlap = current.end - start
+                if start + len(text) > current.end:
+                    current.text += text[overlap:] if overlap >= 0 else "\n" + text
+                current.rank = min(current.rank, rank)
+                current.docs.append(doc)
+                continue
+            current = _Segment(rank, start, text, [doc])
+            segments.append(current)
+
+    return sorted(segments, key=lambda s: s.rank)
+
+
+def _render(segment: _Segment) -> str:
+    """제목/날짜/링크 한 줄 + 본문 (본문 첫 줄의 '[제목] ...' 은 중복이라 뺀다)"""
+    meta = segment.docs[0].metadata
+    header = meta.get("title", "")
+    if meta.get("date"):
+        header += f" ({meta['date']})"
+    link = meta.get("source") or meta.get("url", "")
+    if link:
+        header += f" <{link}>"
+
+    body = _BLANK_LINES_RE.sub("\n", segment.text).strip()
+    if body.startswith("[제목]"):
+        body = body.split("\n", 1)[1].strip() if "\n" in body else ""
+    return f"## {header}\n{body}" if body else f"## {header}"
+
+
+def _truncate(text: str, tokens: int) -> str:
+    return text[: max(0, int(tokens * CHARS_PER_TOKEN))].rstrip() + " …"
+
+
+def pack_context(docs: List[Document], budget: int) -> Tuple[str, List[Document], int]:
+    """관련도 순으로 예산(토큰)을 채운다. 안 들어가는 구간은 건너뛰고 더 짧은 것을 시도한다"""
+    blocks, used_docs, used = [], [], 0
+    for segment in merge_neighbors(docs):
+        block = _render(segment)
+        tokens = estimate_tokens(block)
+        if used + tokens > budget:
+            if blocks:
+                continue
+            # 가장 관련도 높은 구간 하나가 예산보다 길면 잘라서라도 넣는다
+            block = _truncate(block, budget)
+            tokens = estimate_tokens(block)
+        blocks.append(block)
+        used_docs.extend(segment.docs)
+        used += tokens
+    return "\n\n".join(blocks), used_docs, used
+
+
+def pack_history(history: list, budget: int, max_turns: int) -> Tuple[str, int]:
+    """최근 대화부터 거꾸로 채워서 예산을 넘으면 오래된 턴부터 버린다"""
+    lines, used = [], 0
+    for h in reversed(history[-max_turns:] if max_turns > 0 else []):
+        line = f"{h['role']}: {h['content']}"
+        tokens = estimate_tokens(line)
+        if used + tokens > budget:
+            break
+        lines.append(line)
+        used += tokens
+    return "\n".join(reversed(lines)), used
+
+
+def pack_prompt(docs: List[Document], history: list, context_budget: int,
+                history_budget: int, max_turns: int) -> PackedPrompt:
+    context, used_docs, context_tokens = pack_context(docs, context_budget)
+    history_text, history_tokens = pack_history(history, history_budget, max_turns)
+    return PackedPrompt(context, history_text, used_docs, context_tokens, history_tokens)
@@ -0,0 +1,100 @@
+"""요청 지연 시간 예산 + 예산을 넘겼을 때의 대체 답변
+
+- Deadline: 요청 전체 예산과 LLM 단계별 마감(첫 토큰까지 / 답변 완료까지)을 monotonic 시각으로 계산
+- fallback_answer: LLM 없이 검색된 청크만으로 만드는 답변 (제목 + 핵심 발췌 + 출처 <a> 링크)
+"""
+from html import escape
+from typing import List, Optional, Tuple
+import re
+import time
+
+from langchain.schema import Document
+
+from .config import (
+    REQUEST_DEADLINE,
+    LLM_START_DEADLINE,
+    LLM_FINISH_DEADLINE,
+    FALLBACK_MAX_SOURCES,
+    FALLBACK_SNIPPET_CHARS,
+)
+from .lexical_index import query_terms
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?。])\s+|\n+")
+_HEADER_RE = re.compile(r"^\[(제목|분류)\]")  # chunking.detail_to_text 가 붙이는 머리줄 (제목은 따로 표시)
+
+
+class DeadlineExceeded(Exception):
+    """LLM 단계가 마감을 넘김 (stage: llm_start / llm_finish)"""
+
+    def __init__(self, stage: str):
+        super().__init__(f"응답 생성이 마감 시간을 넘겼습니다 ({stage})")
+        self.stage = stage
+
+
+class Deadline:
+    """요청 하나의 지연 시간 예산 (0 이하 값은 제한 없음)"""
+
+    def __init__(self, budget: float = REQUEST_DEADLINE):
+        self.expires = time.monotonic() + budget if budget > 0 else None
+
+    def _at(self, limit: float) -> Optional[float]:
+        now = time.monotonic()
+        candidates = [t for t in (self.expires, now + limit if limit > 0 else None) if t is not None]
+        return min(candidates) if candidates else None
+
+    def llm(self, start: float = LLM_START_DEADLINE,
+            finish: float = LLM_FINISH_DEADLINE) -> Tuple[Optional[float], Optional[float]]:
+        """LLM 단계를 시작하는 지금 기준 (첫 토큰 마감, 완료 마감) 시각. 요청 예산이 더 짧으면 그쪽"""
+        finish_at = self._at(finish)
+        start_at = self._at(start)
+        if start_at is None or (finish_at is not None and finish_at < start_at):
+            start_at = finish_at
+        return start_at, finish_at
+
+    @staticmethod
+    def left(at: Optional[float]) -> Optional[float]:
+        """마감까지 남은 초 (제한 없으면 None)"""
+        return None if at is None else max(0.0, at - time.monotonic())
+
+
+# -------------------------------
+# 대체 답변
+# -------------------------------
+def _snippet(text: str, terms: List[str], limit: int) -> str:
+    """질문 단어가 가장 많이 든 문장부터 limit 글자까지 (같으면 앞 문장)"""
+    sentences = [s.strip() for s in _SENTENCE_RE.split(text) if s.strip() and not _HEADER_RE.match(s.strip())]
+    if not sentences:
+        return ""
+    scores = [sum(term in s.lower() for term in terms) for s in sentences]
+    best = scores.index(max(scores))
+    snippet = ""
+    for sentence in sentences[best:]:
+        snippet = f"{snippet} {sentence}".strip()
+        if len(snippet) >= limit:
+            break
+    return snippet if len(snippet) <= limit else snippet[:limit].rstrip() + "…"
+
+
+def fallback_answer(question: str, docs: List[Document], max_sources: int = FALLBACK_MAX_SOURCES,
+                    snippet_chars: int = FALLBACK_SNIPPET_CHARS) -> str:
+    """검색 결과만으로 만드는 결정적인 답변 (같은 출처의 청크는 하나로 묶음, 관련도 순)"""
+    groups = {}
+    for doc in docs:
+        meta = doc.metadata
+        key = (meta.get("source") or meta.get("url", ""), meta.get("title", ""))
+        groups.setdefault(key, []).append(doc)
+    if not groups:
+        return "지금은 답변을 만들기 어려워요. 잠시 후 다시 질문해 주세요."
+
+    terms = [t for t in query_terms(question) if len(t) > 1]
+    lines = ["답변 생성이 늦어져 관련 자료를 먼저 안내해 드려요.", ""]
+    for i, ((url, title), group) in enumerate(list(groups.items())[:max_sources], start=1):
+        title = escape(title or "관련 문서")
+        date = group[0].metadata.get("date")
+        heading = f'<a href="{escape(url)}">{title}</a>' if url else title
+        lines.append(f"{i}. **{heading}**" + (f" ({escape(date)})" if date else ""))
+        snippet = _snippet("\n".join(d.page_content for d in group), terms, snippet_chars)
+        if snippet:
+            lines.append(f"   {escape(snippet)}")
+    lines += ["", "자세한 내용은 링크에서 확인해 주세요."]
+    return "\n".join(lines)
@@ -0,0 +1,83 @@
+from pathlib import Path
+from typing import List, Union
+import json
+import mmap
+import os
+
+import numpy as np
+from langchain.schema import Document
+from langchain_community.docstore.base import Docstore
+
+DOCSTORE_FILE = "docstore.bin"
+OFFSETS_FILE = "docstore.offsets.npy"
+IDS_FILE = "docstore.ids.json"
+DOCSTORE_FILES = [DOCSTORE_FILE, OFFSETS_FILE, IDS_FILE]
+
+
+def _replace(tmp: Path, path: Path):
+    # 기존 파일을 mmap 중인 프로세스가 있어도 안전하도록 새 파일로 교체
+    os.replace(tmp, path)
+
+
+def write_docstore(path: Path, ids: List[str], docs: List[Document]):
+    """청크를 평평한 파일(JSON 레코드 연속) + 오프셋 테이블로 저장
+
+    ids[i] 는 FAISS 인덱스의 i 번째 벡터에 대응한다.
+    """
+    path = Path(path)
+    offsets = [0]
+    tmp_bin = path / (DOCSTORE_FILE + ".tmp")
+    with open(tmp_bin, "wb") as f:
+        for doc in docs:
+            record = json.dumps(
+                {"page_content": doc.page_content, "metadata": doc.metadata},
+                ensure_ascii=False,
+            ).encode("utf-8")
+            f.write(record)
+            offsets.append(offsets[-1] + len(record))
+
+    tmp_offsets = path / (OFFSETS_FILE + ".tmp")
+    with open(tmp_offsets, "wb") as f:
+        np.save(f, np.asarray(offsets, dtype=np.int64))
+    tmp_ids = path / (IDS_FILE + ".tmp")
+    tmp_ids.write_text(json.dumps(ids, ensure_ascii=False), encoding="utf-8")
+
+    _replace(tmp_bin, path / DOCSTORE_FILE)
+    _replace(tmp_offsets, path / OFFSETS_FILE)
+    _replace(tmp_ids, path / IDS_FILE)
+
+
+class MmapDocstore(Docstore):
+    """오프셋 테이블로 필요한 레코드만 mmap 에서 읽는 읽기 전용 도큐스토어
+
+    pickle 역직렬화가 없고, 여러 워커가 OS 페이지 캐시를 공유한다.
+    """
+
+    def __init__(self, path: Path):
+        path = Path(path)
+        self.ids: List[str] = json.loads((path / IDS_FILE).read_text(encoding="utf-8"))
+        self._rows = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        self._offsets = np.load(path / OFFSETS_FILE, mmap_mode="r")
+        self._file = open(path / DOCSTORE_FILE, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def _read(self, row: int) -> Document:
+        start, end = int(self._offsets[row]), int(self._offsets[row + 1])
+        record = json.loads(self._mm[start:end].decode("utf-8"))
+        return Document(
+            id=self.ids[row],
+            page_content=record["page_content"],
+            metadata=record["metadata"],
+        )
+
+    def search(self, search: str) -> Union[str, Document]:
+        row = self._rows.get(search)
+        if row is None:
+            return f"ID {search} not found."
+        return self._read(row)
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
@@ -0,0 +1,131 @@
+from pathlib import Path
+from typing import List
+import json
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from .config import EMBEDDING_MODEL, EMBEDDING_BACKEND, EMBEDDING_SOCKET, ONNX_MODEL_DIR, ONNX_THREADS
+
+ONNX_MODEL_FILE = "model.int8.onnx"
+ONNX_CONFIG_FILE = "onnx_config.json"
+
+
+def torch_embeddings(model_name: str = EMBEDDING_MODEL) -> Embeddings:
+    """PyTorch(sentence-transformers) 임베딩. torch import 비용이 커서 필요할 때만 불러온다"""
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(model_name=model_name, model_kwargs={"device": "cpu"})
+
+
+class OnnxEmbeddings(Embeddings):
+    """ONNX Runtime + int8 동적 양자화 모델로 CPU 임베딩 (torch 불필요)
+
+    export_onnx_embeddings 명령으로 만든 디렉터리를 읽는다.
+    ko-sbert-nli 와 같은 mean pooling 을 적용한다.
+    """
+
+    def __init__(self, model_dir: Path = ONNX_MODEL_DIR, batch_size: int = 32):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        config = json.loads((model_dir / ONNX_CONFIG_FILE).read_text(encoding="utf-8"))
+        # 매니페스트/임베딩 캐시는 원본 모델 이름 기준으로 맞춘다
+        self.model_name = config["model_name"]
+        self.batch_size = batch_size
+
+        options = ort.SessionOptions()
+        if ONNX_THREADS:
+            options.intra_op_num_threads = ONNX_THREADS
+        self.session = ort.InferenceSession(
+            str(model_dir / ONNX_MODEL_FILE), options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=config["max_length"])
+        self.tokenizer.enable_padding(pad_id=config["pad_id"], pad_token=config["pad_token"])
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.asarray([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.asarray([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.asarray([e.type_ids for e in encodings], dtype=np.int64)
+
+        hidden = self.session.run(None, feeds)[0]  # (batch, seq, dim)
+        mask = attention_mask[:, :, None].astype(np.float32)
+        summed = (hidden * mask).sum(axis=1)
+        return summed / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for i in range(0, len(texts), self.batch_size):
+            vectors.extend(self._encode(texts[i:i + self.batch_size]).tolist())
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
+
+
+def make_embeddings(backend: str = EMBEDDING_BACKEND) -> Embeddings:
+    """설정값에 따라 질의 임베딩 백엔드 생성"""
+    if backend == "onnx":
+        return OnnxEmbeddings()
+    if backend == "torch":
+        return torch_embeddings()
+    raise ValueError(f"알 수 없는 임베딩 백엔드: {backend}")
+
+
+def query_embeddings(backend: str = EMBEDDING_BACKEND) -> Embeddings:
+    """질의 임베딩: 임베딩 서버 소켓이 지정돼 있으면 서버 사용 (실패 시 프로세스 내부 모델)"""
+    if EMBEDDING_SOCKET:
+        from .embedding_server import RemoteEmbeddings
+
+        return RemoteEmbeddings(fallback=lambda: make_embeddings(backend))
+    return make_embeddings(backend)
+
+
+def export_onnx(model_name: str = EMBEDDING_MODEL, out_dir: Path = ONNX_MODEL_DIR,
+                max_length: int = 128) -> Path:
+    """HuggingFace 모델을 ONNX로 내보내고 int8 동적 양자화까지 적용"""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+
+    sample = tokenizer(["예시 문장"], return_tensors="pt")
+    input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+    dynamic_axes = {n: {0: "batch", 1: "seq"} for n in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "seq"}
+
+    fp32_path = out_dir / "model.onnx"
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[n] for n in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+    quantize_dynamic(str(fp32_path), str(out_dir / ONNX_MODEL_FILE), weight_type=QuantType.QInt8)
+    fp32_path.unlink(missing_ok=True)
+
+    tokenizer.save_pretrained(str(out_dir))  # tokenizer.json (fast tokenizer)
+    config = {
+        "model_name": model_name,
+        "max_length": max_length,
+        "pad_id": tokenizer.pad_token_id,
+        "pad_token": tokenizer.pad_token,
+        "pooling": "mean",
+    }
+    (out_dir / ONNX_CONFIG_FILE).write_text(json.dumps(config, ensure_ascii=False, indent=2), encoding="utf-8")
+    return out_dir / ONNX_MODEL_FILE
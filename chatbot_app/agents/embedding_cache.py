@@ -0,0 +1,137 @@
+from pathlib import Path
+from typing import List
+import hashlib
+import json
+import os
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class CachedEmbeddings(Embeddings):
+    """청크 임베딩 디스크 캐시: (model_name, sha256(청크 텍스트)) → float32 벡터
+
+    - vectors.f32 : float32 벡터를 행 단위로 이어 붙인 파일
+    - index.json  : 키 → 행 번호 오프셋 인덱스 (+ 차원 수)
+
+    인덱스 재생성 시 새로 생기거나 바뀐 청크만 실제 모델로 임베딩한다.
+    질의 임베딩은 캐시하지 않고 원래 모델에 그대로 위임한다.
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str, cache_dir: Path):
+        self.base = embeddings
+        self.model_name = model_name
+        safe_name = model_name.replace("/", "__")
+        self.cache_dir = Path(cache_dir) / safe_name
+        self.vectors_path = self.cache_dir / "vectors.f32"
+        self.index_path = self.cache_dir / "index.json"
+        self.reused = 0
+        self.embedded = 0
+
+    # -------------------------------
+    # 캐시 파일 입출력
+    # -------------------------------
+    def _key(self, text: str) -> str:
+        h = hashlib.sha256()
+        h.update(self.model_name.encode("utf-8"))
+        h.update(b"\0")
+        h.update(text.encode("utf-8"))
+        return h.hexdigest()
+
+    def _load_index(self) -> dict:
+        if self.index_path.exists() and self.vectors_path.exists():
+            try:
+                index = json.loads(self.index_path.read_text(encoding="utf-8"))
+                if self._trim_vectors(index):
+                    return index
+            except Exception:
+                pass
+        # 인덱스가 없거나 깨졌으면 벡터 파일과 짝이 맞지 않으므로 비우고 새로 시작
+        self.vectors_path.unlink(missing_ok=True)
+        return {"dim": None, "rows": {}}
+
+    def _trim_vectors(self, index: dict) -> bool:
+        """벡터 파일을 인덱스가 아는 행 수에 맞춘다 (짝이 맞지 않으면 False)
+
+        벡터를 덧붙인 뒤 인덱스를 저장하기 전에 죽으면 파일 끝에 인덱스에 없는 행이 남는다.
+        잘라내지 않으면 다음 추가분의 행 번호가 실제 위치와 어긋난다.
+        """
+        if index["dim"] is None:
+            return not index["rows"]
+        expected = len(index["rows"]) * index["dim"] * 4
+        size = self.vectors_path.stat().st_size
+        if size < expected:
+            return False
+        if size > expected:
+            os.truncate(self.vectors_path, expected)
+        return True
+
+    def _save_index(self, index: dict):
+        tmp = self.index_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(index), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+    def _read_vectors(self, dim: int) -> np.ndarray:
+        if not self.vectors_path.exists() or self.vectors_path.stat().st_size == 0:
+            return np.empty((0, dim), dtype=np.float32)
+        return np.memmap(self.vectors_path, dtype=np.float32, mode="r").reshape(-1, dim)
+
+    def compact(self, live_texts: List[str]):
+        """현재 코퍼스에서 쓰이지 않는 행이 절반을 넘으면 살아있는 행만 다시 쓴다"""
+        index = self._load_index()
+        rows = index["rows"]
+        live_keys = {self._key(t) for t in live_texts}
+        if not rows or len(live_keys) * 2 >= len(rows):
+            return
+        dim = index["dim"]
+        old = self._read_vectors(dim)
+        keys = [k for k in rows if k in live_keys]
+        new_vectors = np.ascontiguousarray(old[[rows[k] for k in keys]], dtype=np.float32)
+        del old
+
+        tmp = self.vectors_path.with_suffix(".f32.tmp")
+        new_vectors.tofile(tmp)
+        os.replace(tmp, self.vectors_path)
+        index["rows"] = {k: i for i, k in enumerate(keys)}
+        self._save_index(index)
+
+    # -------------------------------
+    # Embeddings 인터페이스
+    # -------------------------------
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        index = self._load_index()
+        rows = index["rows"]
+        keys = [self._key(t) for t in texts]
+
+        # 캐시에 없는 청크만 한 번에 임베딩 (중복 텍스트는 한 번만)
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in rows and key not in missing:
+                missing[key] = text
+
+        if missing:
+            new_vectors = np.asarray(
+                self.base.embed_documents(list(missing.values())), dtype=np.float32
+            )
+            if index["dim"] is None:
+                index["dim"] = int(new_vectors.shape[1])
+            start = len(rows)
+            with open(self.vectors_path, "ab") as f:
+                new_vectors.tofile(f)
+            for i, key in enumerate(missing):
+                rows[key] = start + i
+            self._save_index(index)
+
+        self.embedded = len(missing)
+        self.reused = len(set(keys)) - len(missing)
+
+        if not texts:
+            return []
+        vectors = self._read_vectors(index["dim"])
+        result = vectors[[rows[k] for k in keys]].tolist()
+        del vectors
+        return result
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.base.embed_query(text)
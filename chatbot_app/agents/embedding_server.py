@@ -0,0 +1,272 @@
+"""여러 워커가 공유하는 질의 임베딩 서버 (유닉스 소켓)
+
+모델은 서버 프로세스에서 한 번만 로드하고, 여러 워커에서 동시에 들어온 요청을
+최대 EMBEDDING_BATCH_MAX 문장 / EMBEDDING_BATCH_WAIT_MS 대기까지 모아 한 번에 임베딩한다.
+
+프로토콜: 길이(4바이트, big-endian) + 본문 프레임
+  요청  {"texts": [...]} 또는 {"ping": true}
+  응답  헤더 JSON 프레임 {"n", "dim"} / {"error"} + float32 벡터 바이트 프레임
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+import asyncio
+import json
+import os
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from .config import (
+    EMBEDDING_MODEL,
+    EMBEDDING_SOCKET,
+    EMBEDDING_BATCH_MAX,
+    EMBEDDING_BATCH_WAIT_MS,
+    EMBEDDING_SERVER_TIMEOUT,
+    EMBEDDING_SERVER_RETRY,
+)
+from .metrics import EMBEDDING_FALLBACKS
+
+_LEN = struct.Struct("!I")
+
+
+def _frame(payload: bytes) -> bytes:
+    return _LEN.pack(len(payload)) + payload
+
+
+# -------------------------------
+# 서버
+# -------------------------------
+class MicroBatcher:
+    """동시에 들어온 요청을 모아 한 번의 embed_documents 호출로 처리"""
+
+    def __init__(self, embeddings: Embeddings, max_batch: int, max_wait: float):
+        self.embeddings = embeddings
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self.queue: asyncio.Queue = asyncio.Queue()
+        # 모델 호출은 한 번에 하나 (배치 안에서 병렬화)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+        self.batches = 0
+        self.texts = 0
+        self._dim: Optional[int] = None
+
+    async def dim(self) -> int:
+        """벡터 차원 (아직 임베딩한 적이 없으면 한 문장으로 알아낸다)"""
+        if self._dim is None:
+            await self.embed(["dim"])
+        return self._dim
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:  # 빈 요청은 모델을 부르지 않는다
+            return np.empty((0, await self.dim()), dtype=np.float32)
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((texts, future))
+        return await future
+
+    async def _collect(self):
+        """첫 요청을 받은 뒤 max_wait 동안 또는 max_batch 문장이 찰 때까지 더 모은다"""
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        count = len(batch[0][0])
+        deadline = loop.time() + self.max_wait
+        while count < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            count += len(item[0])
+        return batch
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            texts = [text for item, _ in batch for text in item]
+            try:
+                vectors = await loop.run_in_executor(self.executor, self.embeddings.embed_documents, texts)
+                vectors = np.asarray(vectors, dtype=np.float32)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self._dim = int(vectors.shape[1])
+            self.batches += 1
+            self.texts += len(texts)
+            start = 0
+            for item, future in batch:
+                if not future.done():  # 클라이언트가 끊은 경우
+                    future.set_result(vectors[start:start + len(item)])
+                start += len(item)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "mean_batch": self.texts / self.batches if self.batches else 0.0,
+        }
+
+
+async def _handle(batcher: MicroBatcher, model_name: str, reader, writer):
+    try:
+        while True:
+            try:
+                (size,) = _LEN.unpack(await reader.readexactly(_LEN.size))
+                request = json.loads(await reader.readexactly(size))
+            except asyncio.IncompleteReadError:
+                break
+            body = b""
+            if request.get("ping"):
+                header = {"model_name": model_name, **batcher.stats()}
+            else:
+                try:
+                    vectors = await batcher.embed(list(request["texts"]))
+                    header = {"n": int(vectors.shape[0]), "dim": int(vectors.shape[1])}
+                    body = vectors.tobytes()
+                except Exception as e:
+                    header = {"error": str(e)}
+            writer.write(_frame(json.dumps(header).encode("utf-8")) + _frame(body))
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve(embeddings: Embeddings, path: str = EMBEDDING_SOCKET,
+                max_batch: int = EMBEDDING_BATCH_MAX, max_wait_ms: float = EMBEDDING_BATCH_WAIT_MS):
+    """유닉스 소켓에서 임베딩 요청 처리 (종료될 때까지 실행)"""
+    model_name = getattr(embeddings, "model_name", EMBEDDING_MODEL)
+    batcher = MicroBatcher(embeddings, max_batch, max_wait_ms / 1000)
+    if os.path.exists(path):
+        os.unlink(path)  # 이전 실행이 남긴 소켓 파일
+    server = await asyncio.start_unix_server(
+        lambda r, w: _handle(batcher, model_name, r, w), path=path
+    )
+    os.chmod(path, 0o660)
+    print(f"임베딩 서버 시작: {path} (모델 {model_name}, 배치 최대 {max_batch}개 / {max_wait_ms}ms)")
+    worker = asyncio.create_task(batcher.run())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        worker.cancel()
+        print(f"임베딩 서버 종료: {batcher.stats()}")
+
+
+# -------------------------------
+# 클라이언트
+# -------------------------------
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("임베딩 서버 연결이 끊어졌습니다.")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def _call(sock: socket.socket, request: dict) -> Tuple[dict, bytes]:
+    sock.sendall(_frame(json.dumps(request, ensure_ascii=False).encode("utf-8")))
+    (size,) = _LEN.unpack(_recv_exact(sock, _LEN.size))
+    header = json.loads(_recv_exact(sock, size))
+    (size,) = _LEN.unpack(_recv_exact(sock, _LEN.size))
+    return header, _recv_exact(sock, size)
+
+
+def ping(path: str = EMBEDDING_SOCKET, timeout: float = EMBEDDING_SERVER_TIMEOUT) -> dict:
+    """서버 상태 (모델 이름, 처리한 배치/문장 수)"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        return _call(sock, {"ping": True})[0]
+
+
+class RemoteEmbeddings(Embeddings):
+    """임베딩 서버 클라이언트. 서버가 없거나 실패하면 프로세스 내부 모델로 대신 임베딩
+
+    스레드마다 연결 하나를 유지한다. 내부 모델은 처음 실패했을 때만 로드한다.
+    """
+
+    def __init__(self, fallback: Callable[[], Embeddings], path: str = EMBEDDING_SOCKET,
+                 model_name: str = EMBEDDING_MODEL, timeout: float = EMBEDDING_SERVER_TIMEOUT,
+                 retry_interval: float = EMBEDDING_SERVER_RETRY):
+        self.path = path
+        self.model_name = model_name
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self._fallback_factory = fallback
+        self._fallback: Optional[Embeddings] = None
+        self._fallback_lock = threading.Lock()
+        self._local = threading.local()
+        self._down_until = 0.0
+
+    @property
+    def fallback(self) -> Embeddings:
+        if self._fallback is None:
+            with self._fallback_lock:
+                if self._fallback is None:
+                    self._fallback = self._fallback_factory()
+        return self._fallback
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            # 인덱스와 다른 모델을 띄운 서버는 쓰지 않는다
+            served = _call(sock, {"ping": True})[0].get("model_name")
+            if served != self.model_name:
+                raise ConnectionError(f"임베딩 서버 모델이 다릅니다: {served} (필요: {self.model_name})")
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    def _request(self, texts: List[str]) -> np.ndarray:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = self._local.sock = self._connect()
+        try:
+            header, body = _call(sock, {"texts": texts})
+        except BaseException:
+            # 응답이 늦게 도착해 다음 요청과 섞이지 않도록 연결을 버린다
+            sock.close()
+            self._local.sock = None
+            raise
+        if "error" in header:
+            raise RuntimeError(header["error"])
+        return np.frombuffer(body, dtype=np.float32).reshape(header["n"], header["dim"])
+
+    def _remote(self, texts: List[str]) -> Optional[np.ndarray]:
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            return self._request(texts)
+        except (OSError, RuntimeError, ValueError) as e:
+            self._down_until = time.monotonic() + self.retry_interval
+            print(f"임베딩 서버 사용 불가, {self.retry_interval:.0f}초 동안 내부 모델 사용: {e}")
+            return None
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        vectors = self._remote(texts)
+        if vectors is None:
+            EMBEDDING_FALLBACKS.inc()
+            return self.fallback.embed_documents(texts)
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        vectors = self._remote([text])
+        if vectors is None:
+            EMBEDDING_FALLBACKS.inc()
+            return self.fallback.embed_query(text)
+        return vectors[0].tolist()
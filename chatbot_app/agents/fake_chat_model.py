@@ -0,0 +1,59 @@
+"""네트워크 없이 Gemini 응답 시간을 흉내 내는 벤치마크용 채팅 모델
+
+첫 토큰까지 first_token_latency 초, 이후 초당 tokens_per_second 개 속도로 토큰을 낸다.
+답변 내용은 프롬프트 길이에서 정해지는 고정 문장이라 결과가 재현된다.
+"""
+from typing import Any, AsyncIterator, Iterator, List, Optional
+import asyncio
+import time
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+_WORDS = ["도서관", "이용", "안내", "드립니다.", "자세한", "내용은", "홈페이지를", "참고해", "주세요."]
+
+
+class FakeChatModel(BaseChatModel):
+    first_token_latency: float = 0.8
+    tokens_per_second: float = 60.0
+    answer_tokens: int = 120
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-gemini"
+
+    def _tokens(self, messages: List[BaseMessage]) -> List[str]:
+        prompt_len = sum(len(str(m.content)) for m in messages)
+        return [_WORDS[(prompt_len + i) % len(_WORDS)] + " " for i in range(self.answer_tokens)]
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        tokens = self._tokens(messages)
+        time.sleep(self.first_token_latency + self._token_delay() * (len(tokens) - 1))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(tokens)))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs: Any) -> ChatResult:
+        tokens = self._tokens(messages)
+        await asyncio.sleep(self.first_token_latency + self._token_delay() * (len(tokens) - 1))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(tokens)))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.first_token_latency)
+        for i, token in enumerate(self._tokens(messages)):
+            if i:
+                time.sleep(self._token_delay())
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.first_token_latency)
+        for i, token in enumerate(self._tokens(messages)):
+            if i:
+                await asyncio.sleep(self._token_delay())
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
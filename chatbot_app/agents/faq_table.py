@@ -0,0 +1,95 @@
+"""인기 첫 질문의 미리 만든 답변표 (manage.py build_faq)
+
+faq/faq-<인덱스 버전>.json
+{"index_version", "llm_model", "created", "entries": {정규화 질문: {"question", "answer", "sources", "count"}}}
+
+서비스 중인 인덱스 버전의 파일만 쓰므로, 인덱스가 바뀌면 build_faq 를 다시 돌릴 때까지 답변표는 쓰지 않는다.
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+import json
+import os
+import threading
+import time
+
+from .config import FAQ_DIR, INDEX_KEEP_VERSIONS, INDEX_RELOAD_INTERVAL, LLM_MODEL
+from .query_log import normalize_question
+
+
+def faq_path(directory: Path, version: str) -> Path:
+    return Path(directory) / f"faq-{version}.json"
+
+
+def write_faq(entries: Dict[str, dict], version: str, directory: Path = FAQ_DIR,
+              keep: int = INDEX_KEEP_VERSIONS) -> Path:
+    """답변표를 원자적으로 저장하고 오래된 버전의 파일은 keep 개만 남긴다"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = faq_path(directory, version)
+    payload = {
+        "index_version": version,
+        "llm_model": LLM_MODEL,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "entries": entries,
+    }
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+    old = sorted(directory.glob("faq-*.json"), key=lambda p: p.stat().st_mtime, reverse=True)[keep:]
+    for p in old:
+        p.unlink(missing_ok=True)
+    return path
+
+
+class FaqTable:
+    """정규화한 질문이 정확히 같을 때만 답한다 (임베딩 / LLM 호출 없음)
+
+    build_faq 가 새 파일을 쓰면 check_interval 초 안에 다시 읽는다.
+    """
+
+    def __init__(self, directory: Path = FAQ_DIR, check_interval: float = INDEX_RELOAD_INTERVAL):
+        self.directory = Path(directory)
+        self.check_interval = check_interval
+        self._version = None
+        self._mtime = None
+        self._entries: Dict[str, dict] = {}
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _refresh(self, version: str):
+        now = time.monotonic()
+        if version == self._version and now - self._checked < self.check_interval:
+            return
+        with self._lock:
+            self._checked = now
+            path = faq_path(self.directory, version)
+            try:
+                mtime = path.stat().st_mtime
+            except FileNotFoundError:
+                self._version, self._mtime, self._entries = version, None, {}
+                return
+            if version == self._version and mtime == self._mtime:
+                return
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                entries = data["entries"] if data.get("index_version") == version else {}
+            except (OSError, ValueError, KeyError) as e:
+                print(f"FAQ 답변표 로드 실패: {e}")
+                entries = {}
+            self._version, self._mtime, self._entries = version, mtime, entries
+
+    def lookup(self, question: str, version: str) -> Optional[dict]:
+        self._refresh(version)
+        if not self._entries:
+            return None
+        entry = self._entries.get(normalize_question(question))
+        if entry is None:
+            return None
+        return {"answer": entry["answer"], "sources": entry["sources"], "faq": True}
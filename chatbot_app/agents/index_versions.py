@@ -0,0 +1,96 @@
+"""버전별 인덱스 디렉터리 + 원자적 게시
+
+faiss_index/
+├── CURRENT          # 현재 게시된 버전 이름 (os.replace 로 원자적 교체)
+├── .build.lock      # 빌드 직렬화용 파일 락 (flock)
+└── versions/<버전>/  # index.faiss, docstore.*, bm25.json, manifest.json
+"""
+from pathlib import Path
+from typing import Optional
+import os
+import shutil
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경
+    fcntl = None
+    import msvcrt
+
+
+class BuildLock:
+    """프로세스 간 인덱스 빌드 락 (파일 존재 여부가 아닌 OS 파일 락)
+
+    with BuildLock(path, blocking=False) as acquired: ...
+    """
+
+    def __init__(self, path: Path, blocking: bool = True):
+        self.path = Path(path)
+        self.blocking = blocking
+        self._fd = None
+        self.acquired = False
+
+    def __enter__(self) -> bool:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                flags = fcntl.LOCK_EX if self.blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+                fcntl.flock(self._fd, flags)
+            else:
+                mode = msvcrt.LK_LOCK if self.blocking else msvcrt.LK_NBLCK
+                msvcrt.locking(self._fd, mode, 1)
+            self.acquired = True
+        except OSError:
+            self.acquired = False
+        return self.acquired
+
+    def __exit__(self, *exc):
+        if self.acquired:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        os.close(self._fd)
+        return False
+
+
+def current_version(root: Path) -> Optional[str]:
+    pointer = Path(root) / "CURRENT"
+    try:
+        name = pointer.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    if name and (Path(root) / "versions" / name).is_dir():
+        return name
+    return None
+
+
+def current_index_path(root: Path) -> Optional[Path]:
+    name = current_version(root)
+    return Path(root) / "versions" / name if name else None
+
+
+def new_version_dir(root: Path) -> Path:
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    path = Path(root) / "versions" / name
+    path.mkdir(parents=True)
+    return path
+
+
+def publish_index(root: Path, version_dir: Path, keep: int = 3):
+    """CURRENT 포인터를 원자적으로 새 버전으로 바꾸고 오래된 버전 정리"""
+    root = Path(root)
+    tmp = root / f"CURRENT.{os.getpid()}.tmp"
+    tmp.write_text(Path(version_dir).name, encoding="utf-8")
+    os.replace(tmp, root / "CURRENT")
+
+    # 이미 mmap 으로 열려 있는 이전 버전은 삭제돼도 열린 프로세스에서는 계속 유효
+    versions = sorted(
+        (p for p in (root / "versions").iterdir() if p.is_dir()),
+        key=lambda p: p.stat().st_mtime,
+    )
+    for old in versions[:-keep] if keep > 0 else []:
+        if old.name != Path(version_dir).name:
+            shutil.rmtree(old, ignore_errors=True)
@@ -0,0 +1,93 @@
+from pathlib import Path
+from typing import List, Optional, Tuple
+import json
+import os
+import re
+
+from rank_bm25 import BM25Okapi
+
+# 토크나이저를 바꾸면 올려서 BM25 인덱스가 다시 만들어지도록 한다
+TOKENIZER_VERSION = 1
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+|[가-힣]+")
+
+
+def query_terms(text: str) -> List[str]:
+    """공백/기호 기준 단어 (영문 소문자, 숫자, 한글 덩어리)"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def tokenize_ko(text: str) -> List[str]:
+    """형태소 분석기 없이 쓰는 한국어 토크나이저
+
+    단어 자체 + 한글 단어의 글자 바이그램을 함께 쓴다.
+    '열람실은' / '열람실' 처럼 조사가 붙어도 바이그램이 겹쳐서 매칭된다.
+    """
+    tokens = []
+    for word in query_terms(text):
+        tokens.append(word)
+        if len(word) > 2 and "가" <= word[0] <= "힣":
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class LexicalIndex:
+    """청크 단위 BM25 인덱스 (FAISS 인덱스와 같은 청크 ID 사용)"""
+
+    def __init__(self, ids: List[str], tokens: List[List[str]]):
+        self.ids = ids
+        self.tokens = tokens
+        self._positions = {doc_id: i for i, doc_id in enumerate(ids)}
+        self._bm25 = BM25Okapi(tokens) if tokens else None
+
+    @classmethod
+    def build(cls, ids: List[str], texts: List[str]) -> "LexicalIndex":
+        return cls(list(ids), [tokenize_ko(t) for t in texts])
+
+    # -------------------------------
+    # 저장/로드 (pickle 대신 토큰 목록을 JSON으로 보관)
+    # -------------------------------
+    def save(self, path: Path):
+        tmp = Path(path).with_suffix(".json.tmp")
+        payload = {"version": TOKENIZER_VERSION, "ids": self.ids, "tokens": self.tokens}
+        tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "LexicalIndex":
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(payload["ids"], payload["tokens"])
+
+    # -------------------------------
+    # 검색
+    # -------------------------------
+    def search(self, query: str, k: int = 20,
+               ranges: Optional[List[Tuple[int, int]]] = None) -> List[Tuple[str, float]]:
+        """ranges 가 있으면 그 위치 구간(파티션) 안의 청크만 반환"""
+        q_tokens = tokenize_ko(query)
+        if self._bm25 is None or not q_tokens:
+            return []
+        scores = self._bm25.get_scores(q_tokens)
+        if ranges is None:
+            candidates = range(len(scores))
+        else:
+            candidates = [i for start, end in ranges for i in range(start, end)]
+        order = sorted(candidates, key=lambda i: scores[i], reverse=True)[:k]
+        return [(self.ids[i], float(scores[i])) for i in order if scores[i] > 0]
+
+    def covers(self, doc_id: str, terms: List[str]) -> bool:
+        """해당 청크가 질의 단어를 모두 포함하는지 (키워드 fast path 판정용)
+
+        조사가 붙은 형태도 인정하도록 단어 자체 또는 그 바이그램이 모두 있으면 포함으로 본다.
+        """
+        pos = self._positions.get(doc_id)
+        if pos is None:
+            return False
+        tokens = set(self.tokens[pos])
+        for term in terms:
+            if term in tokens:
+                continue
+            grams = tokenize_ko(term)[1:]
+            if not grams or not all(g in tokens for g in grams):
+                return False
+        return True
@@ -0,0 +1,141 @@
+"""단계별 지연 시간 / 게이지 지표 (Prometheus)
+
+with span("embed_query"):
+    ...
+
+span 은 lyolla_stage_seconds 히스토그램에 기록하고, 요청 단위 타이밍이 시작돼 있으면
+(start_timings) Server-Timing 헤더용으로도 모아 둔다.
+여러 워커 프로세스로 띄울 때는 PROMETHEUS_MULTIPROC_DIR 을 지정하면 /metrics 가 합산해서 보여준다.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+# 임베딩/검색(ms 단위)부터 LLM 응답(수 초)까지 한 히스토그램에 담을 수 있는 버킷
+_STAGE_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+_JOB_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+STAGE_SECONDS = Histogram(
+    "lyolla_stage_seconds", "요청 처리 단계별 소요 시간", ["stage"], buckets=_STAGE_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    "lyolla_request_seconds", "엔드포인트별 전체 응답 시간", ["endpoint"], buckets=_STAGE_BUCKETS
+)
+INFLIGHT_REQUESTS = Gauge(
+    "lyolla_inflight_requests", "처리 중인 요청 수", ["endpoint"], multiprocess_mode="livesum"
+)
+INDEX_BUILD_SECONDS = Histogram(
+    "lyolla_index_build_seconds", "인덱스 빌드 소요 시간", ["mode"], buckets=_JOB_BUCKETS
+)
+CRAWL_SECONDS = Histogram(
+    "lyolla_crawl_seconds", "공지사항 크롤링 소요 시간", ["mode"], buckets=_JOB_BUCKETS
+)
+ANSWER_CACHE_LOOKUPS = Counter(
+    "lyolla_answer_cache_lookups_total", "의미 기반 답변 캐시 조회", ["result"]
+)
+ANSWER_CACHE_ENTRIES = Gauge(
+    "lyolla_answer_cache_entries", "답변 캐시 항목 수", multiprocess_mode="livesum"
+)
+FAQ_LOOKUPS = Counter(
+    "lyolla_faq_lookups_total", "미리 만든 FAQ 답변표 조회 (첫 질문)", ["result"]
+)
+LLM_ACTIVE = Gauge(
+    "lyolla_llm_active", "진행 중인 LLM 호출 수", multiprocess_mode="livesum"
+)
+LLM_QUEUED = Gauge(
+    "lyolla_llm_queued", "LLM 호출 자리를 기다리는 요청 수", multiprocess_mode="livesum"
+)
+ADMISSION_REJECTED = Counter(
+    "lyolla_admission_rejected_total", "혼잡으로 거절한 요청", ["reason"]
+)
+COALESCED_REQUESTS = Counter(
+    "lyolla_coalesced_requests_total", "진행 중인 같은 질문에 합쳐진 요청"
+)
+DEADLINE_FALLBACKS = Counter(
+    "lyolla_deadline_fallbacks_total", "LLM 마감 초과로 검색 결과만으로 답한 요청", ["stage"]
+)
+FOLLOWUP_EMBEDDINGS = Counter(
+    "lyolla_followup_embeddings_total", "이어지는 질문의 직전 질문 벡터 (reused: 이력에서 재사용, embedded: 다시 임베딩)", ["result"]
+)
+EMBEDDING_FALLBACKS = Counter(
+    "lyolla_embedding_server_fallbacks_total", "임베딩 서버 대신 프로세스 내부 모델로 임베딩한 요청"
+)
+
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("lyolla_timings", default=None)
+
+
+# -------------------------------
+# 단계 타이머
+# -------------------------------
+def observe(stage: str, seconds: float):
+    STAGE_SECONDS.labels(stage).observe(seconds)
+    timings = _timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def span(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+# -------------------------------
+# 요청 단위 타이밍 (Server-Timing)
+# -------------------------------
+def start_timings() -> Dict[str, float]:
+    """현재 컨텍스트(요청)에서 span 결과를 모으기 시작
+
+    스레드 풀로 넘길 때는 contextvars.copy_context() 로 감싸야 같은 dict 에 기록된다.
+    """
+    timings: Dict[str, float] = {}
+    _timings.set(timings)
+    return timings
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
+
+
+@contextmanager
+def track_request(endpoint: str):
+    """처리 중 요청 수 게이지 + 전체 응답 시간"""
+    gauge = INFLIGHT_REQUESTS.labels(endpoint)
+    gauge.inc()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        gauge.dec()
+        REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - start)
+
+
+# -------------------------------
+# 노출
+# -------------------------------
+def render_latest():
+    """/metrics 본문과 content-type"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
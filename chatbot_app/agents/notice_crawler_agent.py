@@ -1,32 +1,103 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 import re
 import json
+import os
+import threading
+import time
 from datetime import datetime, timedelta
+from .config import (
+    CRAWL_MAX_WORKERS,
+    CRAWL_RATE_LIMIT,
+    CRAWL_MAX_RETRIES,
+    CRAWL_TIMEOUT,
+    CRAWL_REVALIDATE_DAYS,
+)
+from .metrics import CRAWL_SECONDS
+
+
+class HostRateLimiter:
+    """호스트별 초당 요청 수 제한 (스레드 안전)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host: str):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
 
 class NoticeCrawlerAgent:
     BASE_URL = "https://library.sogang.ac.kr"
     NOTICE_URL = "https://library.sogang.ac.kr/bbs/list/1"
     HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; SogangNoticeBot/1.0)"}
 
-    def __init__(self, output_dir: str = "database"):
+    def __init__(
+        self,
+        output_dir: str = "database",
+        max_workers: int = CRAWL_MAX_WORKERS,
+        rate_limit: float = CRAWL_RATE_LIMIT,
+        max_retries: int = CRAWL_MAX_RETRIES,
+    ):
         self.output_file = Path(output_dir) / "notices.json"
+        # 상세 수집에 실패한 새 공지 목록 행 (다음 증분 실행에서 다시 시도)
+        self.pending_file = Path(output_dir) / "notices.pending.json"
         self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = HostRateLimiter(rate_limit)
+        self.session = self._make_session(max_retries)
+
+    # === HTTP 세션 (커넥션 풀 + 재시도) ===
+    def _make_session(self, max_retries: int) -> requests.Session:
+        """keep-alive 커넥션을 공유하는 세션, 일시적 오류는 지수 백오프로 재시도"""
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers, max_retries=retry)
+        session = requests.Session()
+        session.headers.update(self.HEADERS)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        self.rate_limiter.wait(urlparse(url).netloc)
+        resp = self.session.get(url, timeout=CRAWL_TIMEOUT, **kwargs)
+        resp.raise_for_status()
+        return resp
 
     # === 크롤링 메서드 ===
-    def fetch_notices(self) -> pd.DataFrame:
-        """공지사항 목록 크롤링"""
+    def fetch_notices(self, stop_at_no: int = None) -> pd.DataFrame:
+        """공지사항 목록 크롤링
+
+        stop_at_no 가 주어지면 그 번호 이하(이미 수집한 공지)를 만나는 순간 중단한다.
+        번호가 숫자가 아닌 상단 고정 공지는 중단 기준에서 제외한다.
+        """
         all_data = []
         page = 1
         stop_crawling = False
 
         while not stop_crawling:
             url = f"{self.NOTICE_URL}?pn={page}"
-            resp = requests.get(url, headers=self.HEADERS)
-            resp.raise_for_status()
+            resp = self._get(url)
             soup = BeautifulSoup(resp.text, "html.parser")
 
             rows = soup.select("table tbody tr")
@@ -57,6 +128,11 @@ class NoticeCrawlerAgent:
                     stop_crawling = True
                     break
 
+                # 증분 모드: 이미 알고 있는 가장 큰 번호에 도달하면 중단
+                if stop_at_no is not None and no.isdigit() and int(no) <= stop_at_no:
+                    stop_crawling = True
+                    break
+
                 all_data.append({
                     "No.": no,
                     "제목": title,
@@ -70,10 +146,19 @@ class NoticeCrawlerAgent:
 
         return pd.DataFrame(all_data)
 
-    def fetch_notice_detail(self, url: str) -> dict:
-        """공지사항 상세 페이지 크롤링"""
-        r = requests.get(url, headers=self.HEADERS, timeout=10)
-        r.raise_for_status()
+    def fetch_notice_detail(self, url: str, etag: str = None, last_modified: str = None) -> dict:
+        """공지사항 상세 페이지 크롤링
+
+        etag / last_modified 를 주면 조건부 GET 을 보내고, 바뀌지 않았으면(304) None 을 반환한다.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        r = self._get(url, headers=headers)
+        if r.status_code == 304:
+            return None
         s = BeautifulSoup(r.text, "html.parser")
 
         content =   s.select_one(".boardContent") or \
@@ -117,6 +202,8 @@ class NoticeCrawlerAgent:
             "title": title_text,
             "body": body_text,
             "attachments": attachments,
+            "etag": r.headers.get("ETag", ""),
+            "last_modified": r.headers.get("Last-Modified", ""),
         }
 
     def clean_notice_content(self, content):
@@ -127,47 +214,173 @@ class NoticeCrawlerAgent:
         clean_text = re.sub(r'\n{3,}', '\n\n', text)
         return clean_text.strip()
 
+    def _fetch_notice(self, row: dict, known: dict = None) -> dict:
+        """목록 한 줄의 상세 내용 수집
+
+        known(기존 notices.json 항목)이 있으면 조건부 GET 으로 바뀐 경우에만 다시 파싱한다.
+        """
+        if known is not None:
+            if not (known.get("etag") or known.get("last_modified")):
+                return known  # 비교할 검증자가 없으면 기존 내용 유지
+            notice_detail = self.fetch_notice_detail(
+                row["링크"], etag=known.get("etag"), last_modified=known.get("last_modified")
+            )
+            if notice_detail is None:
+                return known  # 304 Not Modified
+        else:
+            notice_detail = self.fetch_notice_detail(row["링크"])
+
+        return {
+            "source": row["링크"],
+            "no": row["No."],
+            "title": row["제목"],
+            "author": row["작성자"],
+            "date": row["작성일"],
+            "content": notice_detail["body"],
+            "etag": notice_detail["etag"],
+            "last_modified": notice_detail["last_modified"],
+        }
+
+    def _fetch_all(self, tasks: list):
+        """(목록 행, 기존 항목) 작업들을 스레드 풀로 동시 수집
+
+        실패한 항목은 기존 내용을 유지하고, 기존 내용이 없는 새 공지는 목록 행을 따로 돌려준다.
+        반환값은 (수집한 공지, 실패한 새 공지 목록 행).
+        """
+        total = len(tasks)
+        results = [None] * total
+        failed = []
+        started = time.monotonic()
+
+        # 공유 세션 위에서 스레드 풀로 상세 페이지 동시 수집 (호스트당 요청 속도 제한)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self._fetch_notice, row, known): i
+                for i, (row, known) in enumerate(tasks)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                i = futures[future]
+                row, known = tasks[i]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    print(f"내용 가져오기 실패: {row['링크']}, 오류: {e}")
+                    results[i] = known
+                    if known is None:
+                        failed.append(row)
+                self._report_progress(done, total, started)
+
+        # 목록 순서 유지
+        return [r for r in results if r is not None], failed
+
+    @staticmethod
+    def _row_from_notice(notice: dict) -> dict:
+        return {
+            "No.": notice.get("no", ""),
+            "제목": notice.get("title", ""),
+            "작성자": notice.get("author", ""),
+            "작성일": notice.get("date", ""),
+            "링크": notice["source"],
+        }
+
+    def _report_progress(self, done: int, total: int, started: float):
+        elapsed = time.monotonic() - started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        if done == total or done % 10 == 0:
+            print(f"[{done}/{total}] 상세 페이지 수집 중... ({rate:.1f}건/초, {elapsed:.1f}초 경과)")
+
     # === JSON 저장 ===
-    def create_notices_json(self):
-        """공지사항 목록 + 상세 내용을 JSON으로 저장"""
+    @staticmethod
+    def _load_json(path: Path) -> list:
+        if not path.exists():
+            return []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return []
+
+    def _load_existing(self) -> list:
+        return self._load_json(self.output_file)
+
+    def _write_json(self, notices: list, path: Path = None):
+        """임시 파일에 쓴 뒤 교체 (인덱스 빌드가 반쯤 쓴 파일을 읽지 않도록)"""
+        path = path or self.output_file
+        tmp = path.with_suffix(".json.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(notices, f, ensure_ascii=False, indent=4)
+        os.replace(tmp, path)
+
+    def _save_pending(self, rows: list):
+        if rows:
+            self._write_json(rows, self.pending_file)
+            print(f"상세 수집에 실패한 새 공지 {len(rows)}건은 다음 증분 실행에서 다시 시도합니다.")
+        else:
+            self.pending_file.unlink(missing_ok=True)
+
+    def create_notices_json(self, incremental: bool = False):
+        """공지사항 목록 + 상세 내용을 JSON으로 저장
+
+        incremental=True 면 기존 notices.json 을 기준으로 새 공지와 바뀐 공지만 가져와 병합한다.
+        - 목록은 이미 아는 가장 큰 번호에서 멈추므로, 지난번 상세 수집에 실패한 새 공지는
+          notices.pending.json 에 남겨 두었다가 다시 시도한다.
+        - 기존 공지는 최근 CRAWL_REVALIDATE_DAYS 일 안의 것만 조건부 GET 으로 다시 확인한다.
+        """
+        existing = self._load_existing() if incremental else []
+        known_nos = [int(n["no"]) for n in existing if str(n.get("no", "")).isdigit()]
+        if incremental and not known_nos:
+            print("기존 공지 번호 정보가 없어 전체 크롤링을 진행합니다.")
+            existing = []
+
         print("공지사항 목록 가져오는 중...")
-        notice_df = self.fetch_notices()
+        notice_df = self.fetch_notices(stop_at_no=max(known_nos) if existing else None)
 
-        if notice_df.empty:
+        rows = notice_df.to_dict("records")
+        if incremental:
+            listed = {row["링크"] for row in rows}
+            rows += [row for row in self._load_json(self.pending_file) if row["링크"] not in listed]
+
+        if not rows and not existing:
             print("가져올 공지사항이 없습니다.")
             return
 
-        all_notices = []
-        for _, row in notice_df.iterrows():
-            url = row["링크"]
-            try:
-                print(f"내용 가져오는 중: {url}")
-                notice_detail = self.fetch_notice_detail(url)
-
-                notice_data = {
-                    "source": url,
-                    "title": row["제목"],
-                    "author": row["작성자"],
-                    "date": row["작성일"],
-                    "content": notice_detail["body"]
-                }
-                all_notices.append(notice_data)
-
-            except Exception as e:
-                print(f"내용 가져오기 실패: {url}, 오류: {e}")
-                continue
-
-        with open(self.output_file, 'w', encoding='utf-8') as f:
-            json.dump(all_notices, f, ensure_ascii=False, indent=4)
-        print(f"공지사항 데이터가 '{self.output_file}'에 저장되었습니다.")
+        # 1년이 지난 공지는 병합 대상에서 제외
+        cutoff = (datetime.today() - timedelta(days=365)).strftime("%Y-%m-%d")
+        known = {n["source"]: n for n in existing if n.get("date", "") >= cutoff}
+        revalidate_from = (datetime.today() - timedelta(days=CRAWL_REVALIDATE_DAYS)).strftime("%Y-%m-%d")
+
+        tasks = []
+        for row in rows:
+            tasks.append((row, known.pop(row["링크"], None)))
+        kept = []
+        for notice in known.values():
+            if notice.get("date", "") >= revalidate_from:
+                tasks.append((self._row_from_notice(notice), notice))
+            else:
+                kept.append(notice)  # 오래된 공지는 요청 없이 기존 내용 유지
+
+        all_notices, failed = self._fetch_all(tasks)
+        all_notices += kept
+        all_notices.sort(key=lambda n: n.get("date", ""), reverse=True)
+
+        self._write_json(all_notices)
+        self._save_pending(failed)
+        new_count = sum(1 for _, k in tasks if k is None)
+        print(
+            f"공지사항 데이터가 '{self.output_file}'에 저장되었습니다. "
+            f"(총 {len(all_notices)}건, 새 공지 {new_count - len(failed)}건, 다시 확인 {len(tasks) - new_count}건)"
+        )
 
     # === 에이전트 실행 ===
-    def run(self):
+    def run(self, incremental: bool = False):
         """Agent 실행"""
-        self.create_notices_json()
+        mode = "incremental" if incremental else "full"
+        with CRAWL_SECONDS.labels(mode).time():
+            self.create_notices_json(incremental=incremental)
         return f"공지사항 데이터가 {self.output_file} 에 저장 완료되었습니다."
 
 
 if __name__ == "__main__":
+    # 프로젝트 루트에서: python -m chatbot_app.agents.notice_crawler_agent
     agent = NoticeCrawlerAgent()
     agent.run()
@@ -0,0 +1,181 @@
+"""검색 파티션: 출처 종류/분류별로 인덱스 위치를 연속 구간으로 묶는다
+
+- detail:<분류>  홈페이지 안내 페이지 (category 별)
+- notice         공지사항. 최신순으로 정렬해 "이 날짜 이후" 조건이 앞쪽 구간 하나가 된다
+
+FAISS/BM25 인덱스는 이 순서대로 만들어지므로 파티션 선택은 위치 구간 목록으로 표현된다.
+"""
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import re
+
+import numpy as np
+
+from .config import NOTICE_MAX_AGE_DAYS, RECENCY_BOOST, RECENCY_HALF_LIFE_DAYS
+
+# 파티션 규칙/파일 형식을 바꾸면 올려서 인덱스가 다시 만들어지도록 한다
+PARTITION_VERSION = 1
+PARTITIONS_FILE = "partitions.json"
+NOTICE = "notice"
+DETAIL = "detail"
+
+# 공지사항을 찾는 질문으로 볼 단서 (라우팅에서 notice 파티션을 항상 포함)
+_NOTICE_CUE_RE = re.compile(r"공지|행사|모집|신청|일정|특강|강연|교육|이벤트|휴관|변경|최근|이번|올해|\d+월")
+# 특정 연도/과거를 묻는 질문은 오래된 공지도 검색
+_PAST_RE = re.compile(r"20\d\d|작년|지난해|예전")
+
+
+def partition_of(metadata: dict) -> str:
+    if "date" in metadata:
+        return NOTICE
+    return f"{DETAIL}:{metadata.get('category') or '기타'}"
+
+
+def partition_order(metadatas: List[dict]) -> List[int]:
+    """파티션별로 묶고(공지는 맨 뒤) 공지는 최신순으로 정렬한 위치 순서 (같은 조건이면 원래 순서)"""
+    names = [partition_of(m) for m in metadatas]
+    details = sorted((i for i, n in enumerate(names) if n != NOTICE), key=lambda i: names[i])
+    notices = sorted(
+        (i for i, n in enumerate(names) if n == NOTICE),
+        key=lambda i: metadatas[i].get("date") or "",  # 날짜 없는 공지는 가장 오래된 것으로
+        reverse=True,
+    )
+    return details + notices
+
+
+def _parse_date(text: str) -> Optional[date]:
+    try:
+        return date.fromisoformat(text[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class SearchFilter:
+    """명시적 검색 조건 (None 인 항목은 질문으로 추정)
+
+    partitions: "notice", "detail", "detail:도서관 이용" 처럼 파티션 이름 또는 접두어
+    since: 이 날짜(YYYY-MM-DD) 이후 공지만
+    """
+    partitions: Optional[List[str]] = None
+    since: Optional[str] = None
+
+
+@dataclass
+class PartitionLayout:
+    ranges: Dict[str, Tuple[int, int]]
+    notice_dates: List[str] = field(default_factory=list)  # notice 구간 위치별 날짜 (최신순)
+    centroids: Dict[str, List[float]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._names = list(self.ranges)
+        self._centroids = np.asarray([self.centroids[n] for n in self._names], dtype=np.float32) \
+            if self.centroids else None
+        newest = _parse_date(self.notice_dates[0]) if self.notice_dates else None
+        self.newest_notice: Optional[date] = newest
+
+    @classmethod
+    def build(cls, metadatas: List[dict], vectors: np.ndarray) -> "PartitionLayout":
+        """partition_order 로 정렬된 청크 메타데이터/벡터에서 구간과 파티션 중심 벡터 계산"""
+        ranges, start = {}, 0
+        names = [partition_of(m) for m in metadatas]
+        for i in range(1, len(names) + 1):
+            if i == len(names) or names[i] != names[start]:
+                ranges[names[start]] = (start, i)
+                start = i
+        notice_dates = []
+        if NOTICE in ranges:
+            s, e = ranges[NOTICE]
+            notice_dates = [metadatas[i].get("date") or "" for i in range(s, e)]
+        centroids = {name: vectors[s:e].mean(axis=0).tolist() for name, (s, e) in ranges.items()}
+        return cls(ranges=ranges, notice_dates=notice_dates, centroids=centroids)
+
+    # -------------------------------
+    # 저장/로드
+    # -------------------------------
+    def save(self, path: Path):
+        payload = {
+            "version": PARTITION_VERSION,
+            "ranges": {name: list(r) for name, r in self.ranges.items()},
+            "notice_dates": self.notice_dates,
+            "centroids": self.centroids,
+        }
+        tmp = Path(path) / (PARTITIONS_FILE + ".tmp")
+        tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, Path(path) / PARTITIONS_FILE)
+
+    @classmethod
+    def load(cls, path: Path) -> "PartitionLayout":
+        payload = json.loads((Path(path) / PARTITIONS_FILE).read_text(encoding="utf-8"))
+        return cls(
+            ranges={name: tuple(r) for name, r in payload["ranges"].items()},
+            notice_dates=payload["notice_dates"],
+            centroids=payload["centroids"],
+        )
+
+    # -------------------------------
+    # 파티션 선택
+    # -------------------------------
+    @property
+    def names(self) -> List[str]:
+        return self._names
+
+    @property
+    def size(self) -> int:
+        return max((e for _, e in self.ranges.values()), default=0)
+
+    def select(self, patterns: Iterable[str]) -> List[str]:
+        """파티션 이름 또는 접두어("detail")로 선택"""
+        patterns = list(patterns)
+        return [n for n in self._names if any(n == p or n.startswith(p + ":") for p in patterns)]
+
+    def default_since(self, query: str) -> Optional[str]:
+        """오래된 공지 제외 기준일 (가장 최근 공지 기준, 연도/과거를 묻는 질문은 제한 없음)"""
+        if not NOTICE_MAX_AGE_DAYS or self.newest_notice is None or _PAST_RE.search(query):
+            return None
+        return (self.newest_notice - timedelta(days=NOTICE_MAX_AGE_DAYS)).isoformat()
+
+    def route(self, embedding: List[float], probe: int, candidates: List[str], query: str = "") -> List[str]:
+        """질의 임베딩과 중심 벡터가 가까운 파티션 probe 개 (공지 단서가 있으면 notice 포함)"""
+        if self._centroids is None or probe <= 0 or len(candidates) <= probe:
+            return candidates
+        q = np.asarray(embedding, dtype=np.float32)
+        dist = ((self._centroids - q) ** 2).sum(axis=1)
+        rank = {self._names[i]: r for r, i in enumerate(np.argsort(dist))}
+        chosen = sorted(candidates, key=rank.get)[:probe]
+        if NOTICE in candidates and NOTICE not in chosen and _NOTICE_CUE_RE.search(query):
+            chosen.append(NOTICE)
+        return chosen
+
+    def position_ranges(self, names: List[str], since: Optional[str] = None) -> List[Tuple[int, int]]:
+        """파티션 목록 → 위치 구간 (notice 는 since 이후 공지까지만)"""
+        ranges = []
+        for name in names:
+            start, end = self.ranges[name]
+            if name == NOTICE and since:
+                # 최신순 정렬이므로 since 보다 오래된 첫 위치까지
+                end = start + bisect_left(self.notice_dates, True, key=lambda d: d < since)
+            if end > start:
+                ranges.append((start, end))
+        return ranges
+
+    # -------------------------------
+    # 최신 공지 가산점
+    # -------------------------------
+    def recency_weight(self, position: int) -> float:
+        """공지면 1 + RECENCY_BOOST * 0.5^(경과일/반감기), 그 외 1"""
+        if not RECENCY_BOOST or NOTICE not in self.ranges or self.newest_notice is None:
+            return 1.0
+        start, end = self.ranges[NOTICE]
+        if not start <= position < end:
+            return 1.0
+        day = _parse_date(self.notice_dates[position - start])
+        if day is None:
+            return 1.0
+        age = max((self.newest_notice - day).days, 0)
+        return 1.0 + RECENCY_BOOST * 0.5 ** (age / RECENCY_HALF_LIFE_DAYS)
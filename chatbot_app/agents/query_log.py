@@ -0,0 +1,138 @@
+"""질의 로그 (개인정보 제거, 비동기 JSONL 기록)
+
+요청 경로에서는 큐에 넣기만 하고, 백그라운드 스레드가 날짜별 파일에 한 줄씩 덧붙인다.
+query_logs/queries-YYYYMMDD.jsonl
+{"ts", "endpoint", "question", "key", "first_turn", "sources", "timings_ms", "fallback", "faq"}
+
+대화 ID / 세션 / IP 는 남기지 않고, 질문의 이메일 · 전화번호 · 주민번호 · 긴 숫자(학번 등)는 가린다.
+보관 기간이 지난 파일은 기록 스레드가 지운다. manage.py build_faq 가 이 로그를 읽는다.
+"""
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+import json
+import os
+import queue
+import re
+import threading
+
+from .admission import question_key
+from .config import QUERY_LOG_ENABLED, QUERY_LOG_DIR, QUERY_LOG_RETENTION_DAYS
+
+_PII_PATTERNS = [
+    (re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+"), "<email>"),
+    (re.compile(r"\d{6}\s*-?\s*[1-4]\d{6}"), "<rrn>"),
+    (re.compile(r"(?:\+?82[-.\s]?)?0\d{1,2}[-.\s)]?\d{3,4}[-.\s]?\d{4}"), "<phone>"),
+    (re.compile(r"\d{7,}"), "<number>"),
+]
+_FILE_RE = re.compile(r"queries-(\d{8})\.jsonl$")
+
+
+def scrub_pii(text: str) -> str:
+    for pattern, replacement in _PII_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def normalize_question(question: str) -> str:
+    """로그 집계 / FAQ 답변표 공통 키 (개인정보 제거 + 공백/문장부호 정규화)"""
+    return question_key(scrub_pii(question))
+
+
+class QueryLog:
+    """큐가 가득 차면 기록을 버린다 (요청을 막지 않음)"""
+
+    def __init__(self, directory: Path = QUERY_LOG_DIR, retention_days: int = QUERY_LOG_RETENTION_DAYS,
+                 max_pending: int = 10000, enabled: bool = QUERY_LOG_ENABLED):
+        self.directory = Path(directory)
+        self.retention_days = retention_days
+        self.enabled = enabled
+        self.dropped = 0
+        self._queue: "queue.Queue[dict]" = queue.Queue(max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._day = None
+
+    def record(self, endpoint: str, question: str, first_turn: bool, result: dict,
+               timings: Optional[Dict[str, float]] = None):
+        if not self.enabled:
+            return
+        clean = scrub_pii(question).strip()
+        entry = {
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "endpoint": endpoint,
+            "question": clean,
+            "key": question_key(clean),
+            "first_turn": first_turn,
+            "sources": result.get("sources", []),
+            "timings_ms": {stage: round(s * 1000, 1) for stage, s in (timings or {}).items()},
+            "fallback": bool(result.get("fallback")),
+            "faq": bool(result.get("faq")),
+        }
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_writer(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="lyolla-query-log", daemon=True)
+                self._thread.start()
+
+    def path(self, day: str) -> Path:
+        return self.directory / f"queries-{day}.jsonl"
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            try:
+                self._write(entry)
+            except Exception as e:
+                print(f"질의 로그 기록 실패: {e}")
+
+    def _write(self, entry: dict):
+        day = entry["ts"][:10].replace("-", "")
+        if day != self._day:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._day = day
+            self._expire()
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        # 여러 워커 프로세스가 같은 파일에 덧붙여도 줄이 섞이지 않도록 O_APPEND 로 한 번에 쓴다
+        fd = os.open(self.path(day), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def _expire(self):
+        if self.retention_days <= 0:
+            return
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime("%Y%m%d")
+        for path in self.directory.glob("queries-*.jsonl"):
+            match = _FILE_RE.search(path.name)
+            if match and match.group(1) < cutoff:
+                path.unlink(missing_ok=True)
+
+
+def read_entries(directory: Path = QUERY_LOG_DIR, days: int = 30) -> Iterator[dict]:
+    """최근 days 일 로그 (깨진 줄은 건너뜀)"""
+    directory = Path(directory)
+    cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y%m%d") if days > 0 else ""
+    paths: List[Path] = sorted(
+        p for p in directory.glob("queries-*.jsonl")
+        if _FILE_RE.search(p.name) and _FILE_RE.search(p.name).group(1) >= cutoff
+    )
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+query_log = QueryLog()
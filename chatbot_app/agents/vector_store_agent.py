@@ -1,32 +1,169 @@
 from pathlib import Path
-import json, hashlib, time
-from typing import List
+from dataclasses import dataclass
+import json, hashlib, os, shutil, threading, time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import faiss
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
+from .ann_index import (
+    build_config, choose_index_type, create_index, index_kind, index_spec, search_ranges, set_search_params,
+    supports_incremental,
+)
+from .partitions import PARTITION_VERSION, PARTITIONS_FILE, PartitionLayout, SearchFilter, partition_order
+from .embedding_cache import CachedEmbeddings
+from .metrics import span, INDEX_BUILD_SECONDS
+from .chunking import CHUNKER_VERSION, CorpusStats, chunk_id, detail_to_text, estimate_tokens, normalize_chunk
+from .docstore import MmapDocstore, write_docstore, DOCSTORE_FILES
+from .embedding_backends import query_embeddings, torch_embeddings
+from .lexical_index import LexicalIndex, TOKENIZER_VERSION, query_terms
+from .index_versions import BuildLock, current_index_path, current_version, new_version_dir, publish_index
+from .config import (
+    EMBEDDING_MODEL,
+    EMBEDDING_BACKEND,
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_SOCKET,
+    HYBRID_SEARCH,
+    HYBRID_FETCH_K,
+    RRF_K,
+    LEXICAL_FASTPATH_MAX_TERMS,
+    PARTITION_PROBE,
+    INDEX_RELOAD_INTERVAL,
+    INDEX_KEEP_VERSIONS,
+    INDEX_AUTO_BUILD,
+    CHUNK_SIZE,
+    CHUNK_OVERLAP,
+    MIN_CHUNK_CHARS,
+)
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
-DB_PATH = BASE_DIR / "faiss_index"
-INDEX_FILES = ["index.faiss", "index.pkl"]
-MANIFEST = DB_PATH / "manifest.json"
+DB_PATH = BASE_DIR / "faiss_index"  # 버전 디렉터리들의 루트 (index_versions 참고)
+INDEX_FILES = ["index.faiss", "bm25.json", "manifest.json", PARTITIONS_FILE, *DOCSTORE_FILES]
+BUILD_LOCK = DB_PATH / ".build.lock"
+JSON_FILES = [
+    BASE_DIR / "database" / "detail_data.json",
+    BASE_DIR / "database" / "notices.json",
+]
+
+def save_vector_store(db: FAISS, path: Path):
+    """FAISS 인덱스 + mmap 도큐스토어 저장 (pickle 사용 안 함)"""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    ids = [db.index_to_docstore_id[i] for i in range(db.index.ntotal)]
+    write_docstore(path, ids, [db.docstore.search(doc_id) for doc_id in ids])
+
+    tmp = path / "index.faiss.tmp"
+    faiss.write_index(db.index, str(tmp))
+    os.replace(tmp, path / "index.faiss")
+
+
+def load_vector_store(embeddings, path: Path = None) -> FAISS:
+    """저장된 FAISS 인덱스 로드 (path 생략 시 현재 게시된 버전)
+
+    읽기 전용 mmap 으로 열어 여러 워커가 벡터/문서 페이지를 공유한다.
+    """
+    path = Path(path or current_index_path(DB_PATH))
+    docstore = MmapDocstore(path)
+    index_to_docstore_id = dict(enumerate(docstore.ids))
+    flags = faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0) | faiss.IO_FLAG_READ_ONLY
+    try:
+        index = faiss.read_index(str(path / "index.faiss"), flags)
+    except RuntimeError:
+        # mmap 을 지원하지 않는 인덱스 형식이면 일반 로드
+        index = faiss.read_index(str(path / "index.faiss"))
+    set_search_params(index)  # hnsw efSearch / ivf nprobe
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+
+@dataclass
+class LoadedIndex:
+    """한 버전의 인덱스 묶음. 통째로 교체해서 요청 도중 섞이지 않게 한다"""
+    version: str
+    db: FAISS
+    lexical: LexicalIndex
+    layout: PartitionLayout
+    positions: Dict[str, int]  # 청크 ID → 인덱스 위치 (FAISS/BM25 공통)
+
 
 class VectorStoreAgent:
     """FAISS 벡터스토어 기반 검색 + 질문 응답 (안전한 인덱스 보장)"""
 
-    def __init__(self):
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="jhgan/ko-sbert-nli", model_kwargs={"device": "cpu"}
-        )
-        self._ensure_index()  # 변경 사항 모두 점검
-        self.db = FAISS.load_local(
-            str(DB_PATH), self.embeddings, allow_dangerous_deserialization=True
+    def __init__(self, load: bool = True):
+        """load=False 는 서비스용 인덱스를 열지 않는다 (build_index 명령처럼 빌드만 할 때)"""
+        # 질의 임베딩 백엔드 (torch / onnx, 임베딩 서버). 인덱스 빌드는 항상 프로세스 내부 torch 모델로 한다
+        self.embeddings = query_embeddings(EMBEDDING_BACKEND)
+        local_torch = EMBEDDING_BACKEND == "torch" and not EMBEDDING_SOCKET
+        self._document_embeddings = self.embeddings if local_torch else None
+        self._state: Optional[LoadedIndex] = None
+        self._reload_lock = threading.Lock()
+        self._last_reload_check = time.monotonic()
+        if load:
+            self._ensure_index()  # 변경 사항 모두 점검
+            self._state = self._load(current_version(DB_PATH))
+
+    @property
+    def document_embeddings(self):
+        """인덱스 빌드용 임베딩 (필요할 때만 torch 모델 로드)"""
+        if self._document_embeddings is None:
+            self._document_embeddings = torch_embeddings(EMBEDDING_MODEL)
+        return self._document_embeddings
+
+    # -------------------------------
+    # 게시된 인덱스 로드 / 핫 리로드
+    # -------------------------------
+    def _load(self, version: str) -> LoadedIndex:
+        path = DB_PATH / "versions" / version
+        db = load_vector_store(self.embeddings, path)
+        return LoadedIndex(
+            version=version,
+            db=db,
+            lexical=LexicalIndex.load(path / "bm25.json"),
+            layout=PartitionLayout.load(path),
+            positions={doc_id: i for i, doc_id in db.index_to_docstore_id.items()},
         )
 
+    @property
+    def db(self) -> FAISS:
+        return self._state.db
+
+    @property
+    def lexical(self) -> LexicalIndex:
+        return self._state.lexical
+
+    @property
+    def manifest_version(self) -> str:
+        """현재 서비스 중인 인덱스 버전 (답변 캐시 무효화 기준)"""
+        return self._state.version
+
+    def maybe_reload(self, force: bool = False) -> bool:
+        """새 버전이 게시됐으면 요청 사이에 인덱스를 교체 (재시작 불필요)"""
+        now = time.monotonic()
+        if not force and now - self._last_reload_check < INDEX_RELOAD_INTERVAL:
+            return False
+        if not self._reload_lock.acquire(blocking=False):
+            return False  # 다른 스레드가 이미 확인/로드 중
+        try:
+            self._last_reload_check = now
+            version = current_version(DB_PATH)
+            if version is None or version == self._state.version:
+                return False
+            self._state = self._load(version)
+            print(f" 인덱스 버전 교체: {version}")
+            return True
+        except Exception as e:
+            print(f"새 인덱스 로드 실패, 기존 버전 유지: {e}")
+            return False
+        finally:
+            self._reload_lock.release()
+
     # -------------------------------
     # JSON → Document 변환
     # -------------------------------
-    def _json_to_documents(self, json_files: List[str]) -> List[Document]:
+    def _json_to_documents(self, json_files: List[str], stats: CorpusStats = None) -> List[Document]:
+        """원본 JSON → Document (중첩 dict 는 읽기 쉬운 텍스트로 펼치고 빈 항목은 건너뜀)"""
+        stats = stats if stats is not None else CorpusStats()
         all_documents = []
         for file_path in json_files:
             with open(file_path, "r", encoding="utf-8") as f:
@@ -40,6 +177,9 @@ class VectorStoreAgent:
                         "author": item.get("author", ""),
                         "date": item.get("date", ""),
                     }
+                    if not (item.get("title") or "").strip() and not (item.get("content") or "").strip():
+                        stats.skipped_documents += 1
+                        continue
                     content = f"[제목] {item.get('title','')}\n\n{item.get('content','')}"
                     all_documents.append(Document(page_content=content, metadata=metadata))
             else:
@@ -49,21 +189,85 @@ class VectorStoreAgent:
                         "title": item.get("title", ""),
                         "url": item.get("url", ""),
                     }
-                    content = str(item.get("description", ""))
+                    content = detail_to_text(item)
+                    if not content:  # description 이 비어 있는 항목 ({})
+                        stats.skipped_documents += 1
+                        continue
                     all_documents.append(Document(page_content=content, metadata=metadata))
+        stats.documents += len(all_documents)
         return all_documents
 
     # -------------------------------
     # Document → Chunk
     # -------------------------------
     def _chunk_documents(self, documents: List[Document]) -> List[Document]:
-        self._chunk_size = 800
-        self._chunk_overlap = 200
+        # start_index: 프롬프트 조립 시 같은 문서의 인접 청크를 이어 붙이는 데 사용
         splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self._chunk_size, chunk_overlap=self._chunk_overlap
+            chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, add_start_index=True
         )
         return splitter.split_documents(documents)
 
+    # -------------------------------
+    # 문서 ID / 해시 (문서 단위 증분 갱신용)
+    # -------------------------------
+    def _doc_key(self, doc: Document) -> str:
+        meta = doc.metadata
+        return f"{meta.get('source') or meta.get('url', '')}|{meta.get('title', '')}"
+
+    def _doc_hash(self, doc: Document) -> str:
+        payload = json.dumps([doc.page_content, doc.metadata], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _documents_by_id(self, json_files: List[Path], stats: CorpusStats = None) -> dict:
+        """문서 ID(출처 URL + 제목 해시) → Document"""
+        docs = {}
+        for doc in self._json_to_documents([str(p) for p in json_files], stats):
+            base_id = hashlib.sha1(self._doc_key(doc).encode("utf-8")).hexdigest()[:16]
+            doc_id, n = base_id, 1
+            while doc_id in docs:  # 같은 URL/제목이 여러 번 나오는 경우
+                doc_id = f"{base_id}-{n}"
+                n += 1
+            docs[doc_id] = doc
+        return docs
+
+    def _chunk_with_ids(self, docs_by_id: dict, existing_ids=(), stats: CorpusStats = None):
+        """문서별로 청크를 나누고 내용 해시 청크 ID를 붙인다
+
+        - 너무 짧은 청크, 바로 앞 청크에 통째로 포함된 청크는 버린다
+        - 같은 내용의 청크는 ID가 같으므로 한 번만 임베딩/저장한다
+          (existing_ids 에 이미 있는 청크도 다시 추가하지 않음)
+        doc_chunks 에는 공유 청크를 포함해 문서가 참조하는 청크 ID를 모두 기록한다.
+        """
+        stats = stats if stats is not None else CorpusStats()
+        existing, seen = set(existing_ids), set()
+        chunks, ids, doc_chunks = [], [], {}
+        for doc_id, doc in docs_by_id.items():
+            refs, prev = [], ""
+            for piece in self._chunk_documents([doc]):
+                text = normalize_chunk(piece.page_content)
+                if len(text) < MIN_CHUNK_CHARS:
+                    stats.empty_chunks += 1
+                    continue
+                if text in prev:  # 겹침 구간만 남은 꼬리 청크
+                    stats.duplicate_chunks += 1
+                    continue
+                prev = text
+                cid = chunk_id(text)
+                if cid not in refs:
+                    refs.append(cid)
+                if cid in existing:  # 증분 갱신: 이미 인덱스에 있는 청크는 그대로 재사용
+                    continue
+                if cid in seen:
+                    stats.duplicate_chunks += 1
+                    continue
+                seen.add(cid)
+                chunks.append(piece)
+                ids.append(cid)
+                stats.chunks += 1
+                stats.tokens += estimate_tokens(piece.page_content)
+            doc_chunks[doc_id] = refs
+        return chunks, ids, doc_chunks
+
     # -------------------------------
     # 매니페스트(원본 해시) 생성/검증
     # -------------------------------
@@ -76,90 +280,413 @@ class VectorStoreAgent:
 
     def _current_manifest(self, json_files: List[Path]) -> dict:
         return {
-            "model_name": getattr(self.embeddings, "model_name", ""),
-            "chunk_size": getattr(self, "_chunk_size", 800),
-            "chunk_overlap": getattr(self, "_chunk_overlap", 200),
+            "model_name": EMBEDDING_MODEL,
+            "chunk_size": CHUNK_SIZE,
+            "chunk_overlap": CHUNK_OVERLAP,
+            "chunker": CHUNKER_VERSION,
+            "min_chunk_chars": MIN_CHUNK_CHARS,
+            "lexical_tokenizer": TOKENIZER_VERSION,
+            "faiss_index_config": build_config(),
+            "partitions": PARTITION_VERSION,
             "files": {str(p): self._file_hash(p) for p in json_files},
         }
 
-    def _manifest_matches(self, cur: dict) -> bool:
-        if not MANIFEST.exists():
-            return False
+    def _load_manifest(self, path: Path):
         try:
-            saved = json.loads(MANIFEST.read_text(encoding="utf-8"))
+            return json.loads((path / "manifest.json").read_text(encoding="utf-8"))
         except Exception:
+            return None
+
+    def _manifest_matches(self, path: Path, cur: dict) -> bool:
+        saved = self._load_manifest(path)
+        if saved is None:
+            return False
+        keys = ["model_name", "chunk_size", "chunk_overlap", "chunker", "min_chunk_chars",
+                "lexical_tokenizer", "faiss_index_config", "partitions", "files"]
+        return all(saved.get(k) == cur.get(k) for k in keys)
+
+    def _can_update_incrementally(self, path: Path, cur: dict) -> bool:
+        """모델/청크/인덱스 설정이 같고 문서별 해시가 기록돼 있으면 증분 갱신 가능
+
+        근사 인덱스(hnsw/ivf)는 저장된 벡터를 그대로 복원할 수 없으므로 전체 재빌드 (임베딩 캐시로 새 청크만 임베딩)
+        """
+        saved = self._load_manifest(path)
+        if saved is None or "documents" not in saved:
+            return False
+        if not supports_incremental(saved.get("faiss_index", {}).get("type", "flat")):
             return False
-        keys = ["model_name", "chunk_size", "chunk_overlap", "files"]
+        keys = ["model_name", "chunk_size", "chunk_overlap", "chunker", "min_chunk_chars", "faiss_index_config",
+                "partitions"]
         return all(saved.get(k) == cur.get(k) for k in keys)
 
+    def _write_manifest(self, path: Path, json_files: List[Path], documents: dict,
+                        stats: CorpusStats = None, index: faiss.Index = None):
+        manifest = self._current_manifest(json_files)
+        if stats is not None:
+            manifest["corpus_stats"] = stats.as_dict()
+        if index is not None:
+            manifest["faiss_index"] = index_spec(index_kind(index), index).as_dict()
+        manifest["documents"] = documents
+        (path / "manifest.json").write_text(
+            json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
     # -------------------------------
     # Index 생성
     # -------------------------------
-    def build_index(self):
-        DB_PATH.mkdir(parents=True, exist_ok=True)
-        json_files = [
-            BASE_DIR / "database" / "detail_data.json",
-            BASE_DIR / "database" / "notices.json",
-        ]
-        all_documents = self._json_to_documents([str(p) for p in json_files])
-        smaller_docs = self._chunk_documents(all_documents)
-        vector_store = FAISS.from_documents(smaller_docs, embedding=self.embeddings)
-        vector_store.save_local(str(DB_PATH))
+    def _save_lexical_index(self, db: FAISS, path: Path):
+        """FAISS 도큐스토어와 같은 청크/ID로 BM25 인덱스를 만들어 함께 저장"""
+        ids = list(db.index_to_docstore_id.values())
+        texts = []
+        for doc_id in ids:
+            doc = db.docstore.search(doc_id)
+            texts.append(f"{doc.metadata.get('title', '')}\n{doc.page_content}")
+        LexicalIndex.build(ids, texts).save(path / "bm25.json")
+
+    def _cached_embeddings(self) -> CachedEmbeddings:
+        # 청크 임베딩 캐시: 새로 생기거나 바뀐 청크만 실제로 임베딩
+        return CachedEmbeddings(
+            self.document_embeddings,
+            model_name=EMBEDDING_MODEL,
+            cache_dir=EMBEDDING_CACHE_DIR,
+        )
+
+    def _assemble(self, ids: List[str], docs: List[Document], vectors: np.ndarray) -> Tuple[FAISS, PartitionLayout]:
+        """청크를 파티션 순서로 정렬해 FAISS 인덱스(청크 수에 맞는 종류)와 파티션 구간 생성"""
+        order = partition_order([d.metadata for d in docs])
+        ids = [ids[i] for i in order]
+        docs = [docs[i] for i in order]
+        vectors = np.asarray(vectors, dtype=np.float32)[order]
+        db = FAISS(
+            self.embeddings,
+            create_index(choose_index_type(len(ids)), vectors),
+            InMemoryDocstore(dict(zip(ids, docs))),
+            dict(enumerate(ids)),
+        )
+        return db, PartitionLayout.build([d.metadata for d in docs], vectors)
+
+    def build_index(self, target: Path):
+        """전체 재생성 (모델/청크 설정이 바뀐 경우에도 사용)"""
+        stats = CorpusStats()
+        docs_by_id = self._documents_by_id(JSON_FILES, stats)
+        smaller_docs, ids, doc_chunks = self._chunk_with_ids(docs_by_id, stats=stats)
+        print(f" 코퍼스: {stats.report()}")
+
+        cached_embeddings = self._cached_embeddings()
+        vectors = np.asarray(
+            cached_embeddings.embed_documents([d.page_content for d in smaller_docs]), dtype=np.float32
+        )
+        vector_store, layout = self._assemble(ids, smaller_docs, vectors)
+        save_vector_store(vector_store, target)
+        self._save_lexical_index(vector_store, target)
+        layout.save(target)
+        cached_embeddings.compact([d.page_content for d in smaller_docs])
+        print(
+            f" 임베딩 캐시: 재사용 {cached_embeddings.reused}개, "
+            f"새로 임베딩 {cached_embeddings.embedded}개"
+        )
 
-        # 매니페스트 저장
-        cur_manifest = self._current_manifest(json_files)
-        MANIFEST.write_text(json.dumps(cur_manifest, ensure_ascii=False, indent=2), encoding="utf-8")
-        print(f" FAISS 인덱스가 {DB_PATH} 에 저장되었습니다.")
+        # 매니페스트 저장 (파일 해시 + 문서별 해시/청크 ID)
+        documents = {
+            doc_id: {"hash": self._doc_hash(doc), "chunks": doc_chunks[doc_id]}
+            for doc_id, doc in docs_by_id.items()
+        }
+        self._write_manifest(target, JSON_FILES, documents, stats, vector_store.index)
+        print(
+            f" FAISS 인덱스({index_kind(vector_store.index)}, 청크 {len(ids)}개, 파티션 {len(layout.names)}개)가 "
+            f"{target} 에 저장되었습니다."
+        )
+
+    def update_index(self, base: Path, target: Path):
+        """바뀐 문서만 다시 청크/임베딩하고, 나머지 청크는 base 버전의 벡터를 그대로 가져와 새 인덱스를 만든다
+
+        파티션마다 청크가 연속해야 하므로 FAISS 인덱스 자체는 전체를 다시 만든다.
+        비용은 벡터 복사 + 인덱스 생성뿐이고 임베딩은 새로 생긴 청크만 한다.
+        """
+        saved_docs = self._load_manifest(base)["documents"]
+        stats = CorpusStats()
+        docs_by_id = self._documents_by_id(JSON_FILES, stats)
+        cur_hashes = {doc_id: self._doc_hash(doc) for doc_id, doc in docs_by_id.items()}
+
+        # 없어졌거나 내용이 바뀐 문서 / 새로 생겼거나 바뀐 문서
+        stale = [d for d, info in saved_docs.items() if cur_hashes.get(d) != info["hash"]]
+        fresh = [d for d, h in cur_hashes.items() if saved_docs.get(d, {}).get("hash") != h]
+
+        base_db = load_vector_store(self.embeddings, base)
+        positions = {cid: i for i, cid in base_db.index_to_docstore_id.items()}
+        chunks, new_ids, doc_chunks = self._chunk_with_ids(
+            {d: docs_by_id[d] for d in fresh}, existing_ids=positions, stats=stats
+        )
+
+        # 청크는 여러 문서가 공유할 수 있으므로 아직 어떤 문서라도 참조하는 청크는 남긴다
+        kept = [d for d in cur_hashes if d in saved_docs and d not in stale]
+        live = {cid for d in kept for cid in saved_docs[d]["chunks"]}
+        live.update(cid for refs in doc_chunks.values() for cid in refs)
+        keep_ids = [cid for cid in positions if cid in live]
+        base_vectors = base_db.index.reconstruct_n(0, base_db.index.ntotal)
+        vectors = base_vectors[[positions[cid] for cid in keep_ids]].reshape(len(keep_ids), -1)
+        docs = [base_db.docstore.search(cid) for cid in keep_ids]
+        del base_vectors, base_db
+
+        if chunks:
+            new_vectors = np.asarray(
+                self._cached_embeddings().embed_documents([c.page_content for c in chunks]), dtype=np.float32
+            )
+            vectors = np.vstack([vectors, new_vectors]) if keep_ids else new_vectors
+        # 청크 수가 기준을 넘었으면 이때 근사 인덱스로 전환된다
+        db, layout = self._assemble(keep_ids + new_ids, docs + chunks, vectors)
+        save_vector_store(db, target)
+        self._save_lexical_index(db, target)
+        layout.save(target)
+
+        documents = {d: saved_docs[d] for d in cur_hashes if d not in doc_chunks}
+        for d in fresh:
+            documents[d] = {"hash": cur_hashes[d], "chunks": doc_chunks[d]}
+        # 통계는 갱신 후 전체 인덱스 기준 (중복/빈 청크 수는 이번에 새로 나눈 문서 기준)
+        stats.chunks = db.index.ntotal
+        stats.tokens = sum(estimate_tokens(d.page_content) for d in docs + chunks)
+        self._write_manifest(target, JSON_FILES, documents, stats, db.index)
+        print(
+            f" 증분 갱신: 문서 {len(stale)}개 제거, {len(fresh)}개 추가 "
+            f"(청크 -{len(positions) - len(keep_ids)} / +{len(new_ids)}, 나머지 벡터 재사용)"
+        )
+        print(f" 코퍼스: {stats.report()}")
 
     # -------------------------------
-    # Index 보장 (무결성/원본변경/경합 대응)
+    # Index 보장 (버전 디렉터리 빌드 → 파일 락 아래 원자적 게시)
     # -------------------------------
-    def _index_present(self) -> bool:
-        if not DB_PATH.exists():
+    def _index_present(self, path: Optional[Path]) -> bool:
+        if path is None:
             return False
-        for f in INDEX_FILES:
-            if not (DB_PATH / f).exists():
+        return all((path / f).exists() for f in INDEX_FILES)
+
+    def _is_current(self, cur_manifest: dict) -> bool:
+        path = current_index_path(DB_PATH)
+        return self._index_present(path) and self._manifest_matches(path, cur_manifest)
+
+    def _build_and_publish(self, cur_manifest: dict, force_full: bool = False):
+        """락을 잡은 상태에서 호출: 새 버전 디렉터리에 빌드 후 게시"""
+        base = current_index_path(DB_PATH)
+        if not self._index_present(base):
+            base = None
+        target = new_version_dir(DB_PATH)
+        start, mode = time.perf_counter(), "full"
+        try:
+            if not force_full and base is not None and self._can_update_incrementally(base, cur_manifest):
+                print("원본이 바뀌어 변경된 문서만 인덱스에 반영합니다.")
+                try:
+                    self.update_index(base, target)
+                    mode = "incremental"
+                except Exception as e:
+                    print(f"증분 갱신 실패: {e}\n→ 전체 재생성 시도")
+                    self.build_index(target)
+            else:
+                print("원본/설정이 바뀌어 인덱스를 재생성합니다.")
+                self.build_index(target)
+        except Exception:
+            shutil.rmtree(target, ignore_errors=True)
+            raise
+        elapsed = time.perf_counter() - start
+        INDEX_BUILD_SECONDS.labels(mode).observe(elapsed)
+        print(f" 인덱스 빌드 완료 ({mode}, {elapsed:.1f}초)")
+        publish_index(DB_PATH, target, keep=INDEX_KEEP_VERSIONS)
+
+    def refresh_index(self, force_full: bool = False) -> bool:
+        """원본이 바뀌었으면 새 버전을 빌드해 게시 (게시했으면 True)
+
+        다른 프로세스가 빌드 중이면 끝날 때까지 기다린 뒤 다시 확인한다.
+        """
+        cur_manifest = self._current_manifest(JSON_FILES)
+        with BuildLock(BUILD_LOCK):
+            # 락을 기다리는 동안 다른 프로세스가 이미 게시했을 수 있음
+            if not force_full and self._is_current(cur_manifest):
                 return False
+            self._build_and_publish(cur_manifest, force_full=force_full)
+        if self._state is not None:
+            self.maybe_reload(force=True)
         return True
 
     def _ensure_index(self):
         DB_PATH.mkdir(parents=True, exist_ok=True)
-        
-        lock = DB_PATH / ".build.lock"
-        json_files = [
-            BASE_DIR / "database" / "detail_data.json",
-            BASE_DIR / "database" / "notices.json",
-        ]
-        try:
-            # 간단한 락(동시 빌드 방지)
-            if lock.exists():
-                # 다른 프로세스가 빌드 중일 수 있음 → 잠깐 대기 후 재확인
-                time.sleep(1.5)
-
-            if not self._index_present():
-                lock.touch(exist_ok=True)
-                self.build_index()
-            else:
-                cur_manifest = self._current_manifest(json_files)
-                if not self._manifest_matches(cur_manifest):
-                    lock.touch(exist_ok=True)
-                    print("원본/설정이 바뀌어 인덱스를 재생성합니다.")
-                    self.build_index()
-        except Exception as e:
-            print(f"인덱스 확인/생성 중 오류 발생: {e}\n→ 재생성 시도")
-            try:
-                lock.touch(exist_ok=True)
-                self.build_index()
-            finally:
-                if lock.exists():
-                    lock.unlink(missing_ok=True)
-        finally:
-            if lock.exists():
-                lock.unlink(missing_ok=True)
+        cur_manifest = self._current_manifest(JSON_FILES)
+        if self._is_current(cur_manifest):
+            return
+
+        if self._index_present(current_index_path(DB_PATH)):
+            if not INDEX_AUTO_BUILD:
+                print("원본이 바뀌었습니다. 기존 버전으로 시작합니다. (manage.py build_index 로 갱신)")
+                return
+            # 서비스 가능한 버전이 이미 있으면 다른 워커의 빌드를 기다리지 않고 기존 버전으로 시작
+            # (빌드가 끝나면 maybe_reload 로 교체됨 → 동시 재빌드/기동 지연 없음)
+            with BuildLock(BUILD_LOCK, blocking=False) as acquired:
+                if not acquired:
+                    print("다른 프로세스가 인덱스를 빌드 중입니다. 기존 버전으로 시작합니다.")
+                    return
+                if self._is_current(cur_manifest):
+                    return
+                try:
+                    self._build_and_publish(cur_manifest)
+                except Exception as e:
+                    print(f"인덱스 확인/생성 중 오류 발생: {e}\n→ 기존 버전 유지")
+            return
+
+        # 게시된 인덱스가 없으면 빌드가 끝날 때까지 기다린다
+        if not INDEX_AUTO_BUILD:
+            raise RuntimeError("게시된 인덱스가 없습니다. manage.py build_index 를 먼저 실행하세요.")
+        self.refresh_index()
 
     # -------------------------------
     # Agent 실행
     # -------------------------------
+    def embed_query(self, query: str) -> List[float]:
+        with span("embed_query"):
+            return self.embeddings.embed_query(query)
+
+    def search_by_vector(self, embedding: List[float], k: int = 5) -> List[Document]:
+        self.maybe_reload()
+        return self._state.db.similarity_search_by_vector(embedding, k=k)
+
+    def _dense_search(self, state: LoadedIndex, embedding: List[float], k: int,
+                      ranges: Optional[List[Tuple[int, int]]] = None) -> List[str]:
+        """FAISS 검색 결과를 청크 ID 순위 목록으로 반환 (ranges 가 있으면 그 파티션 구간만 탐색)"""
+        query = np.asarray([embedding], dtype=np.float32)
+        with span("faiss_search"):
+            if ranges is None:
+                positions = state.db.index.search(query, k)[1][0]
+            else:
+                positions = search_ranges(state.db.index, query, k, ranges)[1]
+        return [state.db.index_to_docstore_id[int(i)] for i in positions if i != -1]
+
+    def _docs(self, state: LoadedIndex, ids: List[str]) -> List[Document]:
+        return [state.db.docstore.search(doc_id) for doc_id in ids]
+
+    def _is_keyword_query(self, query: str) -> bool:
+        terms = query.split()
+        return 0 < len(terms) <= LEXICAL_FASTPATH_MAX_TERMS
+
+    def _scope(self, state: LoadedIndex, query: str, filters: Optional[SearchFilter]):
+        """검색 대상 파티션과 공지 기준일 (명시적 조건이 없으면 질문으로 추정)"""
+        layout = state.layout
+        explicit = filters is not None and filters.partitions is not None
+        names = layout.select(filters.partitions) if explicit else layout.names
+        since = filters.since if filters is not None and filters.since else layout.default_since(query)
+        return names, since, explicit
+
+    def _ranges(self, state: LoadedIndex, names: List[str], since: Optional[str]):
+        """파티션 → 위치 구간. 전체 인덱스와 같으면 None (제한 없는 검색)"""
+        ranges = state.layout.position_ranges(names, since)
+        if sum(end - start for start, end in ranges) == state.db.index.ntotal:
+            return None
+        return ranges
+
+    def _rank(self, state: LoadedIndex, rankings: List[List[str]], k: int,
+              weights: Optional[List[float]] = None) -> List[str]:
+        """(가중) Reciprocal Rank Fusion + 최신 공지 가산점"""
+        weights = weights or [1.0] * len(rankings)
+        fused = {}
+        for ranking, weight in zip(rankings, weights):
+            for rank, doc_id in enumerate(ranking):
+                fused[doc_id] = fused.get(doc_id, 0.0) + weight / (RRF_K + rank + 1)
+        for doc_id in fused:
+            fused[doc_id] *= state.layout.recency_weight(state.positions[doc_id])
+        return sorted(fused, key=fused.get, reverse=True)[:k]
+
+    def embed_queries(self, texts: List[str]) -> np.ndarray:
+        """여러 질의를 한 번의 forward 로 임베딩"""
+        with span("embed_query"):
+            return np.asarray(self.embeddings.embed_documents(list(texts)), dtype=np.float32)
+
+    def retrieve(self, query: str, k: int = 5, filters: Optional[SearchFilter] = None,
+                 embeddings: Optional[List[List[float]]] = None,
+                 weights: Optional[List[float]] = None) -> Tuple[List[Document], Optional[List[float]]]:
+        """하이브리드 검색 (BM25 + FAISS, RRF 융합 + 최신 공지 가산점)
+
+        BM25 는 조건(파티션/공지 기준일)에 맞는 전체 구간, FAISS 는 그중 질의와 가까운 파티션만 탐색한다.
+        embeddings 를 주면 질의를 다시 임베딩하지 않는다. 여러 개면 FAISS 다중 질의 검색 한 번으로
+        각각의 후보를 받아 weights 가중 RRF 로 합친다 (이어지는 질문: 이번 질문 + 이전 질문 벡터).
+        반환값은 (문서 목록, 첫 번째 질의 임베딩). 키워드 fast path로 임베딩을 건너뛰면 임베딩은 None.
+        """
+        self.maybe_reload()
+        state = self._state  # 요청 도중 버전이 바뀌어도 한 버전으로 일관되게 검색
+        return self._search(state, query, k, filters, embeddings, weights)
+
+    def retrieve_batch(self, queries: List[str], k: int = 5,
+                       embeddings: Optional[List[List[List[float]]]] = None,
+                       weights: Optional[List[Optional[List[float]]]] = None) -> List[Tuple[List[Document], List[float]]]:
+        """여러 질의를 한 번에 검색 (배치 질문용)
+
+        질의 임베딩은 한 번의 forward, FAISS 는 한 번의 다중 질의 검색으로 후보를 넉넉히 받은 뒤
+        질의별 파티션 조건으로 거른다. 걸러서 후보가 모자란 질의만 따로 구간 검색한다.
+        embeddings / weights 는 질의별로 retrieve() 와 같은 의미 (주면 임베딩을 건너뛴다).
+        """
+        if not queries:
+            return []
+        self.maybe_reload()
+        state = self._state
+        if embeddings is None:
+            embeddings = [[vector] for vector in self.embed_queries(queries).tolist()]
+        weights = weights or [None] * len(queries)
+        flat = np.asarray([vector for vectors in embeddings for vector in vectors], dtype=np.float32)
+        rows = iter(self._candidates(state, flat, max(k, HYBRID_FETCH_K)))
+        return [
+            self._search(state, query, k, None, vectors, w, candidates=[next(rows) for _ in vectors])
+            for query, vectors, w in zip(queries, embeddings, weights)
+        ]
+
+    def _candidates(self, state: LoadedIndex, vectors: np.ndarray, fetch_k: int) -> np.ndarray:
+        """여러 질의 벡터를 FAISS 한 번으로 검색 (파티션 조건으로 거를 몫까지 넉넉히)"""
+        with span("faiss_search"):
+            return state.db.index.search(vectors, min(fetch_k * 4, state.db.index.ntotal))[1]
+
+    def _search(self, state: LoadedIndex, query: str, k: int, filters: Optional[SearchFilter],
+                embeddings: Optional[List[List[float]]] = None, weights: Optional[List[float]] = None,
+                candidates: Optional[List[np.ndarray]] = None):
+        """retrieve / retrieve_batch 공통. candidates 는 임베딩별로 미리 검색해 둔 FAISS 위치 (조건 적용 전)"""
+        names, since, explicit = self._scope(state, query, filters)
+        fetch_k = max(k, HYBRID_FETCH_K)
+
+        def dense_search(embedding, row=None):
+            routed = names if explicit else state.layout.route(embedding, PARTITION_PROBE, names, query)
+            ranges = self._ranges(state, routed, since)
+            if row is not None:
+                allowed = [int(p) for p in row if p != -1 and (
+                    ranges is None or any(start <= p < end for start, end in ranges)
+                )]
+                if ranges is None or len(allowed) >= fetch_k:
+                    return [state.db.index_to_docstore_id[p] for p in allowed[:fetch_k]]
+            return self._dense_search(state, embedding, fetch_k, ranges)
+
+        def dense_rankings():
+            nonlocal embeddings, candidates
+            if embeddings is None:
+                embeddings = [self.embed_query(query)]
+            if candidates is None and len(embeddings) > 1:
+                candidates = self._candidates(state, np.asarray(embeddings, dtype=np.float32), fetch_k)
+            rows = candidates if candidates is not None else [None] * len(embeddings)
+            return [dense_search(embedding, row) for embedding, row in zip(embeddings, rows)]
+
+        dense_weights = list(weights) if weights else [1.0] * len(embeddings or [None])
+
+        if not HYBRID_SEARCH:
+            dense = dense_rankings()
+            return self._docs(state, self._rank(state, dense, k, dense_weights)), embeddings[0]
+
+        with span("bm25_search"):
+            lexical = [
+                doc_id for doc_id, _ in
+                state.lexical.search(query, k=fetch_k, ranges=self._ranges(state, names, since))
+            ]
+
+        # 짧은 키워드 질의: BM25 상위 k개가 질의 단어를 모두 포함하면 임베딩 없이 반환
+        if self._is_keyword_query(query) and len(lexical) >= k:
+            terms = query_terms(query)
+            if all(state.lexical.covers(doc_id, terms) for doc_id in lexical[:k]):
+                first = embeddings[0] if embeddings else None
+                return self._docs(state, self._rank(state, [lexical[:k]], k)), first
+
+        dense = dense_rankings()
+        ranked = self._rank(state, [*dense, lexical], k, [*dense_weights, 1.0])
+        return self._docs(state, ranked), embeddings[0]
+
     def run(self, query: str, k: int = 5):
-        retriever = self.db.as_retriever(search_kwargs={"k": k})
-        return retriever.invoke(query)
+        return self.retrieve(query, k=k)[0]
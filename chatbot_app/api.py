@@ -1,6 +1,78 @@
-from .agents.chat_agent import ChatAgent
+"""뷰에서 쓰는 ChatAgent 진입점
 
-chat_agent = ChatAgent()
+ChatAgent 는 임베딩 모델과 인덱스를 로드하므로 import 시점이 아니라 처음 필요할 때 만든다.
+(manage.py migrate / check / collectstatic 은 모델을 로드하지 않음)
+"""
+import asyncio
+import threading
+
+_chat_agent = None
+_load_lock = threading.Lock()
+_warmup_lock = threading.Lock()
+_warmup_thread = None
+_load_error = None
+
+def get_chat_agent():
+    """에이전트를 한 번만 생성 (동시에 호출돼도 로드는 한 번)"""
+    global _chat_agent
+    if _chat_agent is None:
+        with _load_lock:
+            if _chat_agent is None:
+                from .agents.chat_agent import ChatAgent
+                _chat_agent = ChatAgent()
+    return _chat_agent
+
+async def aget_chat_agent():
+    """로드 중이면 이벤트 루프를 막지 않고 스레드에서 기다린다"""
+    if _chat_agent is not None:
+        return _chat_agent
+    return await asyncio.to_thread(get_chat_agent)
+
+def is_ready():
+    return _chat_agent is not None
+
+def load_error():
+    return _load_error
+
+def _warmup():
+    global _load_error
+    try:
+        get_chat_agent()
+        _load_error = None
+        print("챗봇 에이전트 준비 완료")
+    except Exception as e:
+        _load_error = e
+        print(f"챗봇 에이전트 로드 실패: {e}")
+
+def start_warmup():
+    """백그라운드 스레드에서 에이전트 미리 로드 (이미 로드됐거나 진행 중이면 무시)"""
+    global _warmup_thread
+    with _warmup_lock:
+        if _chat_agent is not None or (_warmup_thread is not None and _warmup_thread.is_alive()):
+            return
+        _warmup_thread = threading.Thread(target=_warmup, name="lyolla-warmup", daemon=True)
+        _warmup_thread.start()
 
 def process_question(user_question, history):
-    return chat_agent.run(user_question, history)
+    return get_chat_agent().run(user_question, history)
+
+def stream_question(user_question, history):
+    return get_chat_agent().stream(user_question, history)
+
+async def aprocess_question(user_question, history):
+    agent = await aget_chat_agent()
+    return await agent.arun(user_question, history)
+
+def astream_question(user_question, history):
+    """호출 전에 aget_chat_agent() 로 로드를 끝내 둘 것 (스트림 도중 로드하지 않도록)"""
+    return get_chat_agent().astream(user_question, history)
+
+def arun_batch(questions, concurrency):
+    """호출 전에 aget_chat_agent() 로 로드를 끝내 둘 것"""
+    return get_chat_agent().arun_batch(questions, concurrency)
+
+def cache_stats():
+    return _chat_agent.cache_stats() if _chat_agent is not None else {}
+
+def check_capacity():
+    get_chat_agent().limiter.check()
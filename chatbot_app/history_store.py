@@ -0,0 +1,91 @@
+"""세션별 대화 이력 저장소 (Django 캐시 백엔드 위의 링 버퍼)
+
+세션에는 대화 ID만 두고, 이력은 질문/답변 한 쌍(교환) 단위로 캐시에 추가만 한다.
+
+chat:<대화ID>:head        마지막 교환 번호 (incr)
+chat:<대화ID>:<n % 용량>   n 번째 교환 {"seq", "question", "answer", "embedding"}
+
+embedding 은 그 질문의 질의 임베딩(float32 바이트). 다음 질문 검색 때 다시 임베딩하지 않고 쓴다.
+
+용량을 넘으면 오래된 슬롯을 덮어쓰고, 모든 키는 TTL 이 지나면 스스로 만료된다.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from array import array
+import math
+import uuid
+
+
+class HistoryStore:
+    def __init__(self, alias: str = None, capacity: int = None, ttl: int = None):
+        self.alias = alias or settings.CHAT_HISTORY_CACHE
+        self.capacity = capacity or settings.CHAT_HISTORY_MAX_EXCHANGES
+        self.ttl = ttl or settings.CHAT_HISTORY_TTL
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _key(self, chat_id: str, suffix) -> str:
+        return f"chat:{chat_id}:{suffix}"
+
+    @staticmethod
+    def new_chat_id() -> str:
+        return uuid.uuid4().hex
+
+    async def append(self, chat_id: str, question: str, answer: str, embedding=None) -> int:
+        """교환 하나를 추가 (전체 이력을 다시 쓰지 않음)"""
+        head = self._key(chat_id, "head")
+        await self.cache.aadd(head, 0, self.ttl)
+        try:
+            seq = await self.cache.aincr(head)
+        except ValueError:  # add 와 incr 사이에 만료된 경우
+            seq = 1
+            await self.cache.aset(head, seq, self.ttl)
+        await self.cache.aset(
+            self._key(chat_id, seq % self.capacity),
+            {
+                "seq": seq,
+                "question": question,
+                "answer": answer,
+                "embedding": array("f", embedding).tobytes() if embedding else None,
+            },
+            self.ttl,
+        )
+        await self.cache.atouch(head, self.ttl)
+        return seq
+
+    async def recent(self, chat_id: str, turns: int) -> list:
+        """최근 turns 개 메시지만 [{"role", "content"}, ...] 형태로 읽는다
+
+        질의 임베딩이 저장된 사용자 메시지에는 "embedding"(float 목록)이 붙는다.
+        """
+        if not chat_id or turns <= 0:
+            return []
+        seq = await self.cache.aget(self._key(chat_id, "head"))
+        if not seq:
+            return []
+        exchanges = min(self.capacity, math.ceil(turns / 2))
+        seqs = range(max(1, seq - exchanges + 1), seq + 1)
+        keys = {s: self._key(chat_id, s % self.capacity) for s in seqs}
+        found = await self.cache.aget_many(keys.values())
+
+        history = []
+        for s in seqs:
+            entry = found.get(keys[s])
+            if not entry or entry["seq"] != s:  # 만료됐거나 덮어써진 슬롯
+                continue
+            question = {"role": "user", "content": entry["question"]}
+            if entry.get("embedding"):
+                question["embedding"] = array("f", entry["embedding"]).tolist()
+            history.append(question)
+            history.append({"role": "assistant", "content": entry["answer"]})
+        return history[-turns:]
+
+    async def clear(self, chat_id: str):
+        keys = [self._key(chat_id, "head")]
+        keys += [self._key(chat_id, i) for i in range(self.capacity)]
+        await self.cache.adelete_many(keys)
+
+
+history_store = HistoryStore()
@@ -0,0 +1,276 @@
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+DEFAULT_QUESTIONS = Path(settings.BASE_DIR) / "database" / "benchmark_questions.json"
+
+
+def _percentiles(values) -> dict:
+    if not values:
+        return {"n": 0}
+    arr = np.asarray(values) * 1000  # ms
+    return {
+        "n": len(values),
+        "p50": float(np.percentile(arr, 50)),
+        "p95": float(np.percentile(arr, 95)),
+        "p99": float(np.percentile(arr, 99)),
+    }
+
+
+def _rss_mb() -> dict:
+    """현재/최대 RSS (MB)"""
+    current = None
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    current = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak = peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    return {"current": current, "peak": peak}
+
+
+class Command(BaseCommand):
+    help = "기록된 질문 세트로 오프라인 성능 벤치마크 (단계별 지연, 동시 처리량, 인덱스 빌드, RSS, recall@k)"
+
+    # 시스템 체크가 URLconf(→ 에이전트 설정)를 먼저 불러오지 않도록 생략 (_configure_env 참고)
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", default=str(DEFAULT_QUESTIONS),
+                            help="질문/이전 대화/정답 제목 JSON")
+        parser.add_argument("--k", type=int, default=5, help="recall@k 의 k")
+        parser.add_argument("--llm", choices=["fake", "gemini"], default="fake",
+                            help="fake 는 네트워크 없이 지연 시간만 흉내 낸다")
+        parser.add_argument("--first-token-latency", type=float, default=0.8, help="fake LLM 첫 토큰 지연(초)")
+        parser.add_argument("--tokens-per-sec", type=float, default=60.0, help="fake LLM 토큰 생성 속도")
+        parser.add_argument("--answer-cache", action="store_true",
+                            help="답변 캐시를 켠 채로 측정 (기본은 꺼서 전체 경로 측정)")
+        parser.add_argument("--concurrency", default="1,4,16",
+                            help="동시 클라이언트 수 목록 (쉼표 구분, 빈 값이면 처리량 측정 생략)")
+        parser.add_argument("--requests", type=int, default=0,
+                            help="동시성 단계마다 보낼 요청 수 (기본: 질문 수 x 2)")
+        parser.add_argument("--url", help="실행 중인 서버 주소 (예: http://127.0.0.1:8000). 없으면 프로세스 내부 ASGI 앱")
+        parser.add_argument("--build-index", action="store_true", help="인덱스 전체 빌드 시간 측정 (임시 디렉터리)")
+        parser.add_argument("--output", help="결과를 JSON 으로 저장 (회귀 비교용)")
+
+    # -------------------------------
+    # 준비
+    # -------------------------------
+    def _configure_env(self, options):
+        """에이전트 설정은 import 시점에 읽으므로 에이전트 모듈을 불러오기 전에 지정"""
+        if "chatbot_app.agents.config" in sys.modules:
+            raise CommandError("에이전트 설정이 이미 로드되어 LLM/캐시 설정을 바꿀 수 없습니다.")
+        os.environ["LYOLLA_LLM_BACKEND"] = options["llm"]
+        os.environ["LYOLLA_FAKE_LLM_FIRST_TOKEN_LATENCY"] = str(options["first_token_latency"])
+        os.environ["LYOLLA_FAKE_LLM_TOKENS_PER_SEC"] = str(options["tokens_per_sec"])
+        if not options["answer_cache"]:
+            os.environ["LYOLLA_ANSWER_CACHE"] = "0"
+
+    def _load_questions(self, path):
+        with open(path, encoding="utf-8") as f:
+            questions = json.load(f)
+        if not questions:
+            raise CommandError(f"질문이 없습니다: {path}")
+        return questions
+
+    # -------------------------------
+    # 검색 품질
+    # -------------------------------
+    def _recall(self, agent, questions, k) -> dict:
+        recalls, hits = [], 0
+        for item in questions:
+            expected = set(item.get("expected", []))
+            if not expected:
+                continue
+            docs, _ = agent.retrieve(item["question"], item.get("history", []), k=k)
+            found = expected & {d.metadata.get("title", "") for d in docs}
+            recalls.append(len(found) / len(expected))
+            hits += bool(found)
+        return {
+            "k": k,
+            "labeled": len(recalls),
+            "recall": float(np.mean(recalls)) if recalls else None,
+            "hit_rate": hits / len(recalls) if recalls else None,
+        }
+
+    # -------------------------------
+    # 단계별 지연 (순차 실행)
+    # -------------------------------
+    def _stage_latency(self, agent, questions) -> dict:
+        from chatbot_app.agents.metrics import start_timings
+
+        stages, totals = {}, []
+        for item in questions:
+            timings = start_timings()
+            start = time.perf_counter()
+            for _ in agent.stream(item["question"], item.get("history", [])):
+                pass
+            totals.append(time.perf_counter() - start)
+            for stage, seconds in timings.items():
+                stages.setdefault(stage, []).append(seconds)
+        result = {stage: _percentiles(values) for stage, values in sorted(stages.items())}
+        result["total"] = _percentiles(totals)
+        return result
+
+    # -------------------------------
+    # 동시 처리량 (Django 앱 대상)
+    # -------------------------------
+    def _client_plan(self, questions, clients, total):
+        """클라이언트마다 질문 순서를 달리해 같은 질문이 동시에 몰리지 않게 한다"""
+        plans = [[] for _ in range(clients)]
+        for i in range(total):
+            plans[i % clients].append(questions[(i + i % clients) % len(questions)]["question"])
+        return plans
+
+    async def _run_inprocess(self, plans):
+        from django.test import AsyncClient
+
+        latencies, errors = [], 0
+
+        async def client_loop(plan):
+            nonlocal errors
+            client = AsyncClient()
+            for question in plan:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/chat/api/", data={"question": question}, content_type="application/json"
+                )
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(plan) for plan in plans))
+        return latencies, errors, time.perf_counter() - start
+
+    def _run_http(self, url, plans):
+        import requests
+
+        latencies, errors = [], 0
+
+        def client_loop(plan):
+            nonlocal errors
+            session = requests.Session()
+            for question in plan:
+                start = time.perf_counter()
+                try:
+                    response = session.post(f"{url.rstrip('/')}/chat/api/", json={"question": question}, timeout=120)
+                    ok = response.status_code == 200
+                except requests.RequestException:
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                errors += not ok
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(plans)) as pool:
+            list(pool.map(client_loop, plans))
+        return latencies, errors, time.perf_counter() - start
+
+    def _throughput(self, questions, levels, total, url) -> list:
+        results = []
+        for clients in levels:
+            plans = self._client_plan(questions, clients, total)
+            if url:
+                latencies, errors, wall = self._run_http(url, plans)
+            else:
+                # 세션은 메모리 캐시에 두어 마이그레이션되지 않은 DB 없이도 돌게 한다
+                with override_settings(
+                    SESSION_ENGINE="django.contrib.sessions.backends.cache",
+                    ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+                ):
+                    latencies, errors, wall = asyncio.run(self._run_inprocess(plans))
+            results.append({
+                "clients": clients,
+                "requests": len(latencies),
+                "errors": errors,
+                "seconds": wall,
+                "rps": len(latencies) / wall if wall else 0.0,
+                "latency": _percentiles(latencies),
+            })
+        return results
+
+    # -------------------------------
+    # 인덱스 빌드
+    # -------------------------------
+    def _build_index(self, agent) -> dict:
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            agent.vector_agent.build_index(Path(tmp))
+            return {"seconds": time.perf_counter() - start}
+
+    # -------------------------------
+    # 출력
+    # -------------------------------
+    def _write_latency_table(self, title, table):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        self.stdout.write(f"  {'단계':<20}{'n':>6}{'p50(ms)':>12}{'p95(ms)':>12}{'p99(ms)':>12}")
+        for name, row in table.items():
+            if not row.get("n"):
+                continue
+            self.stdout.write(
+                f"  {name:<20}{row['n']:>6}{row['p50']:>12.1f}{row['p95']:>12.1f}{row['p99']:>12.1f}"
+            )
+
+    def handle(self, *args, **options):
+        self._configure_env(options)
+        questions = self._load_questions(options["questions"])
+        levels = [int(c) for c in options["concurrency"].split(",") if c.strip()]
+        total = options["requests"] or len(questions) * 2
+        report = {"options": {k: options[k] for k in ("llm", "first_token_latency", "tokens_per_sec",
+                                                      "answer_cache", "k")}}
+
+        start = time.perf_counter()
+        if options["url"]:
+            from chatbot_app.agents.chat_agent import ChatAgent
+            agent = ChatAgent()
+        else:
+            # 처리량 측정과 같은 에이전트 인스턴스를 쓴다
+            from chatbot_app.api import get_chat_agent
+            agent = get_chat_agent()
+        report["startup_seconds"] = time.perf_counter() - start
+        report["rss_after_startup_mb"] = _rss_mb()
+
+        report["retrieval"] = self._recall(agent, questions, options["k"])
+        report["stages"] = self._stage_latency(agent, questions)
+        if levels:
+            report["throughput"] = self._throughput(questions, levels, total, options["url"])
+        if options["build_index"]:
+            report["index_build"] = self._build_index(agent)
+        report["rss_mb"] = _rss_mb()
+
+        r = report["retrieval"]
+        self.stdout.write(f"에이전트 기동: {report['startup_seconds']:.2f}s")
+        if r["recall"] is not None:
+            self.stdout.write(
+                f"recall@{r['k']}: {r['recall']:.3f} (적중률 {r['hit_rate']:.3f}, 정답 있는 질문 {r['labeled']}개)"
+            )
+        self._write_latency_table("단계별 지연 (순차 실행)", report["stages"])
+        for row in report.get("throughput", []):
+            lat = row["latency"]
+            self.stdout.write(
+                f"동시 {row['clients']:>3}명: {row['rps']:.2f} req/s, 요청 {row['requests']}개, 오류 {row['errors']}개, "
+                f"p50 {lat.get('p50', 0):.0f}ms / p95 {lat.get('p95', 0):.0f}ms / p99 {lat.get('p99', 0):.0f}ms"
+            )
+        if "index_build" in report:
+            self.stdout.write(f"인덱스 전체 빌드: {report['index_build']['seconds']:.1f}s (임베딩 캐시 사용)")
+        rss = report["rss_mb"]
+        current = f"{rss['current']:.0f}MB" if rss["current"] is not None else "?"
+        self.stdout.write(f"워커 RSS: 현재 {current}, 최대 {rss['peak']:.0f}MB")
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+            self.stdout.write(f"결과 저장: {options['output']}")
@@ -0,0 +1,70 @@
+from collections import Counter
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chatbot_app.agents.config import BATCH_CONCURRENCY, FAQ_DIR, QUERY_LOG_DIR
+from chatbot_app.agents.faq_table import write_faq
+from chatbot_app.agents.query_log import read_entries
+
+
+class Command(BaseCommand):
+    help = "질의 로그에서 자주 묻는 첫 질문 상위 N개를 골라 답변을 미리 만들어 현재 인덱스 버전의 FAQ 답변표로 저장"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=50, help="답변을 만들 질문 수")
+        parser.add_argument("--min-count", type=int, default=3, help="이 횟수 이상 들어온 질문만")
+        parser.add_argument("--days", type=int, default=30, help="최근 며칠 로그를 볼지 (0이면 전체)")
+        parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="동시에 진행할 LLM 호출 수")
+        parser.add_argument("--dry-run", action="store_true", help="고른 질문만 출력하고 답변은 만들지 않음")
+
+    def _popular(self, days, top, min_count):
+        """정규화 키별 횟수 + 가장 많이 쓰인 원문(개인정보 제거본)"""
+        counts, texts = Counter(), {}
+        for entry in read_entries(QUERY_LOG_DIR, days):
+            if not entry.get("first_turn") or not entry.get("key"):
+                continue
+            counts[entry["key"]] += 1
+            texts.setdefault(entry["key"], Counter())[entry["question"]] += 1
+        return [
+            (key, texts[key].most_common(1)[0][0], count)
+            for key, count in counts.most_common(top) if count >= min_count
+        ]
+
+    def handle(self, *args, **options):
+        popular = self._popular(options["days"], options["top"], options["min_count"])
+        if not popular:
+            raise CommandError(f"조건에 맞는 질문이 없습니다: {QUERY_LOG_DIR}")
+        for key, question, count in popular:
+            self.stdout.write(f"{count:6d}  {question}")
+        if options["dry_run"]:
+            return
+
+        from chatbot_app.api import get_chat_agent
+
+        agent = get_chat_agent()
+        version = agent.vector_agent.manifest_version
+        start = time.perf_counter()
+        counts = {key: count for key, _, count in popular}
+        entries, failed = {}, 0
+        for result in agent.run_batch([{"id": key, "question": q} for key, q, _ in popular], options["concurrency"]):
+            # 실패했거나 마감 초과로 대체 답변이 나온 질문은 답변표에 넣지 않는다
+            if "error" in result or result.get("fallback"):
+                failed += 1
+                self.stderr.write(f"실패: {result['question']} ({result.get('error', 'fallback')})")
+                continue
+            entries[result["id"]] = {
+                "question": result["question"],
+                "answer": result["answer"],
+                "sources": result["sources"],
+                "count": counts[result["id"]],
+            }
+
+        agent.vector_agent.maybe_reload(force=True)
+        if agent.vector_agent.manifest_version != version:
+            raise CommandError("답변을 만드는 동안 인덱스 버전이 바뀌었습니다. 다시 실행하세요.")
+        path = write_faq(entries, version, FAQ_DIR)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"FAQ 답변표 저장: {path} (질문 {len(entries)}개, 실패 {failed}개, 인덱스 {version}, {elapsed:.1f}s)"
+        ))
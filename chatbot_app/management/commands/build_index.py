@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from chatbot_app.agents.index_versions import current_version
+from chatbot_app.agents.vector_store_agent import DB_PATH, VectorStoreAgent
+
+
+class Command(BaseCommand):
+    help = "원본 JSON 이 바뀌었으면 FAISS/BM25 인덱스를 새 버전으로 빌드해 게시 (실행 중인 서버는 자동으로 교체)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true",
+                            help="원본 변경 여부와 관계없이 증분 갱신 대신 전체 재빌드")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        agent = VectorStoreAgent(load=False)
+        published = agent.refresh_index(force_full=options["full"])
+        elapsed = time.perf_counter() - start
+        version = current_version(DB_PATH)
+        if published:
+            self.stdout.write(self.style.SUCCESS(f"새 인덱스 버전 게시: {version} ({elapsed:.1f}s)"))
+        else:
+            self.stdout.write(f"인덱스가 이미 최신입니다: {version}")
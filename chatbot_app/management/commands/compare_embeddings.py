@@ -0,0 +1,85 @@
+import json
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from chatbot_app.agents.embedding_backends import OnnxEmbeddings, torch_embeddings
+from chatbot_app.agents.index_versions import current_version
+from chatbot_app.agents.vector_store_agent import DB_PATH, JSON_FILES, VectorStoreAgent
+
+
+class Command(BaseCommand):
+    help = (
+        "ONNX(int8) 질의 임베딩의 recall@k 를 torch 모델 기준으로 비교 "
+        "(FAISS 단독 검색 + 실제 검색 경로: 파티션 라우팅 · BM25 융합 · 최신 공지 가산점)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--k", type=int, default=5)
+        parser.add_argument("--queries", help="질문 목록 파일 (한 줄에 하나). 없으면 코퍼스 제목 사용")
+        parser.add_argument("--limit", type=int, default=200)
+
+    def _load_queries(self, path, limit):
+        if path:
+            with open(path, encoding="utf-8") as f:
+                queries = [line.strip() for line in f if line.strip()]
+        else:
+            queries = []
+            for p in JSON_FILES:
+                data = json.loads(p.read_text(encoding="utf-8"))
+                queries.extend(item.get("title", "") for item in data if item.get("title"))
+        return list(dict.fromkeys(queries))[:limit]
+
+    def _embed_all(self, embeddings, queries):
+        start = time.perf_counter()
+        vectors = np.asarray([embeddings.embed_query(q) for q in queries], dtype=np.float32)
+        per_query_ms = (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+        return vectors, per_query_ms
+
+    @staticmethod
+    def _overlap(a, b, k):
+        return float(np.mean([len(set(x) & set(y)) / k for x, y in zip(a, b)]))
+
+    def _retrieved(self, agent, queries, vectors, k):
+        """서비스와 같은 retrieve 경로로 검색한 청크 내용 (질의 임베딩만 바꿔 넣음)"""
+        results = agent.retrieve_batch(queries, k=k, embeddings=[[v] for v in vectors.tolist()])
+        return [[doc.page_content for doc in docs] for docs, _ in results]
+
+    def handle(self, *args, **options):
+        version = current_version(DB_PATH)
+        if version is None:
+            raise CommandError("게시된 인덱스가 없습니다. manage.py build_index 를 먼저 실행하세요.")
+        k = options["k"]
+        queries = self._load_queries(options["queries"], options["limit"])
+
+        start = time.perf_counter()
+        reference = torch_embeddings()
+        torch_load = time.perf_counter() - start
+        start = time.perf_counter()
+        candidate = OnnxEmbeddings()
+        onnx_load = time.perf_counter() - start
+
+        # 인덱스는 torch 모델로 만든 게시된 인덱스를 그대로 사용 (새로 빌드하지 않음)
+        agent = VectorStoreAgent(load=False)
+        agent._state = agent._load(version)
+        ref_vecs, torch_ms = self._embed_all(reference, queries)
+        cand_vecs, onnx_ms = self._embed_all(candidate, queries)
+
+        index = agent.db.index
+        _, ref_top = index.search(ref_vecs, k)
+        _, cand_top = index.search(cand_vecs, k)
+        recall = self._overlap(ref_top.tolist(), cand_top.tolist(), k)
+        retrieval = self._overlap(
+            self._retrieved(agent, queries, ref_vecs, k), self._retrieved(agent, queries, cand_vecs, k), k
+        )
+        cos = np.sum(ref_vecs * cand_vecs, axis=1) / (
+            np.linalg.norm(ref_vecs, axis=1) * np.linalg.norm(cand_vecs, axis=1)
+        )
+
+        self.stdout.write(f"질의 수: {len(queries)}, k={k}")
+        self.stdout.write(f"recall@{k} (torch 결과 대비, FAISS 단독): {recall:.4f}")
+        self.stdout.write(f"recall@{k} (torch 결과 대비, 실제 검색 경로): {retrieval:.4f}")
+        self.stdout.write(f"질의 벡터 코사인 유사도: 평균 {cos.mean():.4f}, 최소 {cos.min():.4f}")
+        self.stdout.write(f"모델 로드: torch {torch_load:.2f}s / onnx {onnx_load:.2f}s")
+        self.stdout.write(f"질의당 임베딩: torch {torch_ms:.1f}ms / onnx {onnx_ms:.1f}ms")
@@ -0,0 +1,23 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from chatbot_app.agents.notice_crawler_agent import NoticeCrawlerAgent
+
+
+class Command(BaseCommand):
+    help = "도서관 공지사항을 크롤링해 database/notices.json 갱신 (필요하면 이어서 인덱스 갱신)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--incremental", action="store_true",
+                            help="이미 저장된 공지는 다시 받지 않고 새 공지만 크롤링")
+        parser.add_argument("--build-index", action="store_true",
+                            help="크롤링 후 바뀐 공지만 인덱스에 반영 (manage.py build_index 와 동일)")
+
+    def handle(self, *args, **options):
+        crawler = NoticeCrawlerAgent(output_dir=str(Path(settings.BASE_DIR) / "database"))
+        self.stdout.write(crawler.run(incremental=options["incremental"]))
+        if options["build_index"]:
+            call_command("build_index", stdout=self.stdout, stderr=self.stderr)
@@ -0,0 +1,41 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chatbot_app.agents.config import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_BATCH_MAX,
+    EMBEDDING_BATCH_WAIT_MS,
+    EMBEDDING_SOCKET,
+)
+from chatbot_app.agents.embedding_backends import make_embeddings
+from chatbot_app.agents.embedding_server import ping, serve
+
+
+class Command(BaseCommand):
+    help = "워커들이 공유하는 질의 임베딩 서버 실행 (유닉스 소켓, 동시 요청 마이크로 배치)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--socket", default=EMBEDDING_SOCKET, help="유닉스 소켓 경로 (기본: LYOLLA_EMBEDDING_SOCKET)")
+        parser.add_argument("--backend", choices=["torch", "onnx"], default=EMBEDDING_BACKEND)
+        parser.add_argument("--max-batch", type=int, default=EMBEDDING_BATCH_MAX, help="한 번에 임베딩할 최대 문장 수")
+        parser.add_argument("--max-wait-ms", type=float, default=EMBEDDING_BATCH_WAIT_MS,
+                            help="첫 요청 이후 배치를 더 모으는 최대 대기 시간(ms)")
+        parser.add_argument("--status", action="store_true", help="실행 중인 서버 상태만 출력")
+
+    def handle(self, *args, **options):
+        path = options["socket"]
+        if not path:
+            raise CommandError("--socket 또는 LYOLLA_EMBEDDING_SOCKET 을 지정하세요.")
+        if options["status"]:
+            try:
+                self.stdout.write(str(ping(path)))
+            except OSError as e:
+                raise CommandError(f"임베딩 서버에 연결할 수 없습니다: {e}")
+            return
+
+        embeddings = make_embeddings(options["backend"])
+        try:
+            asyncio.run(serve(embeddings, path, options["max_batch"], options["max_wait_ms"]))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from chatbot_app.agents.config import EMBEDDING_MODEL, ONNX_MODEL_DIR
+from chatbot_app.agents.embedding_backends import export_onnx
+
+
+class Command(BaseCommand):
+    help = "임베딩 모델을 ONNX로 내보내고 int8 동적 양자화 적용"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", default=EMBEDDING_MODEL)
+        parser.add_argument("--out", default=str(ONNX_MODEL_DIR))
+        parser.add_argument("--max-length", type=int, default=128)
+
+    def handle(self, *args, **options):
+        path = export_onnx(options["model"], options["out"], options["max_length"])
+        self.stdout.write(self.style.SUCCESS(f"ONNX 모델 저장: {path}"))
+        self.stdout.write("LYOLLA_EMBEDDING_BACKEND=onnx 로 설정하기 전에 compare_embeddings 로 recall@k 를 확인하세요.")
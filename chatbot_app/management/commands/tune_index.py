@@ -0,0 +1,98 @@
+import json
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from chatbot_app.agents.ann_index import INDEX_TYPES, choose_index_type, recommend, sweep
+from chatbot_app.agents.docstore import MmapDocstore
+from chatbot_app.agents.index_versions import current_index_path
+from chatbot_app.agents.vector_store_agent import DB_PATH, VectorStoreAgent
+
+DEFAULT_QUESTIONS = Path(settings.BASE_DIR) / "database" / "benchmark_questions.json"
+
+
+class Command(BaseCommand):
+    help = "FAISS 인덱스 종류(flat/hnsw/ivf/ivfpq)별 recall@k / 질의당 지연 / 크기를 flat 정확 검색 기준으로 비교"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--k", type=int, default=5)
+        parser.add_argument("--types", default=",".join(INDEX_TYPES), help="비교할 인덱스 종류 (쉼표 구분)")
+        parser.add_argument("--questions", default=str(DEFAULT_QUESTIONS), help="질의로 쓸 질문 JSON")
+        parser.add_argument("--limit", type=int, default=200, help="질문에 더해 질의로 쓸 청크 제목 수")
+        parser.add_argument("--simulate-size", type=int, default=0,
+                            help="현재 청크 벡터에 잡음을 섞어 이 개수까지 늘려서 측정 (코퍼스 증가 대비)")
+        parser.add_argument("--min-recall", type=float, default=0.95, help="추천 기준 recall@k 하한")
+        parser.add_argument("--output", help="결과를 JSON 으로 저장")
+
+    def _queries(self, path, docstore, limit):
+        queries = []
+        if path and Path(path).exists():
+            with open(path, encoding="utf-8") as f:
+                queries.extend(item["question"] for item in json.load(f))
+        titles = (docstore.search(doc_id).metadata.get("title", "") for doc_id in docstore.ids)
+        queries.extend(list(dict.fromkeys(t for t in titles if t))[:limit])
+        return queries
+
+    def _simulate(self, vectors, size):
+        """실제 벡터 주변에 잡음을 섞은 벡터를 더해 큰 코퍼스를 흉내"""
+        rng = np.random.default_rng(0)
+        scale = float(np.std(vectors)) * 0.5
+        extra = vectors[rng.integers(0, len(vectors), size - len(vectors))]
+        extra = extra + rng.normal(0, scale, extra.shape).astype(np.float32)
+        return np.vstack([vectors, extra])
+
+    def handle(self, *args, **options):
+        path = current_index_path(DB_PATH)
+        if path is None:
+            raise CommandError("게시된 인덱스가 없습니다. manage.py build_index 를 먼저 실행하세요.")
+        kinds = [t.strip() for t in options["types"].split(",") if t.strip()]
+        unknown = set(kinds) - set(INDEX_TYPES)
+        if unknown:
+            raise CommandError(f"알 수 없는 인덱스 종류: {', '.join(sorted(unknown))}")
+
+        agent = VectorStoreAgent(load=False)
+        docstore = MmapDocstore(path)
+        texts = [docstore.search(doc_id).page_content for doc_id in docstore.ids]
+        # 청크 벡터는 임베딩 캐시에서 (새로 임베딩하지 않음)
+        vectors = np.asarray(agent._cached_embeddings().embed_documents(texts), dtype=np.float32)
+        if options["simulate_size"] > len(vectors):
+            vectors = self._simulate(vectors, options["simulate_size"])
+        queries = self._queries(options["questions"], docstore, options["limit"])
+        query_vectors = np.asarray([agent.embeddings.embed_query(q) for q in queries], dtype=np.float32)
+
+        rows = sweep(vectors, query_vectors, k=options["k"], kinds=kinds)
+        manifest = json.loads((path / "manifest.json").read_text(encoding="utf-8"))
+        current = manifest.get("faiss_index", {}).get("type", "flat")
+
+        self.stdout.write(
+            f"벡터 {len(vectors)}개 x {vectors.shape[1]}차원, 질의 {len(queries)}개, "
+            f"현재 인덱스 {current}, 이 크기에서 auto 선택 {choose_index_type(len(vectors), 'auto')}"
+        )
+        self.stdout.write(
+            f"  {'종류':<8}{'파라미터':<14}{'recall@' + str(options['k']):>10}{'ms/질의':>10}{'크기(MB)':>10}{'빌드(s)':>9}"
+        )
+        for r in rows:
+            if "skipped" in r:
+                self.stdout.write(f"  {r['type']:<8}건너뜀: {r['skipped']}")
+                continue
+            param = f"{r['param']}={r['value']}" if r["param"] else "-"
+            self.stdout.write(
+                f"  {r['type']:<8}{param:<14}{r['recall']:>10.3f}{r['ms']:>10.3f}"
+                f"{r['bytes'] / 1e6:>10.1f}{r['build_seconds']:>9.2f}"
+            )
+        best = recommend(rows, options["min_recall"])
+        if best is not None:
+            param = f" ({best['param']}={best['value']})" if best["param"] else ""
+            self.stdout.write(self.style.SUCCESS(
+                f"recall {options['min_recall']} 이상 중 가장 빠른 조합: {best['type']}{param}"
+            ))
+
+        if options["output"]:
+            Path(options["output"]).write_text(
+                json.dumps({"vectors": len(vectors), "queries": len(queries), "rows": rows},
+                           ensure_ascii=False, indent=2),
+                encoding="utf-8",
+            )
+            self.stdout.write(f"결과 저장: {options['output']}")
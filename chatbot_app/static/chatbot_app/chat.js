@@ -81,9 +81,12 @@ document.addEventListener("DOMContentLoaded", () => {
         chatMessages.appendChild(loading);
         chatMessages.scrollTop = chatMessages.scrollHeight; 
 
+        // 스트리밍 중인 답변 말풍선 (첫 토큰이 올 때 생성)
+        let botMsg = null;
+
         try {
-            // const response = await fetch("http://127.0.0.1:8000/chat/api/", { // 개발용
-            const response = await fetch("/chat/api/", {
+            // const response = await fetch("http://127.0.0.1:8000/chat/api/stream/", { // 개발용
+            const response = await fetch("/chat/api/stream/", {
                 method: "POST",
                 headers: {
                     "Content-Type": "application/json",
@@ -91,17 +94,74 @@ document.addEventListener("DOMContentLoaded", () => {
                 },
                 body: JSON.stringify({ question: text }),
             });
+            if (!response.ok) {
+                // 503: 요청이 몰려 처리 한도를 넘은 경우
+                const data = await response.json().catch(() => ({}));
+                throw new Error(data.message || "서버 오류 (" + response.status + ")");
+            }
+
+            // SSE 스트림 읽기: sources → token... → done
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = "";
+            let answer = "";
+
+            const handleEvent = (name, data) => {
+                if (name === "token") {
+                    answer += data.text;
+                    if (!botMsg) {
+                        chatMessages.removeChild(loading);
+                        botMsg = document.createElement("div");
+                        botMsg.classList.add("message", "bot-message");
+                        chatMessages.appendChild(botMsg);
+                    }
+                    botMsg.innerHTML = renderMarkdown(answer);
+                } else if (name === "done") {
+                    answer = data.answer || answer;
+                } else if (name === "error") {
+                    throw new Error(data.message);
+                }
+            };
+
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
 
-            const data = await response.json();
-            chatMessages.removeChild(loading);
+                let sep;
+                while ((sep = buffer.indexOf("\n\n")) !== -1) {
+                    const frame = buffer.slice(0, sep);
+                    buffer = buffer.slice(sep + 2);
 
-            if (data.answer) {
-                addMessage(data.answer, false);
+                    let name = "message";
+                    let payload = "";
+                    frame.split("\n").forEach(line => {
+                        if (line.startsWith("event: ")) name = line.slice(7);
+                        else if (line.startsWith("data: ")) payload += line.slice(6);
+                    });
+                    if (payload) handleEvent(name, JSON.parse(payload));
+                }
+            }
+
+            // 완성된 답변으로 말풍선 교체 (링크 처리 포함)
+            if (botMsg) chatMessages.removeChild(botMsg);
+            else chatMessages.removeChild(loading);
+
+            if (answer) {
+                addMessage(answer, false);
             } else {
                 addMessage("답변을 불러올 수 없습니다.", false);
             }
         } catch (err) {
-            chatMessages.removeChild(loading);
+            if (loading.parentNode) chatMessages.removeChild(loading);
+            // 토큰을 받던 중 오류가 나면 받은 부분이 완성된 답변처럼 보이지 않게 표시
+            if (botMsg && botMsg.parentNode) {
+                botMsg.classList.add("partial-message");
+                const note = document.createElement("div");
+                note.classList.add("partial-note");
+                note.textContent = "답변이 중간에 끊겼습니다. 위 내용은 완전하지 않을 수 있어요.";
+                botMsg.appendChild(note);
+            }
             addMessage("오류 발생: " + err.message, false);
         }
     });
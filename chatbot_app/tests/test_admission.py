@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from chatbot_app.agents.admission import ConcurrencyLimiter, ServerBusy
+
+
+class ConcurrencyLimiterTests(unittest.TestCase):
+    def _contend(self, limiter, n=3, hold=0.05):
+        """n 개 작업이 한 자리를 두고 경쟁 → 동시에 자리를 잡은 최대 수"""
+        active = peak = 0
+
+        async def work():
+            nonlocal active, peak
+            async with limiter.aslot():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(hold)
+                active -= 1
+
+        async def main():
+            await asyncio.gather(*(work() for _ in range(n)))
+
+        asyncio.run(main())
+        return peak
+
+    def test_aslot_across_event_loops(self):
+        limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=8, max_wait=5)
+        self.assertEqual(self._contend(limiter), 1)
+        # 두 번째 asyncio.run (새 이벤트 루프) 에서도 경쟁 상황이 그대로 동작해야 한다
+        self.assertEqual(self._contend(limiter), 1)
+
+    def test_sync_and_async_share_budget(self):
+        limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=8, max_wait=0.1)
+        entered, leave = threading.Event(), threading.Event()
+
+        def hold():
+            with limiter.slot():
+                entered.set()
+                leave.wait(5)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        entered.wait(5)
+
+        async def try_async():
+            async with limiter.aslot():
+                pass
+
+        try:
+            with self.assertRaises(ServerBusy):
+                asyncio.run(try_async())
+        finally:
+            leave.set()
+            thread.join()
+        asyncio.run(try_async())  # 자리가 비면 다시 들어간다
+
+    def test_cancelled_waiter_does_not_leak_slot(self):
+        limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=8, max_wait=5)
+
+        async def main():
+            async def holder():
+                async with limiter.aslot():
+                    await asyncio.sleep(0.1)
+
+            task = asyncio.ensure_future(holder())
+            await asyncio.sleep(0.01)
+            with self.assertRaises(asyncio.TimeoutError):
+                async def waiter():
+                    async with limiter.aslot():
+                        pass
+                await asyncio.wait_for(waiter(), 0.02)
+            await task
+
+        asyncio.run(main())
+        self.assertEqual((limiter._active, len(limiter._queue)), (0, 0))
+
+    def test_cancelled_waiter_frees_queue_place(self):
+        limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=1, max_wait=5)
+
+        async def main():
+            release = asyncio.Event()
+
+            async def holder():
+                async with limiter.aslot():
+                    await release.wait()
+
+            async def waiter():
+                async with limiter.aslot():
+                    return time.perf_counter()
+
+            task = asyncio.ensure_future(holder())
+            await asyncio.sleep(0.01)
+            cancelled = asyncio.ensure_future(waiter())
+            await asyncio.sleep(0.01)
+            cancelled.cancel()
+            await asyncio.sleep(0.01)
+            # 취소된 대기자는 대기열 자리도, 넘겨받을 차례도 남기지 않는다
+            queued = asyncio.ensure_future(waiter())
+            await asyncio.sleep(0.01)
+            released = time.perf_counter()
+            release.set()
+            entered = await queued
+            await task
+            return entered - released
+
+        self.assertLess(asyncio.run(main()), 0.5)
+        self.assertEqual((limiter._active, limiter._waiting, len(limiter._queue)), (0, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from chatbot_app.agents import ann_index
+from chatbot_app.agents.ann_index import (
+    MIN_TRAIN_VECTORS,
+    choose_index_type,
+    create_index,
+    index_kind,
+    search_ranges,
+)
+
+
+class ChooseIndexTypeTests(unittest.TestCase):
+    def test_auto_by_corpus_size(self):
+        with mock.patch.object(ann_index, "FAISS_AUTO_HNSW_MIN", 20000), \
+                mock.patch.object(ann_index, "FAISS_AUTO_IVFPQ_MIN", 500000):
+            self.assertEqual(choose_index_type(500, "auto"), "flat")
+            self.assertEqual(choose_index_type(20000, "auto"), "hnsw")
+            self.assertEqual(choose_index_type(500000, "auto"), "ivfpq")
+
+    def test_ivf_needs_enough_training_vectors(self):
+        self.assertEqual(choose_index_type(MIN_TRAIN_VECTORS - 1, "ivf"), "flat")
+        self.assertEqual(choose_index_type(MIN_TRAIN_VECTORS, "ivf"), "ivf")
+        with self.assertRaises(ValueError):
+            choose_index_type(10, "lsh")
+
+
+class SearchRangesTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.vectors = rng.standard_normal((MIN_TRAIN_VECTORS, 16)).astype(np.float32)
+
+    def test_results_stay_inside_ranges(self):
+        ranges = [(0, 100), (600, 700)]
+        for kind in ("flat", "hnsw", "ivf"):
+            index = create_index(kind, self.vectors)
+            self.assertEqual(index_kind(index), kind)
+            _, positions = search_ranges(index, self.vectors[650:651], 5, ranges)
+            self.assertEqual(positions[0], 650, kind)  # 자기 자신이 가장 가깝다
+            self.assertTrue(all(0 <= p < 100 or 600 <= p < 700 for p in positions), kind)
+
+    def test_empty_ranges(self):
+        index = create_index("flat", self.vectors)
+        distances, positions = search_ranges(index, self.vectors[:1], 5, [])
+        self.assertEqual((len(distances), len(positions)), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
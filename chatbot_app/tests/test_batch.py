@@ -0,0 +1,18 @@
+import unittest
+
+from chatbot_app.agents.chat_agent import batch_items
+
+
+class BatchItemsTests(unittest.TestCase):
+    def test_malformed_items_are_reported_per_item(self):
+        items, rejected = batch_items([123, "졸업", {"id": "h", "question": "휴관일", "history": "x"}, {"question": ""}])
+        self.assertEqual([item["question"] for item in items], ["졸업"])
+        self.assertEqual([r["id"] for r in rejected], [0, "h", 3])
+        self.assertTrue(all(r["code"] == "bad_request" for r in rejected))
+
+    def test_valid_items_keep_id_and_history(self):
+        history = [{"role": "user", "content": "도서관"}]
+        items, rejected = batch_items(["운영시간", {"id": "x", "question": "휴관일", "history": history}])
+        self.assertEqual(rejected, [])
+        self.assertEqual(items[0], {"id": 0, "question": "운영시간", "history": []})
+        self.assertEqual(items[1], {"id": "x", "question": "휴관일", "history": history})
@@ -0,0 +1,64 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from langchain.schema import Document
+
+from chatbot_app.agents import vector_store_agent
+from chatbot_app.agents.chunking import CHUNKER_VERSION, chunk_id
+
+
+class ChunkIdTests(unittest.TestCase):
+    def test_same_content_same_id(self):
+        self.assertEqual(chunk_id("도서관  운영\n시간 안내"), chunk_id(" 도서관 운영 시간 안내 "))
+        self.assertNotEqual(chunk_id("도서관 운영 시간 안내"), chunk_id("도서관 휴관일 안내"))
+
+    def test_ids_stable_across_documents(self):
+        with mock.patch.object(vector_store_agent, "query_embeddings"):
+            agent = vector_store_agent.VectorStoreAgent(load=False)
+        text = "열람실은 평일 오전 9시부터 오후 10시까지 운영합니다. " * 3
+        docs = {
+            "a": Document(page_content=text, metadata={"title": "열람실"}),
+            "b": Document(page_content=text, metadata={"title": "열람실 (사본)"}),
+        }
+        chunks, ids, doc_chunks = agent._chunk_with_ids(docs)
+        self.assertEqual(doc_chunks["a"], doc_chunks["b"])  # 같은 내용은 한 번만 저장
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(ids, [chunk_id(c.page_content) for c in chunks])
+        # 다시 나눠도 같은 ID, 이미 있는 청크는 새로 추가하지 않는다
+        again, new_ids, again_refs = agent._chunk_with_ids(docs, existing_ids=ids)
+        self.assertEqual((again, new_ids), ([], []))
+        self.assertEqual(again_refs, doc_chunks)
+
+
+class ManifestInvalidationTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name)
+        source = self.path / "notices.json"
+        source.write_text("[]", encoding="utf-8")
+        with mock.patch.object(vector_store_agent, "query_embeddings"):
+            self.agent = vector_store_agent.VectorStoreAgent(load=False)
+        manifest = self.agent._current_manifest([source])
+        manifest["documents"] = {}
+        manifest["faiss_index"] = {"type": "flat"}
+        (self.path / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+        self.source = source
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_chunker_version_bump_forces_full_rebuild(self):
+        cur = self.agent._current_manifest([self.source])
+        self.assertTrue(self.agent._manifest_matches(self.path, cur))
+        self.assertTrue(self.agent._can_update_incrementally(self.path, cur))
+        with mock.patch.object(vector_store_agent, "CHUNKER_VERSION", CHUNKER_VERSION + 1):
+            cur = self.agent._current_manifest([self.source])
+        self.assertFalse(self.agent._manifest_matches(self.path, cur))
+        self.assertFalse(self.agent._can_update_incrementally(self.path, cur))
+
+
+if __name__ == "__main__":
+    unittest.main()
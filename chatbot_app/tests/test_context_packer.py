@@ -0,0 +1,55 @@
+import unittest
+
+from langchain.schema import Document
+
+from chatbot_app.agents.chunking import estimate_tokens
+from chatbot_app.agents.context_packer import merge_neighbors, pack_context
+
+
+def _doc(text, start=None, source="https://library.sogang.ac.kr/a", title="열람실 안내"):
+    metadata = {"source": source, "title": title}
+    if start is not None:
+        metadata["start_index"] = start
+    return Document(page_content=text, metadata=metadata)
+
+
+class MergeNeighborsTests(unittest.TestCase):
+    def test_overlapping_chunks_of_one_source_are_merged(self):
+        first = _doc("열람실은 평일 9시부터", start=0)
+        second = _doc("9시부터 22시까지 운영", start=8)  # 앞 청크와 "9시부터" 가 겹침
+        other = _doc("휴관일 안내", start=0, source="https://library.sogang.ac.kr/b", title="휴관일")
+        segments = merge_neighbors([second, other, first])
+
+        self.assertEqual(len(segments), 2)
+        self.assertEqual(segments[0].text, "열람실은 평일 9시부터 22시까지 운영")
+        self.assertEqual(segments[0].rank, 0)  # 포함된 청크 중 가장 높은 순위
+        self.assertEqual(segments[0].docs, [first, second])
+        self.assertEqual(segments[1].docs, [other])
+
+    def test_distant_or_unpositioned_chunks_stay_separate(self):
+        segments = merge_neighbors([_doc("앞부분", start=0), _doc("먼 뒷부분", start=500), _doc("위치 없음")])
+        self.assertEqual([s.text for s in segments], ["앞부분", "먼 뒷부분", "위치 없음"])
+
+
+class PackContextTests(unittest.TestCase):
+    def test_budget_skips_segments_that_do_not_fit(self):
+        docs = [
+            _doc("가" * 40, source="s1", title="첫째"),
+            _doc("나" * 400, source="s2", title="둘째"),
+            _doc("다" * 20, source="s3", title="셋째"),
+        ]
+        context, used_docs, used = pack_context(docs, budget=60)
+        self.assertEqual([d.metadata["title"] for d in used_docs], ["첫째", "셋째"])
+        self.assertLessEqual(used, 60)
+        self.assertNotIn("나", context)
+
+    def test_top_segment_longer_than_budget_is_truncated(self):
+        context, used_docs, used = pack_context([_doc("가" * 400)], budget=50)
+        self.assertEqual(len(used_docs), 1)
+        self.assertTrue(context.endswith("…"))
+        self.assertEqual(used, estimate_tokens(context))
+        self.assertLessEqual(used, 51)
+
+
+if __name__ == "__main__":
+    unittest.main()
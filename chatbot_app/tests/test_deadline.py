@@ -0,0 +1,45 @@
+import unittest
+
+from langchain.schema import Document
+
+from chatbot_app.agents.deadline import Deadline, fallback_answer
+
+
+class FallbackAnswerTests(unittest.TestCase):
+    def test_titles_links_and_snippets_are_escaped(self):
+        doc = Document(
+            page_content="[제목] 무시\n열람실 <b>운영</b> 시간은 9시부터입니다. 기타 안내.",
+            metadata={
+                "source": 'https://library.sogang.ac.kr/a?x=1&y="2"',
+                "title": "<script>alert(1)</script>",
+                "date": "2025-03-01",
+            },
+        )
+        answer = fallback_answer("열람실 운영 시간", [doc])
+        self.assertNotIn("<script>", answer)
+        self.assertNotIn("<b>", answer)
+        self.assertIn("&lt;script&gt;alert(1)&lt;/script&gt;", answer)
+        self.assertIn('<a href="https://library.sogang.ac.kr/a?x=1&amp;y=&quot;2&quot;">', answer)
+        self.assertIn("열람실 &lt;b&gt;운영&lt;/b&gt; 시간은 9시부터입니다.", answer)
+        self.assertNotIn("[제목]", answer)
+
+    def test_chunks_of_one_source_are_grouped(self):
+        meta = {"source": "https://library.sogang.ac.kr/a", "title": "휴관일"}
+        docs = [Document(page_content="설날 휴관.", metadata=meta), Document(page_content="추석 휴관.", metadata=meta)]
+        answer = fallback_answer("휴관일", docs)
+        self.assertEqual(answer.count("<a href="), 1)
+
+    def test_no_docs(self):
+        self.assertIn("잠시 후 다시", fallback_answer("질문", []))
+
+
+class DeadlineTests(unittest.TestCase):
+    def test_request_budget_caps_llm_deadlines(self):
+        start_at, finish_at = Deadline(budget=1.0).llm(start=5.0, finish=10.0)
+        self.assertEqual(start_at, finish_at)
+        self.assertLessEqual(Deadline.left(finish_at), 1.0)
+        self.assertEqual(Deadline(budget=0).llm(start=0, finish=0), (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
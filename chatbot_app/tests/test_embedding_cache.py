@@ -0,0 +1,44 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from langchain_core.embeddings import Embeddings
+
+from chatbot_app.agents.embedding_cache import CachedEmbeddings
+
+
+class TextLengthEmbeddings(Embeddings):
+    """텍스트마다 다른 결정적인 벡터"""
+
+    def embed_documents(self, texts):
+        return [[float(len(t)), float(sum(map(ord, t)) % 97)] for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class CachedEmbeddingsTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = TextLengthEmbeddings()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _cache(self):
+        return CachedEmbeddings(self.base, "test-model", self.tmp.name)
+
+    def test_crash_between_append_and_index_save(self):
+        self._cache().embed_documents(["도서관", "운영시간"])
+
+        # 벡터는 덧붙였지만 인덱스 저장 전에 죽은 경우
+        crashed = self._cache()
+        with mock.patch.object(crashed, "_save_index", side_effect=OSError("crash")):
+            with self.assertRaises(OSError):
+                crashed.embed_documents(["휴관일"])
+
+        cache = self._cache()
+        texts = ["대출 권수", "도서관", "휴관일", "운영시간"]
+        self.assertEqual(cache.embed_documents(texts), self.base.embed_documents(texts))
+        self.assertEqual(self._cache().embed_documents(texts), self.base.embed_documents(texts))
+        self.assertEqual(cache.vectors_path.stat().st_size, len(texts) * 2 * 4)
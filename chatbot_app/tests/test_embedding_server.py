@@ -0,0 +1,67 @@
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+
+from langchain_core.embeddings import Embeddings
+
+from chatbot_app.agents import embedding_server
+
+
+class TinyEmbeddings(Embeddings):
+    model_name = "tiny"
+
+    def embed_documents(self, texts):
+        return [[float(len(t)), 1.0, 0.0] for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class EmbeddingServerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, "embedding.sock")
+        cls.loop = asyncio.new_event_loop()
+        cls.server = cls.loop.create_task(embedding_server.serve(TinyEmbeddings(), cls.path, 8, 1))
+        threading.Thread(target=cls.loop.run_forever, daemon=True).start()
+        for _ in range(100):
+            if os.path.exists(cls.path):
+                break
+            time.sleep(0.01)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.loop.call_soon_threadsafe(cls.server.cancel)
+        time.sleep(0.05)
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        cls.tmp.cleanup()
+
+    def _request(self, texts):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(2)
+            sock.connect(self.path)
+            return embedding_server._call(sock, {"texts": texts})
+
+    def test_empty_request_returns_empty_matrix(self):
+        header, body = self._request([])
+        self.assertEqual(header, {"n": 0, "dim": 3})
+        self.assertEqual(body, b"")
+        header, _ = self._request(["도서관"])
+        self.assertEqual(header, {"n": 1, "dim": 3})
+
+    def test_client_skips_server_for_empty_documents(self):
+        def no_fallback():
+            raise AssertionError("fallback model should not load")
+
+        client = embedding_server.RemoteEmbeddings(no_fallback, path=self.path + ".missing", model_name="tiny")
+        self.assertEqual(client.embed_documents([]), [])
+        self.assertEqual(client._down_until, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
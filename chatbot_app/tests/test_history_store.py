@@ -0,0 +1,49 @@
+import asyncio
+import unittest
+
+from chatbot_app.history_store import HistoryStore
+
+
+class HistoryStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.store = HistoryStore(capacity=3, ttl=60)
+        self.chat_id = HistoryStore.new_chat_id()
+
+    def tearDown(self):
+        asyncio.run(self.store.clear(self.chat_id))
+
+    def test_ring_buffer_keeps_latest_exchanges(self):
+        async def main():
+            for i in range(1, 6):
+                self.assertEqual(await self.store.append(self.chat_id, f"질문 {i}", f"답변 {i}"), i)
+            return await self.store.recent(self.chat_id, turns=20)
+
+        history = asyncio.run(main())
+        # 용량 3 을 넘긴 앞의 두 교환은 덮어써졌다
+        self.assertEqual([h["content"] for h in history],
+                         ["질문 3", "답변 3", "질문 4", "답변 4", "질문 5", "답변 5"])
+        self.assertEqual([h["role"] for h in history[:2]], ["user", "assistant"])
+
+    def test_recent_limits_turns(self):
+        async def main():
+            for i in range(1, 3):
+                await self.store.append(self.chat_id, f"질문 {i}", f"답변 {i}")
+            return await self.store.recent(self.chat_id, turns=3)
+
+        self.assertEqual([h["content"] for h in asyncio.run(main())], ["답변 1", "질문 2", "답변 2"])
+
+    def test_stored_query_embedding_round_trip(self):
+        embedding = [0.5, -1.25, 3.0]
+
+        async def main():
+            await self.store.append(self.chat_id, "대출 권수", "10권입니다.", embedding=embedding)
+            await self.store.append(self.chat_id, "연장은?", "1회 가능합니다.")
+            return await self.store.recent(self.chat_id, turns=4)
+
+        first, _, second, _ = asyncio.run(main())
+        self.assertEqual(first["embedding"], embedding)  # float32 로 저장했다가 그대로 복원
+        self.assertNotIn("embedding", second)
+
+
+if __name__ == "__main__":
+    unittest.main()
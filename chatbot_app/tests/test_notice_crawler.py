@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+import json
+import tempfile
+import unittest
+
+from chatbot_app.agents.notice_crawler_agent import NoticeCrawlerAgent
+
+
+class FakeResponse:
+    def __init__(self, text="", status_code=200, headers=None):
+        self.text = text
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeBoardCrawler(NoticeCrawlerAgent):
+    """목록/상세 페이지를 메모리의 게시판으로 대신하는 크롤러"""
+
+    def __init__(self, output_dir, board):
+        super().__init__(output_dir=output_dir, max_workers=1, rate_limit=0)
+        self.board = board  # [(번호, 작성일)] 최신순
+        self.failing = set()
+        self.fetched = []
+
+    def _get(self, url, headers=None):
+        if "/bbs/list/" in url:
+            page = int(url.split("pn=")[1])
+            rows = "".join(
+                f"<tr><td>{no}</td><td><a href='/bbs/content/1_{no}'>공지 {no}</a></td>"
+                f"<td>도서관</td><td>{day}</td><td>1</td></tr>"
+                for no, day in self.board[(page - 1) * 3:page * 3]
+            )
+            return FakeResponse(f"<table><tbody>{rows}</tbody></table>")
+        self.fetched.append(url)
+        if url in self.failing:
+            raise ConnectionError("boom")
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return FakeResponse(status_code=304)
+        return FakeResponse(f"<div class='boardContent'>본문 {url}</div>", headers={"ETag": '"v1"'})
+
+
+def _url(no):
+    return f"{NoticeCrawlerAgent.BASE_URL}/bbs/content/1_{no}"
+
+
+class IncrementalCrawlTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        today = date.today()
+        self.days = lambda n: (today - timedelta(days=n)).isoformat()
+        self.crawler = FakeBoardCrawler(self.tmp.name, [(102, self.days(1)), (101, self.days(60))])
+        self.crawler.create_notices_json()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _saved_nos(self):
+        with open(self.crawler.output_file, encoding="utf-8") as f:
+            return [n["no"] for n in json.load(f)]
+
+    def test_failed_new_notice_is_retried_next_run(self):
+        self.crawler.board = [(104, self.days(0)), (103, self.days(0))] + self.crawler.board
+        self.crawler.failing = {_url(103)}
+        self.crawler.create_notices_json(incremental=True)
+        self.assertEqual(self._saved_nos(), ["104", "102", "101"])
+        self.assertTrue(self.crawler.pending_file.exists())
+
+        # 목록은 104 에서 멈추지만 보류된 103 은 다시 받는다
+        self.crawler.failing = set()
+        self.crawler.create_notices_json(incremental=True)
+        self.assertCountEqual(self._saved_nos(), ["104", "103", "102", "101"])
+        self.assertFalse(self.crawler.pending_file.exists())
+
+    def test_only_recent_notices_are_revalidated(self):
+        self.crawler.fetched.clear()
+        self.crawler.create_notices_json(incremental=True)
+        self.assertEqual(self.crawler.fetched, [_url(102)])
+        self.assertEqual(self._saved_nos(), ["102", "101"])
@@ -0,0 +1,50 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from chatbot_app.agents import partitions
+from chatbot_app.agents.partitions import NOTICE, PartitionLayout, partition_order
+
+
+class PartitionLayoutTests(unittest.TestCase):
+    def setUp(self):
+        metadatas = [
+            {"date": "2025-01-01"},
+            {"category": "이용 안내"},
+            {"date": "2025-04-01"},
+            {"category": "자료 검색"},
+            {"date": "2024-10-03"},
+        ]
+        vectors = np.asarray([[0, 0, 1], [1, 0, 0], [0, 0, 1], [0, 1, 0], [0, 0, 1]], dtype=np.float32)
+        order = partition_order(metadatas)
+        self.layout = PartitionLayout.build([metadatas[i] for i in order], vectors[order])
+
+    def test_notices_sorted_newest_first_after_details(self):
+        self.assertEqual(self.layout.names, ["detail:이용 안내", "detail:자료 검색", NOTICE])
+        self.assertEqual(self.layout.ranges[NOTICE], (2, 5))
+        self.assertEqual(self.layout.notice_dates, ["2025-04-01", "2025-01-01", "2024-10-03"])
+        self.assertEqual(self.layout.position_ranges([NOTICE], since="2025-01-01"), [(2, 4)])
+
+    def test_route_picks_nearest_partitions(self):
+        names = self.layout.names
+        self.assertEqual(self.layout.route([0.9, 0.1, 0], 1, names), ["detail:이용 안내"])
+        self.assertEqual(self.layout.route([0, 1, 0], 1, names, "대출 방법"), ["detail:자료 검색"])
+        # 공지 단서가 있는 질문은 notice 파티션을 함께 본다
+        self.assertEqual(self.layout.route([0, 1, 0], 1, names, "이번 달 특강 공지"), ["detail:자료 검색", NOTICE])
+        # probe 가 후보 수 이상이거나 0이면 전체
+        self.assertEqual(self.layout.route([0, 1, 0], 0, names), names)
+
+    def test_recency_weight_halves_per_half_life(self):
+        with mock.patch.object(partitions, "RECENCY_BOOST", 0.5), \
+                mock.patch.object(partitions, "RECENCY_HALF_LIFE_DAYS", 90):
+            self.assertAlmostEqual(self.layout.recency_weight(2), 1.5)  # 가장 최근 공지
+            self.assertAlmostEqual(self.layout.recency_weight(3), 1 + 0.5 * 0.5 ** (90 / 90))
+            self.assertAlmostEqual(self.layout.recency_weight(4), 1 + 0.5 * 0.5 ** (180 / 90))
+            self.assertEqual(self.layout.recency_weight(0), 1.0)  # 안내 페이지는 가산점 없음
+        with mock.patch.object(partitions, "RECENCY_BOOST", 0):
+            self.assertEqual(self.layout.recency_weight(2), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import tempfile
+import time
+import unittest
+
+from chatbot_app.agents.faq_table import FaqTable, faq_path, write_faq
+from chatbot_app.agents.query_log import QueryLog, normalize_question, read_entries, scrub_pii
+
+
+class ScrubPiiTests(unittest.TestCase):
+    def test_contact_and_id_numbers_are_masked(self):
+        text = "학번 20231234 인 hong.gd@sogang.ac.kr 입니다. 010-1234-5678 / 900101-1234567 로 연락"
+        self.assertEqual(
+            scrub_pii(text),
+            "학번 <number> 인 <email> 입니다. <phone> / <rrn> 로 연락",
+        )
+
+    def test_short_numbers_are_kept(self):
+        self.assertEqual(scrub_pii("3층 열람실은 22시까지, 대출은 10권"), "3층 열람실은 22시까지, 대출은 10권")
+
+    def test_normalized_key_ignores_spacing_and_punctuation(self):
+        self.assertEqual(normalize_question("도서관  운영시간?!"), normalize_question("도서관 운영시간"))
+
+    def test_logged_entries_are_scrubbed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = QueryLog(directory=tmp, enabled=True)
+            log.record("chat_api", "제 번호 010-1234-5678 로 알려주세요", True, {"sources": ["s"]})
+            for _ in range(100):
+                entries = list(read_entries(tmp))
+                if entries:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(entries[0]["question"], "제 번호 <phone> 로 알려주세요")
+            self.assertNotIn("1234", str(entries[0]))
+
+
+class FaqTableTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        entry = {"question": "도서관 운영시간", "answer": "9시부터", "sources": ["s"], "count": 5}
+        write_faq({normalize_question("도서관 운영시간"): entry}, "v1", self.tmp.name)
+        self.table = FaqTable(self.tmp.name, check_interval=0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lookup_only_for_serving_index_version(self):
+        self.assertEqual(self.table.lookup("도서관 운영시간?", "v1")["answer"], "9시부터")
+        self.assertIsNone(self.table.lookup("도서관 운영시간", "v2"))
+        self.assertIsNone(self.table.lookup("열람실 운영시간", "v1"))
+
+    def test_file_for_another_version_is_ignored(self):
+        # 파일 이름과 내용의 인덱스 버전이 다르면 쓰지 않는다
+        faq_path(self.tmp.name, "v2").write_text(
+            faq_path(self.tmp.name, "v1").read_text(encoding="utf-8"), encoding="utf-8"
+        )
+        self.assertIsNone(self.table.lookup("도서관 운영시간", "v2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
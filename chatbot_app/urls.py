@@ -4,5 +4,9 @@ from . import views
 urlpatterns = [
     path("", views.chat_page, name="chat_page"),
     path("api/", views.chat_api, name="chat_api"),
+    path("api/stream/", views.chat_stream, name="chat_stream"),
+    path("api/batch/", views.chat_batch, name="chat_batch"),
     path("reset/", views.reset_chat, name="reset_chat"),
+    path("cache/stats/", views.answer_cache_stats, name="answer_cache_stats"),
+    path("ready/", views.ready, name="ready"),
 ]
@@ -2,38 +2,209 @@ from django.shortcuts import render
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse
-from .api import process_question
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from .api import (
+    aget_chat_agent,
+    aprocess_question,
+    arun_batch,
+    astream_question,
+    cache_stats,
+    check_capacity,
+    get_chat_agent,
+    is_ready,
+    load_error,
+    start_warmup,
+)
+from .agents.admission import ServerBusy
+from .agents.query_log import query_log
+from .history_store import history_store
+from .agents.config import BATCH_CONCURRENCY, BATCH_MAX_QUESTIONS, HISTORY_MAX_TURNS, LLM_MAX_CONCURRENCY
+from .agents.metrics import render_latest, server_timing_header, span, start_timings, track_request
 
 import json
 
+# 응답에 돌려주는 최근 메시지 수 / 저장소에서 읽을 메시지 수
+RESPONSE_HISTORY_TURNS = 10
+HISTORY_READ_TURNS = max(HISTORY_MAX_TURNS, RESPONSE_HISTORY_TURNS)
+
+def _busy_response(e: ServerBusy):
+    """LLM 동시 처리 한도 초과 → 503 + Retry-After"""
+    response = JsonResponse({"error": "busy", "message": str(e)}, status=503)
+    response["Retry-After"] = str(e.retry_after)
+    return response
+
+def _visible(history: list) -> list:
+    """응답에 싣는 이력 (저장된 질의 임베딩은 빼고)"""
+    return [{"role": h["role"], "content": h["content"]} for h in history[-RESPONSE_HISTORY_TURNS:]]
+
 def chat_page(request):
     return render(request, "chatbot_app/chat.html")
 
+async def _chat_id(request) -> str:
+    """세션에는 대화 ID만 저장 (처음 한 번만 세션이 쓰인다)"""
+    chat_id = await request.session.aget("chat_id")
+    if chat_id is None:
+        chat_id = history_store.new_chat_id()
+        await request.session.aset("chat_id", chat_id)
+    return chat_id
+
 @csrf_exempt # 발표용은 주석 해제
-def chat_api(request):
+async def chat_api(request):
     if request.method == "POST":
         data = json.loads(request.body)
         q = data.get("question", "")
+        timings = start_timings()
 
-        history = request.session.get("chat_history", [])
+        with track_request("chat_api"):
+            chat_id = await _chat_id(request)
+            with span("history_read"):
+                history = await history_store.recent(chat_id, HISTORY_READ_TURNS)
 
-        result = process_question(q, history)
+            first_turn = not history
+            try:
+                result = await aprocess_question(q, history)
+            except ServerBusy as e:
+                return _busy_response(e)
 
-        # 세션에 저장
-        history.append({"role": "user", "content": q})
-        history.append({"role": "assistant", "content": result["answer"]})
-        request.session["chat_history"] = history
+            # 이번 교환만 이력 저장소에 추가
+            with span("history_save"):
+                await history_store.append(chat_id, q, result["answer"], result.get("query_embedding"))
+            history.append({"role": "user", "content": q})
+            history.append({"role": "assistant", "content": result["answer"]})
 
-        return JsonResponse({
+        response = JsonResponse({
             "question": q,
             "answer": result["answer"],
             "sources": result.get("sources", []),
-            "history": history[-10:],  # 최근 10개만 전달
+            "fallback": result.get("fallback", False),  # 마감 초과로 검색 결과만으로 답한 경우
+            "history": _visible(history),  # 최근 10개만 전달
         })
+        response["Server-Timing"] = server_timing_header(timings)
+        query_log.record("chat_api", q, first_turn, result, timings)
+        return response
+
+def _sse(event: str, data: dict) -> str:
+    """Server-Sent Events 한 프레임 직렬화"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
 @csrf_exempt
-def reset_chat(request):
+async def chat_stream(request):
+    """SSE 스트리밍 응답 (sources → token... → done)"""
+    if request.method != "POST":
+        return JsonResponse({"error": "POST only"}, status=405)
+
+    data = json.loads(request.body)
+    q = data.get("question", "")
+    await aget_chat_agent()  # 첫 요청이면 스트림을 열기 전에 로드
+    # 대기열이 이미 가득 찼으면 스트림을 열기 전에 거절
+    try:
+        check_capacity()
+    except ServerBusy as e:
+        return _busy_response(e)
+    # 대화 ID는 스트림 시작 전에 정해 두어 세션 미들웨어가 쿠키를 싣게 한다
+    chat_id = await _chat_id(request)
+    with span("history_read"):
+        history = await history_store.recent(chat_id, HISTORY_READ_TURNS)
+
+    async def event_stream():
+        timings = start_timings()
+        first_turn = not history
+        with track_request("chat_stream"):
+            try:
+                async for event in astream_question(q, history):
+                    name = event.pop("event")
+                    if name == "done":
+                        query_log.record("chat_stream", q, first_turn, event, timings)
+                        # 스트림 종료 시점에 완성된 답변만 이력 저장소에 추가
+                        embedding = event.pop("query_embedding", None)
+                        with span("history_save"):
+                            await history_store.append(chat_id, q, event["answer"], embedding)
+                        history.append({"role": "user", "content": q})
+                        history.append({"role": "assistant", "content": event["answer"]})
+                        event["question"] = q
+                        event["history"] = _visible(history)
+                    yield _sse(name, event)
+            except ServerBusy as e:
+                yield _sse("error", {"message": str(e), "code": "busy"})
+            except Exception as e:
+                yield _sse("error", {"message": str(e)})
+
+    response = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx 버퍼링 비활성화
+    return response
+
+@csrf_exempt
+async def chat_batch(request):
+    """여러 질문을 한 번에 (NDJSON: 끝나는 순서대로 한 줄씩 → 마지막 줄은 요약)
+
+    요청 본문: {"questions": ["...", {"id": ..., "question": "...", "history": [...]}], "concurrency": 4}
+    대화 이력은 저장하지 않는다.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "POST only"}, status=405)
+
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"error": "요청 본문이 올바른 JSON 이 아닙니다."}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"error": "요청 본문은 JSON 객체여야 합니다."}, status=400)
+    questions = data.get("questions")
+    if not isinstance(questions, list) or not questions:
+        return JsonResponse({"error": "questions 목록이 필요합니다."}, status=400)
+    if len(questions) > BATCH_MAX_QUESTIONS:
+        return JsonResponse({"error": f"한 번에 최대 {BATCH_MAX_QUESTIONS}개까지 보낼 수 있습니다."}, status=400)
+    concurrency = data.get("concurrency") or BATCH_CONCURRENCY
+    if isinstance(concurrency, bool) or not isinstance(concurrency, int) or concurrency < 1:
+        return JsonResponse({"error": "concurrency 는 1 이상의 정수여야 합니다."}, status=400)
+    concurrency = min(concurrency, LLM_MAX_CONCURRENCY)
+    await aget_chat_agent()  # 첫 요청이면 스트림을 열기 전에 로드
+
+    async def lines():
+        with track_request("chat_batch"):
+            total = failed = 0
+            async for result in arun_batch(questions, concurrency):
+                total += 1
+                failed += "error" in result
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+            yield json.dumps({"done": True, "total": total, "failed": failed}) + "\n"
+
+    response = StreamingHttpResponse(lines(), content_type="application/x-ndjson")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+@csrf_exempt
+async def reset_chat(request):
     """대화 초기화"""
-    request.session["chat_history"] = []
+    chat_id = await request.session.aget("chat_id")
+    if chat_id is not None:
+        await history_store.clear(chat_id)
     return JsonResponse({"status": "ok"})
+
+def answer_cache_stats(request):
+    """의미 기반 답변 캐시 적중/실패 카운터"""
+    return JsonResponse(cache_stats())
+
+def metrics(request):
+    """Prometheus 스크레이프 엔드포인트"""
+    body, content_type = render_latest()
+    return HttpResponse(body, content_type=content_type)
+
+def ready(request):
+    """준비 상태 확인 (로드 밸런서/배포 스크립트용)
+
+    아직 로드 전이면 백그라운드 로드를 시작하고 503 을 돌려준다.
+    """
+    if is_ready():
+        agent = get_chat_agent()
+        return JsonResponse({"status": "ready", "index_version": agent.vector_agent.manifest_version})
+    start_warmup()
+    error = load_error()
+    if error is not None:
+        response = JsonResponse({"status": "error", "message": str(error)}, status=503)
+    else:
+        response = JsonResponse({"status": "loading"}, status=503)
+    response["Retry-After"] = "5"
+    return response
@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_project.settings")
 
 application = get_asgi_application()
+
+# 모델/인덱스 로드는 백그라운드에서 (끝나기 전에는 /chat/ready/ 가 503)
+from chatbot_app.agents.config import WARMUP_ON_START
+from chatbot_app.api import start_warmup
+
+if WARMUP_ON_START:
+    start_warmup()
@@ -86,6 +86,34 @@ DATABASES = {
     }
 }
 
+# Cache
+# 대화 이력은 세션 DB 대신 캐시 백엔드에 링 버퍼로 저장 (chatbot_app/history_store.py)
+# LYOLLA_REDIS_URL 을 지정하면 여러 워커/서버가 같은 Redis 를 공유한다.
+# 워커를 여러 개 띄우면 Redis 가 필요하다 (없으면 이력이 워커마다 따로 남는다).
+
+REDIS_URL = os.getenv("LYOLLA_REDIS_URL")
+
+CHAT_HISTORY_CACHE = "chat_history"
+CHAT_HISTORY_MAX_EXCHANGES = int(os.getenv("LYOLLA_CHAT_HISTORY_MAX_EXCHANGES", 20))
+CHAT_HISTORY_MAX_CHATS = int(os.getenv("LYOLLA_CHAT_HISTORY_MAX_CHATS", 2000))
+CHAT_HISTORY_TTL = int(os.getenv("LYOLLA_CHAT_HISTORY_TTL", 7 * 24 * 60 * 60))  # 초
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "chat_history": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    } if REDIS_URL else {
+        # Redis 가 없으면 단일 워커용 메모리 캐시 (incr 가 원자적이고, 가득 차면 오래 안 쓴 키부터 지움).
+        # 대화마다 head + 교환 슬롯이 필요하므로 보관할 대화 수로 크기를 정한다.
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "chat_history",
+        "OPTIONS": {"MAX_ENTRIES": CHAT_HISTORY_MAX_CHATS * (CHAT_HISTORY_MAX_EXCHANGES + 1)},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
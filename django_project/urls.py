@@ -18,8 +18,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from chatbot_app import views as chatbot_views
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("chat/", include("chatbot_app.urls")),
+    path("metrics", chatbot_views.metrics, name="metrics"),
 ]
 